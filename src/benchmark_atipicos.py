@@ -0,0 +1,92 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from data_loader import DataLoader
+from preprocesado_datos import PreprocesadoDatos
+
+
+def generar_datos(filas, columnas, semilla=0):
+    """
+    Genera un DataFrame numérico con un 1 % de valores atípicos en cada columna.
+
+    Parámetros:
+        filas (int): Número de filas.
+        columnas (int): Número de columnas numéricas.
+        semilla (int): Semilla del generador aleatorio.
+
+    Retorna:
+        pd.DataFrame: Datos sintéticos.
+    """
+    rng = np.random.default_rng(semilla)
+    datos = rng.normal(50, 10, size=(filas, columnas))
+    atipicos = rng.random((filas, columnas)) < 0.01
+    datos[atipicos] *= 20
+    return pd.DataFrame(datos, columns=[f"col{i}" for i in range(columnas)])
+
+
+def reemplazar_con_apply(df, columnas):
+    """
+    Implementación anterior de la estrategia "mediana", con un `apply` por celda.
+    Se conserva solo como referencia para la comparación.
+    """
+    for col in columnas:
+        Q1 = df[col].quantile(0.25)
+        Q3 = df[col].quantile(0.75)
+        IQR = Q3 - Q1
+        lower_bound = Q1 - 1.5 * IQR
+        upper_bound = Q3 + 1.5 * IQR
+        mediana = df[col].median()
+        df[col] = df[col].apply(lambda x: mediana if x < lower_bound or x > upper_bound else x)
+    return df
+
+
+def medir(funcion, repeticiones):
+    """
+    Ejecuta `funcion` varias veces y devuelve el mejor tiempo (s) y el último resultado.
+    """
+    mejor, resultado = float("inf"), None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor, resultado
+
+
+def ejecutar(filas, columnas, repeticiones):
+    """
+    Compara la estrategia "mediana" basada en `apply` con la versión vectorizada
+    y la nueva estrategia "recortar", y muestra los tiempos obtenidos.
+    """
+    datos = generar_datos(filas, columnas)
+    nombres = list(datos.columns)
+
+    def vectorizado(estrategia):
+        cargador = DataLoader()
+        cargador.dataset = datos
+        preprocesado = PreprocesadoDatos(cargador)
+        preprocesado.features = nombres
+        preprocesado.columnas_numericas = nombres
+        preprocesado.aplicar_valores_atipicos(estrategia)
+        return preprocesado.dataset_modificado
+
+    tiempo_apply, esperado = medir(lambda: reemplazar_con_apply(datos.copy(), nombres), repeticiones)
+    tiempo_mediana, obtenido = medir(lambda: vectorizado("mediana"), repeticiones)
+    tiempo_recortar, _ = medir(lambda: vectorizado("recortar"), repeticiones)
+    pd.testing.assert_frame_equal(obtenido, esperado)
+
+    print(f"Datos: {filas} filas x {columnas} columnas (mejor de {repeticiones} repeticiones)")
+    print(f"  Mediana con apply:       {tiempo_apply:8.3f} s")
+    print(f"  Mediana vectorizada:     {tiempo_mediana:8.3f} s  (x{tiempo_apply / tiempo_mediana:.1f})")
+    print(f"  Recortar (winsorizar):   {tiempo_recortar:8.3f} s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark del manejo de valores atípicos.")
+    parser.add_argument("--filas", type=int, default=1_000_000)
+    parser.add_argument("--columnas", type=int, default=5)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    argumentos = parser.parse_args()
+    ejecutar(argumentos.filas, argumentos.columnas, argumentos.repeticiones)
@@ -0,0 +1,83 @@
+import argparse
+import contextlib
+import io
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from data_loader import DataLoader
+from preprocesado_datos import PreprocesadoDatos
+
+
+def generar_datos(filas, columnas, semilla=0):
+    """
+    Genera un DataFrame numérico ancho con un 5 % de valores faltantes y un 1 % de valores atípicos.
+
+    Parámetros:
+        filas (int): Número de filas.
+        columnas (int): Número de columnas numéricas (además de la columna objetivo "y").
+        semilla (int): Semilla del generador aleatorio.
+
+    Retorna:
+        pd.DataFrame: Datos sintéticos.
+    """
+    rng = np.random.default_rng(semilla)
+    datos = rng.normal(50, 10, size=(filas, columnas))
+    datos[rng.random((filas, columnas)) < 0.01] *= 20
+    datos[rng.random((filas, columnas)) < 0.05] = np.nan
+    df = pd.DataFrame(datos, columns=[f"col{i}" for i in range(columnas)])
+    df["y"] = rng.integers(0, 2, filas)
+    return df
+
+
+def ejecutar(filas, columnas, hilos, repeticiones):
+    """
+    Mide la imputación, el escalado y el tratamiento de valores atípicos con un hilo
+    y con `hilos` hilos, comprueba que los resultados son idénticos y muestra la aceleración.
+    """
+    datos = generar_datos(filas, columnas)
+    features = [col for col in datos.columns if col != "y"]
+    pasos = [
+        ("valores_faltantes", "mediana"),
+        ("normalizacion", "z_score"),
+        ("valores_atipicos", "mediana"),
+    ]
+
+    def preparar(n_hilos, hasta):
+        cargador = DataLoader()
+        cargador.dataset = datos
+        preprocesado = PreprocesadoDatos(cargador, hilos=n_hilos)
+        with contextlib.redirect_stdout(io.StringIO()):
+            preprocesado.aplicar_seleccion(features, "y")
+        for paso, estrategia in pasos[:hasta]:
+            getattr(preprocesado, "aplicar_" + paso)(estrategia)
+        return preprocesado
+
+    print(f"Datos: {filas} filas x {columnas} columnas, {hilos} hilos, {os.cpu_count()} CPUs "
+          f"(mejor de {repeticiones} repeticiones)")
+    for indice, (paso, estrategia) in enumerate(pasos):
+        tiempos, resultados = [], []
+        for n_hilos in (1, hilos):
+            mejor = float("inf")
+            for _ in range(repeticiones):
+                preprocesado = preparar(n_hilos, indice) # Los pasos anteriores no se miden
+                inicio = time.perf_counter()
+                getattr(preprocesado, "aplicar_" + paso)(estrategia)
+                mejor = min(mejor, time.perf_counter() - inicio)
+            tiempos.append(mejor)
+            resultados.append(preprocesado.dataset_modificado)
+        pd.testing.assert_frame_equal(resultados[0], resultados[1], check_exact=True)
+        print(f"  {paso + ' (' + estrategia + ')':<32}1 hilo: {tiempos[0]:7.3f} s   "
+              f"{hilos} hilos: {tiempos[1]:7.3f} s   (x{tiempos[0] / tiempos[1]:.2f})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark del procesamiento de columnas en paralelo.")
+    parser.add_argument("--filas", type=int, default=200_000)
+    parser.add_argument("--columnas", type=int, default=200)
+    parser.add_argument("--hilos", type=int, default=os.cpu_count())
+    parser.add_argument("--repeticiones", type=int, default=3)
+    argumentos = parser.parse_args()
+    ejecutar(argumentos.filas, argumentos.columnas, argumentos.hilos, argumentos.repeticiones)
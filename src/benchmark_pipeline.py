@@ -0,0 +1,388 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sqlite3
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from data_loader import DataLoader
+from ejecutor_pipeline import ESTRATEGIAS, EjecutorPipeline
+from exportador_datos import ExportarDatos, escribir_csv
+from formato_columnar import escribir_bloques_columnar
+from fuente_sqlite import cerrar_conexiones
+from memoria import pico_rss_mb, reiniciar_pico_rss
+from preprocesado_datos import PreprocesadoDatos
+
+# Columnas de los datos sintéticos: las mismas que el dataset del Titanic
+FEATURES = ["Pclass", "Sex", "Age", "SibSp", "Parch", "Ticket", "Fare", "Cabin", "Embarked"]
+TARGET = "Survived"
+
+FORMATOS = ("csv", "excel", "parquet", "feather", "sqlite")
+EXTENSIONES = {"csv": ".csv", "excel": ".xlsx", "parquet": ".parquet", "feather": ".feather", "sqlite": ".db"}
+
+# Estrategia con la que se aplican los pasos anteriores al que se mide
+ESTRATEGIAS_PREVIAS = {
+    "valores_faltantes": "media",
+    "datos_categoricos": "label",
+    "normalizacion": "z_score",
+    "valores_atipicos": "recortar",
+}
+
+# Argumentos adicionales de las estrategias que los necesitan
+ARGUMENTOS = {("valores_faltantes", "constante"): {"constante": 0}}
+
+# Excel es muy lento y admite como máximo 1.048.576 filas por hoja: solo se mide hasta este tamaño
+FILAS_MAX_EXCEL = 100_000
+
+
+def generar_titanic(filas, columnas_extra=0, faltantes=0.2, cardinalidad=50, atipicos=0.01, semilla=0, inicio=0):
+    """
+    Genera datos sintéticos con las columnas y los tipos del dataset del Titanic.
+
+    Parámetros:
+        filas (int): Número de filas.
+        columnas_extra (int): Columnas numéricas adicionales ("extra0", "extra1", ...), para variar el ancho.
+        faltantes (float): Proporción de valores faltantes en "Age", "Cabin", "Embarked" y las columnas extra.
+        cardinalidad (int): Número de categorías distintas de "Ticket" y "Cabin".
+        atipicos (float): Proporción de valores atípicos (multiplicados por 20) en "Fare" y las columnas extra.
+        semilla (int): Semilla del generador aleatorio.
+        inicio (int): Primer "PassengerId" menos uno (para generar los datos por bloques).
+
+    Retorna:
+        pd.DataFrame: Datos sintéticos.
+    """
+    rng = np.random.default_rng(semilla)
+
+    def con_faltantes(valores):
+        valores = pd.Series(valores)
+        return valores.mask(rng.random(filas) < faltantes)
+
+    def con_atipicos(valores):
+        return np.where(rng.random(filas) < atipicos, valores * 20, valores)
+
+    identificadores = np.arange(inicio + 1, inicio + filas + 1)
+    df = pd.DataFrame({
+        "PassengerId": identificadores,
+        TARGET: rng.integers(0, 2, filas),
+        "Pclass": rng.choice([1, 2, 3], filas, p=[0.24, 0.21, 0.55]),
+        "Name": "Pasajero " + pd.Series(identificadores).astype(str),
+        "Sex": rng.choice(["male", "female"], filas, p=[0.65, 0.35]),
+        "Age": con_faltantes(np.clip(rng.normal(30, 14, filas), 0.42, 80).round(1)),
+        "SibSp": rng.poisson(0.5, filas),
+        "Parch": rng.poisson(0.4, filas),
+        "Ticket": "T" + pd.Series(rng.integers(0, cardinalidad, filas)).astype(str),
+        "Fare": con_atipicos(rng.exponential(32, filas).round(4)),
+        "Cabin": con_faltantes("C" + pd.Series(rng.integers(0, cardinalidad, filas)).astype(str)),
+        "Embarked": con_faltantes(rng.choice(["S", "C", "Q"], filas, p=[0.72, 0.19, 0.09])),
+    })
+    for i in range(columnas_extra):
+        df[f"extra{i}"] = con_faltantes(con_atipicos(rng.normal(0, 1, filas)))
+    return df
+
+
+def generar_bloques(filas, tamano_bloque, semilla=0, **opciones):
+    """
+    Genera los datos sintéticos por bloques, para tamaños que no caben en memoria.
+
+    Parámetros:
+        filas (int): Número total de filas.
+        tamano_bloque (int): Número de filas por bloque.
+        semilla (int): Semilla del primer bloque; cada bloque usa la siguiente.
+        **opciones: Resto de argumentos de `generar_titanic`.
+
+    Retorna:
+        generator: Bloques (pd.DataFrame), en orden.
+    """
+    for indice, inicio in enumerate(range(0, filas, tamano_bloque)):
+        yield generar_titanic(min(tamano_bloque, filas - inicio), semilla=semilla + indice, inicio=inicio, **opciones)
+
+
+def escribir_datos(ruta, formato, bloques):
+    """
+    Escribe los bloques de datos en un archivo del formato indicado, de uno en uno.
+    """
+    if formato == "csv":
+        escribir_csv(ruta, bloques)
+    elif formato in ("parquet", "feather"):
+        escribir_bloques_columnar(ruta, bloques, formato)
+    elif formato == "sqlite":
+        with contextlib.closing(sqlite3.connect(ruta)) as conexion:
+            for bloque in bloques:
+                bloque.to_sql("train", conexion, index=False, if_exists="append")
+            conexion.commit()
+    else:
+        pd.concat(bloques, ignore_index=True).to_excel(ruta, index=False)
+
+
+def medir(funcion, repeticiones, preparar=None):
+    """
+    Ejecuta `funcion` varias veces y devuelve el mejor tiempo (s) y el mayor pico de memoria (MB).
+    Si se indica `preparar`, se llama antes de cada repetición (sin medirla) y su resultado se
+    pasa a `funcion`.
+    """
+    mejor, pico = float("inf"), None
+    for _ in range(repeticiones):
+        argumentos = (preparar(),) if preparar is not None else ()
+        reiniciar_pico_rss()
+        inicio = time.perf_counter()
+        funcion(*argumentos)
+        mejor = min(mejor, time.perf_counter() - inicio)
+        memoria = pico_rss_mb()
+        if memoria is not None:
+            pico = max(pico or 0.0, memoria)
+    return mejor, pico
+
+
+class SuiteBenchmark:
+    """
+    Mide el tiempo de cada cargador, cada estrategia de preprocesado y cada exportador sobre
+    datos sintéticos con la forma del Titanic, de varios tamaños y anchos, y compara los
+    resultados con los de una ejecución anterior guardada (la referencia).
+
+    Los tamaños mayores que `filas_memoria` no se cargan completos: se genera un CSV por bloques
+    y se mide el pipeline completo por bloques (ver `EjecutorPipeline`).
+
+    Atributos:
+        directorio (str): Directorio de los archivos generados.
+        repeticiones (int): Repeticiones de cada medición (se guarda la mejor).
+        filas_memoria (int): Tamaño máximo que se procesa en memoria.
+        tamano_bloque (int): Filas por bloque al generar los datos y en el pipeline por bloques.
+        opciones (dict): Argumentos de `generar_titanic` (faltantes, cardinalidad, atípicos, semilla).
+        resultados (list): Un diccionario por medición.
+    """
+    def __init__(self, directorio, repeticiones=3, filas_memoria=5_000_000, tamano_bloque=1_000_000, **opciones):
+        """
+        Inicializa la suite.
+
+        Parámetros:
+            directorio (str): Directorio donde se escriben los archivos de datos y de salida.
+            repeticiones (int): Repeticiones de cada medición.
+            filas_memoria (int): Tamaño máximo que se procesa en memoria.
+            tamano_bloque (int): Filas por bloque.
+            **opciones: Argumentos de `generar_titanic`.
+        """
+        self.directorio = directorio
+        self.repeticiones = repeticiones
+        self.filas_memoria = filas_memoria
+        self.tamano_bloque = tamano_bloque
+        self.opciones = opciones
+        self.resultados = []
+
+    def ejecutar(self, tamanos, anchos=(0,), grupos=("carga", "preprocesado", "exportacion")):
+        """
+        Ejecuta las mediciones de todos los tamaños y anchos.
+
+        Parámetros:
+            tamanos (iterable): Número de filas de cada dataset.
+            anchos (iterable): Número de columnas extra de cada dataset.
+            grupos (iterable): Grupos de mediciones: "carga", "preprocesado" y "exportacion".
+
+        Retorna:
+            list: Resultados (ver `_registrar`).
+        """
+        for filas in tamanos:
+            for columnas_extra in anchos:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    if filas > self.filas_memoria:
+                        self._medir_bloques(filas, columnas_extra)
+                    else:
+                        self._medir_memoria(filas, columnas_extra, grupos)
+                cerrar_conexiones()
+        return self.resultados
+
+    def _registrar(self, grupo, operacion, filas, columnas_extra, segundos, pico_mb=None):
+        """
+        Añade una medición a los resultados y la muestra.
+        """
+        resultado = {
+            "grupo": grupo, "operacion": operacion, "filas": filas, "columnas_extra": columnas_extra,
+            "segundos": segundos, "filas_por_segundo": filas / segundos if segundos > 0 else None,
+            "pico_rss_mb": pico_mb,
+        }
+        self.resultados.append(resultado)
+        print(f"  {grupo + '/' + operacion:<48}{filas:>12}{columnas_extra:>6}{segundos:>10.3f} s",
+              file=sys.__stdout__)
+
+    def _ruta(self, nombre, filas, columnas_extra, formato):
+        return os.path.join(self.directorio, f"{nombre}_{filas}x{columnas_extra}{EXTENSIONES[formato]}")
+
+    def _medir_memoria(self, filas, columnas_extra, grupos):
+        """
+        Mide la carga de cada formato, cada estrategia de cada paso y la exportación a cada formato.
+        """
+        datos = generar_titanic(filas, columnas_extra, **self.opciones)
+        formatos = [formato for formato in FORMATOS if formato != "excel" or filas <= FILAS_MAX_EXCEL]
+
+        if "carga" in grupos:
+            for formato in formatos:
+                ruta = self._ruta("datos", filas, columnas_extra, formato)
+                escribir_datos(ruta, formato, [datos])
+                opciones = {"tabla": "train"} if formato == "sqlite" else {}
+                segundos, pico = medir(lambda: getattr(DataLoader(), "cargar_" + formato)(ruta, **opciones),
+                                       self.repeticiones)
+                self._registrar("carga", formato, filas, columnas_extra, segundos, pico)
+
+        features = FEATURES + [f"extra{i}" for i in range(columnas_extra)]
+
+        def preparar(hasta):
+            cargador = DataLoader()
+            cargador.dataset = datos.copy()
+            preprocesado = PreprocesadoDatos(cargador)
+            preprocesado.aplicar_seleccion(features, TARGET)
+            for paso in list(ESTRATEGIAS)[:hasta]:
+                getattr(preprocesado, "aplicar_" + paso)(ESTRATEGIAS_PREVIAS[paso])
+            return preprocesado
+
+        if "preprocesado" in grupos:
+            segundos, pico = medir(lambda: preparar(0), self.repeticiones)
+            self._registrar("preprocesado", "seleccion", filas, columnas_extra, segundos, pico)
+            for indice, paso in enumerate(ESTRATEGIAS):
+                for estrategia in ESTRATEGIAS[paso]:
+                    argumentos = ARGUMENTOS.get((paso, estrategia), {})
+                    aplicar = lambda preprocesado: getattr(preprocesado, "aplicar_" + paso)(estrategia, **argumentos)
+                    segundos, pico = medir(aplicar, self.repeticiones, lambda: preparar(indice))
+                    self._registrar("preprocesado", f"{paso}/{estrategia}", filas, columnas_extra, segundos, pico)
+
+        if "exportacion" in grupos:
+            preprocesados = preparar(len(ESTRATEGIAS)).dataset_modificado
+            for formato in formatos:
+                if formato == "sqlite":
+                    continue # La aplicación no exporta a SQLite
+                ruta = self._ruta("salida", filas, columnas_extra, formato)
+                segundos, pico = medir(lambda: ExportarDatos(preprocesados).aplicar_exportacion(ruta, formato),
+                                       self.repeticiones)
+                self._registrar("exportacion", formato, filas, columnas_extra, segundos, pico)
+
+    def _medir_bloques(self, filas, columnas_extra):
+        """
+        Genera un CSV por bloques y mide cada etapa del pipeline completo ejecutado por bloques.
+        """
+        origen = self._ruta("datos", filas, columnas_extra, "csv")
+        escribir_datos(origen, "csv", generar_bloques(filas, self.tamano_bloque, columnas_extra=columnas_extra,
+                                                      **self.opciones))
+        especificacion = {
+            "origen": {"ruta": origen, "tamano_bloque": self.tamano_bloque},
+            "features": FEATURES + [f"extra{i}" for i in range(columnas_extra)],
+            "target": TARGET,
+            "valores_faltantes": "media",
+            "datos_categoricos": "one_hot_uint8",
+            "normalizacion": "z_score",
+            "valores_atipicos": "recortar",
+            "exportar": {"ruta": self._ruta("salida", filas, columnas_extra, "parquet")},
+        }
+        reiniciar_pico_rss()
+        resultado = EjecutorPipeline(especificacion).ejecutar()
+        pico = pico_rss_mb()
+        for etapa, segundos in resultado["tiempos"].items():
+            self._registrar("bloques", etapa, filas, columnas_extra, segundos)
+        self._registrar("bloques", "total", filas, columnas_extra, resultado["total"], pico)
+
+    def guardar(self, ruta):
+        """
+        Guarda los resultados en un archivo JSON, junto con la descripción del entorno y de los datos.
+
+        Parámetros:
+            ruta (str): Ruta del archivo de resultados.
+        """
+        contenido = {
+            "entorno": {
+                "python": platform.python_version(), "pandas": pd.__version__, "numpy": np.__version__,
+                "sistema": platform.platform(), "cpus": os.cpu_count(),
+            },
+            "repeticiones": self.repeticiones,
+            "datos": self.opciones,
+            "resultados": self.resultados,
+        }
+        with open(ruta, "w", encoding="utf-8") as archivo:
+            json.dump(contenido, archivo, ensure_ascii=False, indent=2)
+
+
+def comparar(resultados, referencia, tolerancia=0.25, minimo=0.01):
+    """
+    Compara unos resultados con los de referencia (de la misma operación, tamaño y ancho).
+
+    Parámetros:
+        resultados (list): Resultados actuales (ver `SuiteBenchmark.resultados`).
+        referencia (list): Resultados de referencia.
+        tolerancia (float): Aumento relativo del tiempo a partir del cual se considera una regresión.
+        minimo (float): Diferencia mínima en segundos para considerar una regresión (evita falsos
+            positivos en las mediciones muy cortas).
+
+    Retorna:
+        list: Un diccionario por medición presente en ambos, con "grupo", "operacion", "filas",
+            "columnas_extra", "segundos", "referencia", "cambio" (relativo) y "regresion" (bool).
+    """
+    clave = lambda resultado: (resultado["grupo"], resultado["operacion"], resultado["filas"], resultado["columnas_extra"])
+    anteriores = {clave(resultado): resultado["segundos"] for resultado in referencia}
+    comparacion = []
+    for resultado in resultados:
+        anterior = anteriores.get(clave(resultado))
+        if anterior is None:
+            continue
+        cambio = resultado["segundos"] / anterior - 1 if anterior > 0 else 0.0
+        comparacion.append({
+            "grupo": resultado["grupo"], "operacion": resultado["operacion"], "filas": resultado["filas"],
+            "columnas_extra": resultado["columnas_extra"], "segundos": resultado["segundos"],
+            "referencia": anterior, "cambio": cambio,
+            "regresion": cambio > tolerancia and resultado["segundos"] - anterior > minimo,
+        })
+    return comparacion
+
+
+def mostrar_comparacion(comparacion):
+    """
+    Muestra la comparación con la referencia y devuelve el número de regresiones.
+    """
+    print(f"\n{'Operación':<48}{'Filas':>12}{'Extra':>6}{'Ref. (s)':>10}{'Actual (s)':>12}{'Cambio':>9}")
+    for fila in comparacion:
+        marca = "  REGRESIÓN" if fila["regresion"] else ""
+        print(f"{fila['grupo'] + '/' + fila['operacion']:<48}{fila['filas']:>12}{fila['columnas_extra']:>6}"
+              f"{fila['referencia']:>10.3f}{fila['segundos']:>12.3f}{fila['cambio']:>+9.0%}{marca}")
+    regresiones = sum(fila["regresion"] for fila in comparacion)
+    print(f"\n{regresiones} regresiones en {len(comparacion)} mediciones comparadas.")
+    return regresiones
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de la carga, el preprocesado y la exportación con datos sintéticos.")
+    parser.add_argument("--filas", type=lambda valor: int(float(valor)), nargs="+", default=[10_000, 100_000],
+                        help="Tamaños de los datasets (se admite notación científica: 1e6).")
+    parser.add_argument("--columnas-extra", type=int, nargs="+", default=[0], help="Columnas numéricas adicionales.")
+    parser.add_argument("--faltantes", type=float, default=0.2)
+    parser.add_argument("--cardinalidad", type=int, default=50)
+    parser.add_argument("--atipicos", type=float, default=0.01)
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--grupos", nargs="+", default=["carga", "preprocesado", "exportacion"],
+                        choices=["carga", "preprocesado", "exportacion"])
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--filas-memoria", type=lambda valor: int(float(valor)), default=5_000_000,
+                        help="Los tamaños mayores se miden con el pipeline por bloques.")
+    parser.add_argument("--tamano-bloque", type=lambda valor: int(float(valor)), default=1_000_000)
+    parser.add_argument("--directorio", help="Directorio de los archivos generados (por defecto, uno temporal).")
+    parser.add_argument("--resultados", default="resultados_benchmark.json", help="Archivo JSON de resultados.")
+    parser.add_argument("--referencia", help="Resultados anteriores con los que comparar.")
+    parser.add_argument("--tolerancia", type=float, default=0.25, help="Aumento relativo considerado regresión.")
+    argumentos = parser.parse_args()
+
+    with contextlib.ExitStack() as pila:
+        directorio = argumentos.directorio or pila.enter_context(tempfile.TemporaryDirectory())
+        suite = SuiteBenchmark(directorio, argumentos.repeticiones, argumentos.filas_memoria, argumentos.tamano_bloque,
+                               faltantes=argumentos.faltantes, cardinalidad=argumentos.cardinalidad,
+                               atipicos=argumentos.atipicos, semilla=argumentos.semilla)
+        print(f"{'Operación':<50}{'Filas':>12}{'Extra':>6}{'Mejor de ' + str(argumentos.repeticiones):>12}")
+        suite.ejecutar(argumentos.filas, argumentos.columnas_extra, argumentos.grupos)
+    suite.guardar(argumentos.resultados)
+    print(f"Resultados guardados en {argumentos.resultados}.")
+
+    if argumentos.referencia:
+        with open(argumentos.referencia, encoding="utf-8") as archivo:
+            referencia = json.load(archivo)["resultados"]
+        if mostrar_comparacion(comparar(suite.resultados, referencia, argumentos.tolerancia)):
+            sys.exit(1)
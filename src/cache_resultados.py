@@ -0,0 +1,320 @@
+import hashlib
+import os
+import pickle
+import tempfile
+import time
+
+import numpy as np
+
+from formato_columnar import escribir_feather, leer_feather
+
+DIRECTORIO_CACHE = ".cache_preprocesado"
+EXTENSION = ".pkl"
+EXTENSION_FEATHER = ".feather"
+
+
+def calcular_clave(*partes):
+    """
+    Calcula una clave de caché (hash SHA-256 en hexadecimal) a partir de cualquier
+    combinación de valores serializables con pickle.
+    """
+    return hashlib.sha256(pickle.dumps(partes, protocol=4)).hexdigest()
+
+
+def huella_archivo(ruta, contenido=False):
+    """
+    Devuelve una huella del archivo que cambia cuando cambia el archivo.
+
+    Parámetros:
+        ruta (str): Ruta del archivo.
+        contenido (bool): Si es True, la huella es un hash del contenido (se lee el archivo completo)
+            y no depende de la ruta ni de la fecha de modificación. Si es False, se usan la ruta,
+            el tamaño y la fecha de modificación, que se obtienen sin leer el archivo.
+
+    Retorna:
+        tuple: Huella del archivo.
+    """
+    info = os.stat(ruta)
+    if not contenido:
+        return ("archivo", os.path.abspath(ruta), info.st_size, info.st_mtime_ns)
+    resumen = hashlib.sha256()
+    with open(ruta, "rb") as archivo:
+        for fragmento in iter(lambda: archivo.read(1024 * 1024), b""):
+            resumen.update(fragmento)
+    return ("contenido", info.st_size, resumen.hexdigest())
+
+
+class AlmacenCache:
+    """
+    Caché en disco direccionada por contenido: cada entrada se guarda en un archivo cuyo nombre
+    es su clave (ver `calcular_clave`), serializada con pickle, que guarda los DataFrames en
+    binario y se lee sin volver a analizar los datos.
+
+    Cuando se supera el tamaño máximo o el número máximo de entradas, se eliminan las entradas
+    usadas hace más tiempo (LRU); la fecha de modificación de cada archivo indica su último uso.
+    Las escrituras son atómicas, por lo que varios procesos pueden compartir el directorio.
+
+    Atributos:
+        directorio (str): Directorio de la caché.
+        tamano_maximo (int): Tamaño máximo total en bytes.
+        max_entradas (int): Número máximo de entradas (None para no limitarlo).
+        aciertos (int): Lecturas encontradas en la caché.
+        fallos (int): Lecturas no encontradas.
+    """
+    def __init__(self, directorio=DIRECTORIO_CACHE, tamano_maximo_mb=1024, max_entradas=None):
+        """
+        Inicializa la caché y crea su directorio si no existe.
+
+        Parámetros:
+            directorio (str): Directorio de la caché.
+            tamano_maximo_mb (float): Tamaño máximo total en MB.
+            max_entradas (int, opcional): Número máximo de entradas.
+        """
+        self.directorio = directorio
+        self.tamano_maximo = int(tamano_maximo_mb * 1024 ** 2)
+        self.max_entradas = max_entradas
+        self.aciertos = 0
+        self.fallos = 0
+        os.makedirs(directorio, exist_ok=True)
+
+    def _ruta(self, clave, extension=EXTENSION):
+        """
+        Devuelve la ruta del archivo de una entrada.
+        """
+        return os.path.join(self.directorio, clave + extension)
+
+    def contiene(self, clave):
+        """
+        Indica si hay una entrada con la clave dada.
+        """
+        return os.path.exists(self._ruta(clave)) or os.path.exists(self._ruta(clave, EXTENSION_FEATHER))
+
+    def obtener(self, clave, defecto=None):
+        """
+        Devuelve el valor guardado con la clave dada y lo marca como usado recientemente.
+
+        Parámetros:
+            clave (str): Clave de la entrada.
+            defecto: Valor devuelto si la entrada no existe o no se puede leer.
+        """
+        ruta = self._ruta(clave)
+        try:
+            with open(ruta, "rb") as archivo:
+                valor = pickle.load(archivo)
+        except FileNotFoundError:
+            self.fallos += 1
+            return defecto
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            self._eliminar(ruta) # Entrada dañada o de una versión incompatible
+            self.fallos += 1
+            return defecto
+        try:
+            os.utime(ruta) # Último uso, para la política LRU
+        except OSError:
+            pass
+        self.aciertos += 1
+        return valor
+
+    def guardar(self, clave, valor):
+        """
+        Guarda un valor con la clave dada y elimina las entradas más antiguas si se supera el límite.
+
+        Parámetros:
+            clave (str): Clave de la entrada.
+            valor: Valor serializable con pickle.
+        """
+        def escribir(temporal):
+            with open(temporal, "wb") as archivo:
+                pickle.dump(valor, archivo, protocol=pickle.HIGHEST_PROTOCOL)
+        self._escribir(clave, EXTENSION, escribir)
+
+    def _escribir(self, clave, extension, escribir):
+        """
+        Escribe una entrada en un archivo temporal con `escribir(ruta)` y lo renombra de forma
+        atómica a su nombre definitivo; después, aplica los límites de tamaño.
+        """
+        descriptor, temporal = tempfile.mkstemp(dir=self.directorio, suffix=".tmp")
+        os.close(descriptor)
+        try:
+            escribir(temporal)
+            os.replace(temporal, self._ruta(clave, extension))
+        except BaseException:
+            self._eliminar(temporal)
+            raise
+        self._liberar_espacio()
+
+    def guardar_dataframe(self, clave, df):
+        """
+        Guarda un DataFrame en formato Feather sin compresión, que después se lee proyectándolo
+        en memoria. Si no se puede (pyarrow no está instalado, nombres de columna que no son
+        texto, columnas con tipos mezclados...), se guarda con pickle.
+
+        Parámetros:
+            clave (str): Clave de la entrada.
+            df (pd.DataFrame): Datos a guardar.
+        """
+        try:
+            self._escribir(clave, EXTENSION_FEATHER, lambda temporal: escribir_feather(df.reset_index(drop=True), temporal, "none"))
+        except Exception:
+            self.guardar(clave, df)
+
+    def obtener_dataframe(self, clave):
+        """
+        Devuelve el DataFrame guardado con `guardar_dataframe`, o None si no existe.
+        """
+        ruta = self._ruta(clave, EXTENSION_FEATHER)
+        if not os.path.exists(ruta):
+            return self.obtener(clave)
+        try:
+            df = leer_feather(ruta, memory_map=True)
+        except Exception:
+            self._eliminar(ruta)
+            self.fallos += 1
+            return None
+        for columna in df.columns[df.dtypes == object]:
+            # Feather devuelve None en las columnas de texto donde pandas usa NaN al analizar el archivo
+            df[columna] = df[columna].where(df[columna].notna(), np.nan)
+        os.utime(ruta)
+        self.aciertos += 1
+        return df
+
+    def _entradas(self):
+        """
+        Devuelve las entradas como tuplas (último uso, tamaño, ruta), de la más antigua a la más reciente.
+        """
+        entradas = []
+        for nombre in os.listdir(self.directorio):
+            if nombre.endswith((EXTENSION, EXTENSION_FEATHER)):
+                ruta = os.path.join(self.directorio, nombre)
+                try:
+                    info = os.stat(ruta)
+                except FileNotFoundError: # Eliminada por otro proceso
+                    continue
+                entradas.append((info.st_mtime_ns, info.st_size, ruta))
+        return sorted(entradas)
+
+    def _liberar_espacio(self):
+        """
+        Elimina las entradas usadas hace más tiempo hasta cumplir los límites de tamaño y número.
+        """
+        entradas = self._entradas()
+        total = sum(tamano for _, tamano, _ in entradas)
+        while entradas and (total > self.tamano_maximo or
+                            (self.max_entradas is not None and len(entradas) > self.max_entradas)):
+            _, tamano, ruta = entradas.pop(0)
+            self._eliminar(ruta)
+            total -= tamano
+
+    def _eliminar(self, ruta):
+        """
+        Elimina un archivo de la caché si existe.
+        """
+        try:
+            os.remove(ruta)
+        except FileNotFoundError:
+            pass
+
+    def limpiar(self):
+        """
+        Elimina todas las entradas de la caché.
+        """
+        for _, _, ruta in self._entradas():
+            self._eliminar(ruta)
+
+    def estadisticas(self):
+        """
+        Devuelve el número de entradas, el tamaño total en bytes y los aciertos y fallos de lectura.
+        """
+        entradas = self._entradas()
+        return {
+            "entradas": len(entradas),
+            "bytes": sum(tamano for _, tamano, _ in entradas),
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+        }
+
+
+class CacheFuentes:
+    """
+    Caché de archivos de datos ya analizados (por ejemplo, libros Excel, cuya lectura es lenta),
+    para que una segunda carga del mismo archivo sin cambios sea una lectura proyectada en memoria.
+
+    Los datos se guardan una sola vez por contenido: la clave es el hash del contenido del archivo
+    y las opciones de lectura. Para no leer el archivo completo en cada carga, se guarda además un
+    índice por ruta, tamaño y fecha de modificación; si estos cambian (por ejemplo, el archivo se ha
+    copiado o tocado sin modificarlo) se calcula el hash del contenido y, si coincide, se reutilizan
+    los datos. Con `verificar_contenido=True` el hash se comprueba siempre.
+
+    Atributos:
+        almacen (AlmacenCache): Almacén en disco compartido (con su política de expulsión LRU).
+        verificar_contenido (bool): Calcular siempre el hash del contenido.
+        aciertos (int): Cargas servidas desde la caché.
+        fallos (int): Cargas en las que hubo que analizar el archivo.
+        segundos_analisis (float): Tiempo total dedicado a analizar archivos.
+        segundos_cache (float): Tiempo total dedicado a leer datos de la caché.
+    """
+    def __init__(self, almacen=None, verificar_contenido=False):
+        """
+        Inicializa la caché de fuentes.
+
+        Parámetros:
+            almacen (AlmacenCache, opcional): Almacén donde guardar los datos; por defecto, uno nuevo en `DIRECTORIO_CACHE`.
+            verificar_contenido (bool): Calcular siempre el hash del contenido del archivo.
+        """
+        self.almacen = almacen if almacen is not None else AlmacenCache()
+        self.verificar_contenido = verificar_contenido
+        self.aciertos = 0
+        self.fallos = 0
+        self.segundos_analisis = 0.0
+        self.segundos_cache = 0.0
+
+    def cargar(self, ruta, opciones, leer):
+        """
+        Devuelve los datos del archivo desde la caché o, si no están, los lee con `leer` y los guarda.
+
+        Parámetros:
+            ruta (str): Ruta del archivo de datos.
+            opciones: Formato y opciones de lectura (forman parte de la clave).
+            leer (callable): Función sin argumentos que analiza el archivo y devuelve un DataFrame.
+
+        Retorna:
+            pd.DataFrame: Datos del archivo.
+        """
+        inicio = time.perf_counter()
+        clave_indice = calcular_clave("indice", huella_archivo(ruta), opciones)
+        indice = None if self.verificar_contenido else self.almacen.obtener(clave_indice)
+        clave_datos = indice
+        if clave_datos is None:
+            clave_datos = calcular_clave("datos", huella_archivo(ruta, contenido=True), opciones)
+        df = self.almacen.obtener_dataframe(clave_datos)
+        if df is not None:
+            if indice != clave_datos:
+                # Solo se escribe el índice si falta o ha cambiado; en un acierto basta con la fecha de
+                # último uso que actualiza `obtener`, sin escribir en la ruta de lectura
+                self.almacen.guardar(clave_indice, clave_datos)
+            self.aciertos += 1
+            self.segundos_cache += time.perf_counter() - inicio
+            return df
+
+        inicio = time.perf_counter()
+        df = leer()
+        self.segundos_analisis += time.perf_counter() - inicio
+        self.fallos += 1
+        self.almacen.guardar_dataframe(clave_datos, df)
+        self.almacen.guardar(clave_indice, clave_datos)
+        return df
+
+    def estadisticas(self):
+        """
+        Devuelve los aciertos y fallos de carga, los tiempos de análisis y de lectura desde la
+        caché, y el número de entradas y el tamaño del almacén.
+        """
+        almacen = self.almacen.estadisticas()
+        return {
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+            "segundos_analisis": self.segundos_analisis,
+            "segundos_cache": self.segundos_cache,
+            "entradas": almacen["entradas"],
+            "bytes": almacen["bytes"],
+        }
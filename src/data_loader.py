@@ -1,78 +1,409 @@
+import numpy as np
 import pandas as pd
-import sqlite3
 import os
 
+from fuente_sqlite import FuenteSQLite
+from formato_columnar import columnas_columnar, es_feather, es_parquet, leer_feather, leer_parquet, leer_parquet_bloques
+from perfilado import medir_etapa
+
+
+def optimizar_tipos(df, umbral_categorias=0.5):
+    """
+    Devuelve una versión del DataFrame con tipos de datos que ocupan menos memoria:
+    - Enteros: al tipo entero con signo más pequeño que admite sus valores.
+    - Decimales: a float32 solo si la conversión no pierde precisión.
+    - Texto (object): a `category` si la proporción de valores distintos no supera `umbral_categorias`.
+
+    Parámetros:
+    df (pd.DataFrame): Datos a optimizar.
+    umbral_categorias (float): Proporción máxima de valores distintos para convertir a categoría.
+
+    Retorna:
+    pd.DataFrame: Datos con los tipos optimizados.
+    """
+    columnas = {}
+    for col in df.columns:
+        serie = df[col]
+        if pd.api.types.is_bool_dtype(serie):
+            columnas[col] = serie
+        elif pd.api.types.is_integer_dtype(serie):
+            columnas[col] = pd.to_numeric(serie, downcast="integer")
+        elif pd.api.types.is_float_dtype(serie) and serie.dtype != np.float32:
+            reducida = serie.astype(np.float32)
+            # Solo se reduce si todos los valores se conservan exactamente
+            if np.array_equal(reducida.to_numpy(dtype=np.float64), serie.to_numpy(dtype=np.float64), equal_nan=True):
+                columnas[col] = reducida
+            else:
+                columnas[col] = serie
+        elif serie.dtype == 'object' and len(serie) > 0 and serie.nunique() / len(serie) <= umbral_categorias:
+            columnas[col] = serie.astype("category")
+        else:
+            columnas[col] = serie
+    return pd.DataFrame(columnas, index=df.index)
+
+
+def tipo_comun(tipo, otro):
+    """
+    Devuelve el tipo más estrecho que admite sin pérdida los valores de dos tipos de datos
+    (por ejemplo, int8 e int16 dan int16, e int8 y float32 dan float32). `category` con `category` u
+    `object` da `category`, que admite cualquier valor; `category` con otro tipo da `object`.
+    """
+    if tipo == otro:
+        return tipo
+    categoricos = [isinstance(t, pd.CategoricalDtype) for t in (tipo, otro)]
+    if any(categoricos):
+        restante = otro if categoricos[0] else tipo
+        if isinstance(restante, pd.CategoricalDtype) or restante == object:
+            return pd.CategoricalDtype() # Las categorías de cada bloque son las suyas
+        return np.dtype(object)
+    return pd.concat([pd.Series(dtype=tipo), pd.Series(dtype=otro)]).dtype # Reglas de promoción de pandas
+
+
+def tipos_bloques(bloques):
+    """
+    Recorre los bloques de un archivo y devuelve, para cada columna, el tipo optimizado que admite
+    los valores de todos ellos: el más ancho de los que da `optimizar_tipos` en cada bloque.
+
+    Parámetros:
+    bloques (iterable): Bloques del archivo (pd.DataFrame).
+
+    Retorna:
+    dict: Tipo de dato de cada columna.
+    """
+    tipos = {}
+    for bloque in bloques:
+        for col, tipo in optimizar_tipos(bloque).dtypes.items():
+            tipos[col] = tipo_comun(tipos[col], tipo) if col in tipos else tipo
+    return tipos
+
+
+def aplicar_tipos(df, tipos):
+    """
+    Convierte las columnas de un bloque a los tipos comunes a todos los bloques (ver `tipos_bloques`),
+    de modo que todos los bloques de un archivo leído por bloques tienen exactamente los mismos tipos.
+    Como esos tipos admiten los valores de todos los bloques, la conversión no pierde valores. Las
+    columnas `category` toman las categorías del propio bloque.
+
+    Parámetros:
+    df (pd.DataFrame): Bloque de datos.
+    tipos (dict): Tipo de dato de cada columna.
+
+    Retorna:
+    pd.DataFrame: Bloque con los tipos convertidos.
+    """
+    return df.astype({col: tipos[col] for col in df.columns if col in tipos and df[col].dtype != tipos[col]})
+
+
 class DataLoader:
     """
     Clase responsable de cargar conjuntos de datos desde distintos formatos:
-    CSV, Excel y bases de datos SQLite. También proporciona una función para mostrar
+    CSV, Excel, Parquet, Feather y bases de datos SQLite. También proporciona una función para mostrar
     información básica del dataset cargado.
     """
-    def __init__(self):
+    def __init__(self, optimizar_memoria=False, cache=None):
         """
         Inicializa el objeto DataLoader con un dataset vacío.
+
+        Parámetros:
+        optimizar_memoria (bool): Si es True, tras cada carga se reducen los tipos de datos
+            (ver `optimizar_tipos`) y se muestra la memoria antes y después.
+        cache (CacheFuentes, opcional): Caché de archivos CSV y Excel ya analizados; al volver a cargar
+            un archivo sin cambios, los datos se leen de la caché en lugar de analizarlo otra vez.
         """
         self.dataset = None
+        self.optimizar_memoria = optimizar_memoria
+        self.cache = cache
+        self.archivo_bloques = None # Ruta del archivo cuando se carga en modo por bloques
+        self.tamano_bloque = None # Número de filas por bloque en modo por bloques
+        self._lector_bloques = None # Función que abre de nuevo la lectura por bloques del archivo
+        self.origen = None # Archivo y opciones de la última carga (identifican los datos en la caché de resultados)
 
-    def cargar_csv(self, archivo):
+    def _registrar_origen(self, archivo, formato, **opciones):
+        """
+        Guarda el archivo, el formato y las opciones de la carga que se acaba de hacer.
+        """
+        opciones["optimizar_memoria"] = self.optimizar_memoria
+        if not opciones.get("tamano_bloque"): # Una carga completa desactiva el modo por bloques anterior
+            self.archivo_bloques = self.tamano_bloque = self._lector_bloques = None
+        self.origen = {"ruta": archivo, "formato": formato, "opciones": opciones}
+
+    def optimizar_dataset(self):
+        """
+        Reduce los tipos de datos del dataset cargado para que ocupe menos memoria
+        y muestra la memoria ocupada antes y después.
+
+        En modo por bloques el dataset es la muestra del primer bloque: se recorre una vez el archivo
+        para elegir los tipos que admiten los valores de todos los bloques (ver `tipos_bloques`), y la
+        muestra y cada bloque que se lea después con `iterar_bloques` se convierten a esos mismos tipos.
+        """
+        if self.dataset is None:
+            return
+        antes = self.dataset.memory_usage(deep=True).sum()
+        if self.archivo_bloques is not None:
+            # Una pasada por el archivo fija los tipos que admiten los valores de todos los bloques
+            tipos, lector = tipos_bloques(self._lector_bloques()), self._lector_bloques
+            self._lector_bloques = lambda: (aplicar_tipos(bloque, tipos) for bloque in lector())
+            self.dataset = aplicar_tipos(self.dataset, tipos)
+        else:
+            self.dataset = optimizar_tipos(self.dataset)
+        despues = self.dataset.memory_usage(deep=True).sum()
+        print(f"Memoria del dataset: {antes / 1024 ** 2:.2f} MB -> {despues / 1024 ** 2:.2f} MB "
+              f"({antes / max(despues, 1):.1f} veces menor)")
+
+    def obtener_columnas(self, archivo, tabla=None):
+        """
+        Devuelve los nombres de las columnas de un archivo sin cargar sus datos.
+
+        Parámetros:
+        archivo (str): Ruta al archivo CSV, Excel, Parquet, Feather o base de datos SQLite.
+        tabla (str, opcional): Tabla de la base de datos SQLite.
+
+        Retorna:
+        list: Nombres de las columnas.
+        """
+        if tabla is not None:
+            return FuenteSQLite(archivo).columnas(tabla)
+        if os.path.splitext(archivo)[1].lower() in (".xlsx", ".xls"):
+            return list(pd.read_excel(archivo, nrows=0).columns)
+        if es_parquet(archivo) or es_feather(archivo):
+            return columnas_columnar(archivo) # Solo se lee el esquema
+        return list(pd.read_csv(archivo, nrows=0).columns)
+
+    @medir_etapa(salida="dataset", archivo_leido="archivo")
+    def cargar_csv(self, archivo, tamano_bloque=None, columnas=None, tipos=None):
         """
         Carga un archivo CSV y lo asigna al atributo `dataset`.
 
+        Si se indica `tamano_bloque`, el archivo no se lee completo: `dataset` contiene solo
+        el primer bloque como muestra y el resto se recorre después con `iterar_bloques`.
+
         Parámetros:
         archivo (str): Ruta al archivo CSV.
+        tamano_bloque (int, opcional): Número de filas por bloque para archivos grandes.
+        columnas (list, opcional): Columnas a leer; el resto no se analiza ni se guarda en memoria.
+        tipos (dict, opcional): Tipo de dato de cada columna (por ejemplo, {"Sex": "category"}).
         """
         if not os.path.exists(archivo):
             print("Archivo no encontrado.")
             return None
         try:
-            self.dataset = pd.read_csv(archivo) # Intenta leer el archivo CSV con pandas
+            if tamano_bloque:
+                self._activar_bloques(archivo, tamano_bloque, lambda: self.leer_csv_bloques(archivo, tamano_bloque, columnas, tipos))
+            else:
+                self.dataset = self._leer_archivo(archivo, ("csv", columnas, tipos),
+                                                  lambda: pd.read_csv(archivo, usecols=columnas, dtype=tipos)) # Intenta leer el archivo CSV con pandas
         except Exception as e:
             print(f"Error al cargar el archivo CSV: {e}")
             return None
+        self._registrar_origen(archivo, "csv", tamano_bloque=tamano_bloque, columnas=columnas, tipos=tipos)
+        if self.optimizar_memoria:
+            self.optimizar_dataset()
+
+    def _leer_archivo(self, archivo, opciones, leer):
+        """
+        Lee un archivo con `leer`, o lo toma de la caché de archivos analizados si está activada.
+        """
+        if self.cache is None:
+            return leer()
+        return self.cache.cargar(archivo, opciones, leer)
+
+    def mostrar_estadisticas_cache(self):
+        """
+        Muestra las estadísticas de la caché de archivos analizados.
+        """
+        if self.cache is None:
+            print("La caché de archivos no está activada (ejecute el programa con --cache).")
+            return
+        estadisticas = self.cache.estadisticas()
+        print("Caché de archivos analizados:")
+        print(f"  Cargas desde la caché: {estadisticas['aciertos']} ({estadisticas['segundos_cache']:.2f} s)")
+        print(f"  Archivos analizados: {estadisticas['fallos']} ({estadisticas['segundos_analisis']:.2f} s)")
+        print(f"  Entradas: {estadisticas['entradas']} ({estadisticas['bytes'] / 1024 ** 2:.2f} MB de "
+              f"{self.cache.almacen.tamano_maximo / 1024 ** 2:.0f} MB)")
+
+    def leer_csv_bloques(self, archivo, tamano_bloque, columnas=None, tipos=None):
+        """
+        Lee un archivo CSV por bloques de filas sin cargarlo completo en memoria.
+
+        Parámetros:
+        archivo (str): Ruta al archivo CSV.
+        tamano_bloque (int): Número de filas por bloque.
+        columnas (list, opcional): Columnas a leer.
+        tipos (dict, opcional): Tipo de dato de cada columna.
 
-    def cargar_excel(self, archivo):
+        Retorna:
+        generator: Bloques del archivo (pd.DataFrame), en orden.
+        """
+        with pd.read_csv(archivo, chunksize=tamano_bloque, usecols=columnas, dtype=tipos) as lector:
+            for bloque in lector:
+                yield bloque
+
+    def _activar_bloques(self, archivo, tamano_bloque, lector):
+        """
+        Activa el modo por bloques: guarda cómo volver a leer el archivo y carga solo el primer bloque como muestra.
+        """
+        self._lector_bloques = lector
+        self.dataset = next(lector()) # Solo se lee el primer bloque
+        self.archivo_bloques = archivo
+        self.tamano_bloque = tamano_bloque
+        print(f"Modo por bloques de {tamano_bloque} filas: se muestra el primer bloque, el resto se procesa al exportar.")
+
+    def iterar_bloques(self):
+        """
+        Recorre desde el principio el archivo cargado en modo por bloques.
+
+        Retorna:
+        generator: Bloques del archivo (pd.DataFrame), en orden.
+        """
+        return self._lector_bloques()
+
+    @medir_etapa(salida="dataset", archivo_leido="archivo")
+    def cargar_excel(self, archivo, columnas=None, tipos=None):
         """
         Carga un archivo Excel y lo asigna al atributo `dataset`.
 
         Parámetros:
         archivo (str): Ruta al archivo Excel.
+        columnas (list, opcional): Columnas a leer; el resto no se analiza ni se guarda en memoria.
+        tipos (dict, opcional): Tipo de dato de cada columna.
         """
         if not os.path.exists(archivo):
             print("Archivo no encontrado.")
             return None
         try:
-            self.dataset = pd.read_excel(archivo) # Intenta leer el archivo Excel con pandas
+            self.dataset = self._leer_archivo(archivo, ("excel", columnas, tipos),
+                                              lambda: pd.read_excel(archivo, usecols=columnas, dtype=tipos)) # Intenta leer el archivo Excel con pandas
         except Exception as e:
             print(f"Error al cargar el archivo Excel: {e}")
             return None
+        self._registrar_origen(archivo, "excel", columnas=columnas, tipos=tipos)
+        if self.optimizar_memoria:
+            self.optimizar_dataset()
 
-    def cargar_sqlite(self, archivo):
+    @medir_etapa(salida="dataset", archivo_leido="archivo")
+    def cargar_parquet(self, archivo, columnas=None, filtros=None, tipos=None, tamano_bloque=None, memory_map=True):
         """
-        Carga datos desde una base de datos SQLite, permitiendo al usuario
-        seleccionar una tabla disponible en la base de datos.
+        Carga un archivo Parquet y lo asigna al atributo `dataset`.
+
+        Al ser un formato por columnas, solo se leen del disco las columnas pedidas, y con
+        `filtros` se descartan los grupos de filas que no pueden cumplirlos sin llegar a leerlos.
 
         Parámetros:
-        archivo (str): Ruta al archivo de base de datos SQLite.
+        archivo (str): Ruta al archivo Parquet.
+        columnas (list, opcional): Columnas a leer.
+        filtros (list, opcional): Condiciones (columna, operador, valor) combinadas con AND,
+            por ejemplo [("Pclass", "==", 1), ("Age", ">", 30)].
+        tipos (dict, opcional): Tipo de dato de cada columna.
+        tamano_bloque (int, opcional): Lee el archivo por bloques de filas (ver `cargar_csv`).
+        memory_map (bool): Proyecta el archivo en memoria en lugar de leerlo con lecturas de disco.
         """
         if not os.path.exists(archivo):
-            print("Base de datos no encontrada.")
+            print("Archivo no encontrado.")
+            return None
+        try:
+            if tamano_bloque:
+                self._activar_bloques(archivo, tamano_bloque, lambda: leer_parquet_bloques(archivo, tamano_bloque, columnas, filtros, tipos))
+            else:
+                self.dataset = leer_parquet(archivo, columnas, filtros, tipos, memory_map)
+        except Exception as e:
+            print(f"Error al cargar el archivo Parquet: {e}")
+            return None
+        self._registrar_origen(archivo, "parquet", columnas=columnas, filtros=filtros, tipos=tipos, tamano_bloque=tamano_bloque)
+        if self.optimizar_memoria:
+            self.optimizar_dataset()
+
+    @medir_etapa(salida="dataset", archivo_leido="archivo")
+    def cargar_feather(self, archivo, columnas=None, tipos=None, memory_map=True):
+        """
+        Carga un archivo Feather (Arrow IPC) y lo asigna al atributo `dataset`.
+
+        Parámetros:
+        archivo (str): Ruta al archivo Feather.
+        columnas (list, opcional): Columnas a leer.
+        tipos (dict, opcional): Tipo de dato de cada columna.
+        memory_map (bool): Proyecta el archivo en memoria en lugar de leerlo con lecturas de disco.
+        """
+        if not os.path.exists(archivo):
+            print("Archivo no encontrado.")
             return None
         try:
-            conn = sqlite3.connect(archivo) # Se establece conexión con la base de datos SQLite
-            tablas = pd.read_sql_query("SELECT name FROM sqlite_master WHERE type='table';", conn) # Consulta para obtener el listado de tablas
+            self.dataset = leer_feather(archivo, columnas, tipos, memory_map)
+        except Exception as e:
+            print(f"Error al cargar el archivo Feather: {e}")
+            return None
+        self._registrar_origen(archivo, "feather", columnas=columnas, tipos=tipos)
+        if self.optimizar_memoria:
+            self.optimizar_dataset()
+
+    def seleccionar_tabla(self, archivo):
+        """
+        Muestra las tablas de una base de datos SQLite y pide al usuario que seleccione una.
+
+        Parámetros:
+        archivo (str): Ruta al archivo de base de datos SQLite.
+
+        Retorna:
+        str: Nombre de la tabla seleccionada, o None si la selección no es válida.
+        """
+        try:
+            tablas = FuenteSQLite(archivo).tablas() # Se consulta el listado de tablas
             print("Tablas disponibles en la base de datos:")
-            for idx, tabla in enumerate(tablas['name'], 1):
+            for idx, tabla in enumerate(tablas, 1):
                 print(f"  [{idx}] {tabla}")
             # Se solicita al usuario que seleccione una tabla
             seleccion = int(input("Seleccione una tabla: ")) - 1
-            tabla_seleccionada = tablas.iloc[seleccion]['name']
-            # Se consulta y carga el contenido de la tabla seleccionada
-            query = f"SELECT * FROM {tabla_seleccionada};"
-            self.dataset = pd.read_sql_query(query, conn)
-            conn.close()
+            if not 0 <= seleccion < len(tablas):
+                raise IndexError("tabla fuera de rango")
+            return tablas[seleccion]
+        except Exception as e:
+            print(f"Error al cargar la base de datos SQLite: {e}")
+            return None
+
+    @medir_etapa(salida="dataset", archivo_leido="archivo")
+    def cargar_sqlite(self, archivo, tabla=None, columnas=None, tipos=None, where=None, parametros=(),
+                      limite=None, tamano_bloque=None, hilos=None, inmutable=False):
+        """
+        Carga datos desde una base de datos SQLite, permitiendo al usuario
+        seleccionar una tabla disponible en la base de datos.
+
+        La base de datos se abre en modo de solo lectura y la conexión se reutiliza entre cargas.
+
+        Parámetros:
+        archivo (str): Ruta al archivo de base de datos SQLite.
+        tabla (str, opcional): Tabla a cargar; si no se indica, se pide al usuario.
+        columnas (list, opcional): Columnas a consultar (SELECT col1, col2 ...); por defecto, todas.
+        tipos (dict, opcional): Tipo de dato de cada columna.
+        where (str, opcional): Condición SQL aplicada en la consulta, con parámetros `?`.
+        parametros (tuple): Valores de los parámetros de `where`.
+        limite (int, opcional): Número máximo de filas a leer.
+        tamano_bloque (int, opcional): Lee la tabla por bloques de filas (ver `cargar_csv`).
+        hilos (int, opcional): Lee la tabla en paralelo por rangos de rowid con este número de hilos.
+        inmutable (bool): Abre la base de datos con `immutable=1` (solo si nadie la modifica durante la lectura).
+        """
+        if not os.path.exists(archivo):
+            print("Base de datos no encontrada.")
+            return None
+        if tabla is None:
+            tabla = self.seleccionar_tabla(archivo)
+            if tabla is None:
+                return None
+        fuente = FuenteSQLite(archivo, inmutable)
+        try:
+            # Se consulta y carga solo el contenido necesario de la tabla seleccionada
+            if tamano_bloque:
+                self._activar_bloques(archivo, tamano_bloque, lambda: fuente.leer_bloques(
+                    tabla, tamano_bloque, columnas, where, parametros, limite, tipos))
+            elif hilos and hilos > 1 and limite is None:
+                self.dataset = fuente.leer_paralelo(tabla, hilos, columnas, where, parametros, tipos)
+            else:
+                self.dataset = fuente.leer(tabla, columnas, where, parametros, limite, tipos)
         except Exception as e:
             print(f"Error al cargar la base de datos SQLite: {e}")
             return None
+        self._registrar_origen(archivo, "sqlite", tabla=tabla, columnas=columnas, tipos=tipos, where=where,
+                               parametros=tuple(parametros), limite=limite, tamano_bloque=tamano_bloque)
+        if self.optimizar_memoria:
+            self.optimizar_dataset()
         
     def mostrar_informacion(self):
         """
@@ -0,0 +1,279 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import time
+
+from cache_resultados import AlmacenCache, CacheFuentes
+from data_loader import DataLoader
+from exportador_datos import ExportarDatos
+from perfilado import Perfilador
+from pipeline_ajustado import PipelineAjustado
+from preprocesado_datos import ESTRATEGIAS_CODIFICACION, PreprocesadoDatos
+from visualizador_datos import VisualizadorDatos
+
+# Pasos de preprocesado en el orden en que los aplica el menú, con sus estrategias válidas
+ESTRATEGIAS = {
+    "valores_faltantes": ("eliminar", "media", "mediana", "moda", "constante"),
+    "datos_categoricos": ESTRATEGIAS_CODIFICACION,
+    "normalizacion": ("min_max", "z_score"),
+    "valores_atipicos": ("eliminar", "mediana", "recortar", "mantener"),
+}
+
+FORMATOS_ORIGEN = {
+    ".csv": "csv", ".xlsx": "excel", ".xls": "excel", ".db": "sqlite", ".sqlite": "sqlite", ".sqlite3": "sqlite",
+    ".parquet": "parquet", ".pq": "parquet", ".feather": "feather", ".arrow": "feather",
+}
+
+
+class EjecutorPipeline:
+    """
+    Ejecuta sin interacción con el usuario el mismo pipeline que el menú
+    (carga → selección → faltantes → categóricos → normalización → atípicos → exportación)
+    a partir de una especificación declarativa, y mide el tiempo de cada etapa.
+
+    La especificación es un diccionario (o un archivo JSON) como:
+
+        {
+            "origen": {"ruta": "datafiles/titanic_survival.csv", "tamano_bloque": null},
+            "features": ["Pclass", "Sex", "Age", "Fare"],
+            "target": "Survived",
+            "valores_faltantes": "media",
+            "datos_categoricos": "one_hot",
+            "normalizacion": "z_score",
+            "valores_atipicos": "recortar",
+            "exportar": {"ruta": "salida.parquet", "compresion": "zstd"}
+        }
+
+    Cada paso puede ser el nombre de la estrategia o un diccionario con la clave "estrategia"
+    y los demás argumentos del método `aplicar_*` correspondiente (por ejemplo,
+    {"estrategia": "constante", "constante": 0}). Los pasos que no aparecen no se aplican.
+    Las opciones de "origen" distintas de "ruta" y "formato" se pasan al método de carga
+    de `DataLoader`; si no se indican "columnas", solo se cargan las features y el target.
+    Las claves opcionales "ahorro_memoria", "optimizar_tipos" e "hilos" tienen el mismo
+    significado que las opciones del menú, "cache" activa la caché de archivos analizados y de
+    resultados de cada paso (true o los argumentos de `AlmacenCache`), "guardar_pipeline" indica dónde guardar el
+    pipeline ajustado (ver `PipelineAjustado`) y "perfil" activa el perfilado de cada etapa (ver `Perfilador`):
+    la ruta del JSON con las mediciones o un diccionario con "ruta", "cprofile" y "tracemalloc" (etapas
+    que se perfilan en detalle). "graficos" guarda los gráficos de los datos preprocesados sin pantalla:
+    el directorio o un diccionario con los argumentos de `VisualizadorDatos.guardar_graficos` y,
+    opcionalmente, "max_puntos", "tamano_muestra", "modo_dispersion" y "metodo_correlacion" (ver
+    `VisualizadorDatos`). En modo por bloques, la matriz de correlación se calcula sobre el archivo completo.
+
+    Atributos:
+        especificacion (dict): Especificación validada del pipeline.
+        silencioso (bool): Si es True, no se muestran los mensajes de cada paso.
+        preprocesado (PreprocesadoDatos): Preprocesador de la última ejecución.
+    """
+    def __init__(self, especificacion, silencioso=True):
+        """
+        Valida la especificación del pipeline.
+
+        Parámetros:
+            especificacion (dict): Especificación del pipeline.
+            silencioso (bool): Ocultar los mensajes que muestran los pasos durante la ejecución.
+
+        Lanza:
+            ValueError: Si falta algún dato obligatorio o una estrategia no es válida.
+        """
+        self.especificacion = especificacion
+        self.silencioso = silencioso
+        self.preprocesado = None
+        self._validar()
+
+    @classmethod
+    def desde_json(cls, ruta, silencioso=True):
+        """
+        Crea el ejecutor a partir de un archivo JSON con la especificación.
+        """
+        with open(ruta, encoding="utf-8") as archivo:
+            return cls(json.load(archivo), silencioso)
+
+    def _validar(self):
+        """
+        Comprueba que la especificación tiene las columnas y estrategias necesarias.
+        """
+        espec = self.especificacion
+        if not espec.get("features") or not espec.get("target"):
+            raise ValueError("La especificación debe indicar 'features' y 'target'.")
+        if espec["target"] in espec["features"]:
+            raise ValueError("La columna de salida no puede ser una feature.")
+        for paso, estrategias in ESTRATEGIAS.items():
+            if espec.get(paso) is not None and self._paso(paso)[0] not in estrategias:
+                raise ValueError(f"Estrategia de {paso} no válida: {self._paso(paso)[0]}")
+
+    def _paso(self, paso):
+        """
+        Devuelve la estrategia y los argumentos adicionales de un paso de la especificación.
+        """
+        valor = self.especificacion.get(paso)
+        if isinstance(valor, dict):
+            argumentos = dict(valor)
+            return argumentos.pop("estrategia", None), argumentos
+        return valor, {}
+
+    def ejecutar(self, origen=None, salida=None):
+        """
+        Ejecuta el pipeline completo.
+
+        Parámetros:
+            origen (str, opcional): Archivo de entrada; sustituye a la ruta de la especificación.
+            salida (str, opcional): Archivo de salida; sustituye a la ruta de exportación de la especificación.
+
+        Retorna:
+            dict: "origen", "salida", "filas" y "columnas" del resultado, "tiempos" (segundos por etapa),
+                "total" (segundos) y, si se perfila, "perfil" (ver `Perfilador.resumen`).
+
+        Lanza:
+            ValueError: Si la especificación no se puede aplicar a los datos.
+            RuntimeError: Si no se pueden cargar los datos.
+        """
+        salida_texto = io.StringIO()
+        redireccion = contextlib.redirect_stdout(salida_texto) if self.silencioso else contextlib.nullcontext()
+        perfil = self.especificacion.get("perfil")
+        if not perfil:
+            with redireccion:
+                return self._ejecutar(origen, salida, salida_texto)
+
+        perfil = perfil if isinstance(perfil, dict) else {"ruta": perfil}
+        perfilador = Perfilador(perfil.get("cprofile", ()), perfil.get("tracemalloc", ()))
+        with redireccion, perfilador:
+            resultado = self._ejecutar(origen, salida, salida_texto)
+        resultado["perfil"] = perfilador.resumen()
+        if perfil.get("ruta"):
+            perfilador.exportar_json(perfil["ruta"])
+        return resultado
+
+    def _ejecutar(self, origen, salida, salida_texto):
+        """
+        Cuerpo de `ejecutar`, con los mensajes ya redirigidos si corresponde.
+        """
+        espec = self.especificacion
+        tiempos = {}
+        inicio_total = time.perf_counter()
+
+        def etapa(nombre, funcion, *args, **kwargs):
+            inicio = time.perf_counter()
+            resultado = funcion(*args, **kwargs)
+            tiempos[nombre] = time.perf_counter() - inicio
+            return resultado
+
+        cache = self._cache()
+        data_loader = DataLoader(optimizar_memoria=espec.get("optimizar_tipos", False),
+                                 cache=CacheFuentes(cache) if cache is not None else None)
+        ruta_origen = etapa("carga", self._cargar, data_loader, origen, salida_texto)
+
+        preprocesado = PreprocesadoDatos(data_loader, espec.get("ahorro_memoria", False), espec.get("hilos", 1), cache)
+        self.preprocesado = preprocesado
+        if not etapa("seleccion", preprocesado.aplicar_seleccion, espec["features"], espec["target"]):
+            raise ValueError("Selección de columnas no válida.")
+        for paso in ESTRATEGIAS:
+            estrategia, argumentos = self._paso(paso)
+            if estrategia is not None:
+                etapa(paso, getattr(preprocesado, "aplicar_" + paso), estrategia, **argumentos)
+
+        bloques = None
+        if data_loader.archivo_bloques is not None:
+            # Los parámetros se recalculan sobre el archivo completo antes de transformar cada bloque
+            etapa("ajuste_bloques", preprocesado.ajustar_bloques, data_loader.iterar_bloques)
+            bloques = preprocesado.procesar_bloques(data_loader.iterar_bloques())
+
+        graficos = espec.get("graficos")
+        if graficos:
+            graficos = dict(graficos) if isinstance(graficos, dict) else {"directorio": graficos}
+            opciones = {clave: graficos.pop(clave) for clave in ("max_puntos", "tamano_muestra", "modo_dispersion",
+                                                               "metodo_correlacion") if clave in graficos}
+            if bloques is not None:
+                # La correlación se calcula sobre todos los bloques; el resto de gráficos, sobre la muestra
+                opciones["obtener_bloques"] = lambda: preprocesado.procesar_bloques(data_loader.iterar_bloques())
+            visualizador = VisualizadorDatos(data_loader.dataset, preprocesado.dataset_modificado,
+                                             preprocesado.columnas_seleccionadas, preprocesado.columnas_numericas,
+                                             preprocesado.columnas_categoricas, estadisticas=preprocesado.estadisticas,
+                                             **opciones)
+            etapa("graficos", visualizador.guardar_graficos, **graficos)
+
+        exportar = dict(espec.get("exportar") or {})
+        if salida is not None:
+            exportar["ruta"] = salida
+        if espec.get("guardar_pipeline"):
+            etapa("guardar_pipeline", PipelineAjustado.desde_preprocesado(preprocesado).guardar, espec["guardar_pipeline"])
+
+        filas = len(preprocesado.dataset_modificado)
+        if exportar.get("ruta"):
+            exportador = ExportarDatos(preprocesado.dataset_modificado, bloques)
+            filas = etapa("exportacion", exportador.aplicar_exportacion, exportar["ruta"],
+                          exportar.get("formato"), exportar.get("compresion"), exportar.get("hilos"))
+        elif bloques is not None:
+            filas = etapa("transformacion_bloques", lambda: sum(len(bloque) for bloque in bloques))
+
+        return {
+            "origen": ruta_origen,
+            "salida": exportar.get("ruta"),
+            "filas": filas,
+            "columnas": len(preprocesado.dataset_modificado.columns),
+            "tiempos": tiempos,
+            "total": time.perf_counter() - inicio_total,
+        }
+
+    def _cache(self):
+        """
+        Crea la caché de resultados indicada en la especificación ("cache": true o un diccionario
+        con los argumentos de `AlmacenCache`), o devuelve None si no se usa.
+        """
+        opciones = self.especificacion.get("cache")
+        if not opciones:
+            return None
+        return AlmacenCache(**opciones) if isinstance(opciones, dict) else AlmacenCache()
+
+    def _cargar(self, data_loader, ruta, salida_texto):
+        """
+        Carga el origen de la especificación con el método de `DataLoader` que corresponde a su formato.
+        """
+        opciones = dict(self.especificacion.get("origen") or {})
+        ruta = ruta or opciones.get("ruta")
+        opciones.pop("ruta", None)
+        if not ruta:
+            raise ValueError("La especificación no indica el archivo de origen.")
+        formato = opciones.pop("formato", None) or FORMATOS_ORIGEN.get(os.path.splitext(ruta)[1].lower())
+        if formato not in ("csv", "excel", "sqlite", "parquet", "feather"):
+            raise ValueError(f"Formato de origen no válido: {formato}")
+        if formato == "sqlite" and not opciones.get("tabla"):
+            raise ValueError("Para cargar una base de datos SQLite hay que indicar la 'tabla'.")
+        # Solo se leen las columnas que usa el pipeline
+        opciones.setdefault("columnas", list(self.especificacion["features"]) + [self.especificacion["target"]])
+
+        getattr(data_loader, "cargar_" + formato)(ruta, **opciones)
+        if data_loader.dataset is None:
+            # DataLoader informa del error con un mensaje; se usa como descripción del fallo
+            lineas = [linea for linea in salida_texto.getvalue().splitlines() if linea.strip()]
+            raise RuntimeError(lineas[-1] if lineas else f"No se pudieron cargar los datos de {ruta}.")
+        return ruta
+
+
+def mostrar_resultado(resultado):
+    """
+    Muestra el resumen de una ejecución: filas, columnas y tiempo de cada etapa.
+    """
+    print(f"Origen: {resultado['origen']}")
+    if resultado["salida"]:
+        print(f"Salida: {resultado['salida']}")
+    print(f"Filas: {resultado['filas']}  Columnas: {resultado['columnas']}")
+    print("Tiempo por etapa:")
+    for etapa, segundos in resultado["tiempos"].items():
+        print(f"  {etapa:<24}{segundos:8.3f} s")
+    print(f"  {'total':<24}{resultado['total']:8.3f} s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ejecuta el pipeline de preprocesado sin interacción a partir de una especificación JSON.")
+    parser.add_argument("especificacion", help="Archivo JSON con la especificación del pipeline.")
+    parser.add_argument("--origen", help="Archivo de entrada (sustituye al de la especificación).")
+    parser.add_argument("--salida", help="Archivo de salida (sustituye al de la especificación).")
+    parser.add_argument("--detalle", action="store_true", help="Muestra los mensajes de cada paso.")
+    parser.add_argument("--perfil", help="Archivo JSON donde guardar el perfil de rendimiento de cada etapa.")
+    argumentos = parser.parse_args()
+    ejecutor = EjecutorPipeline.desde_json(argumentos.especificacion, silencioso=not argumentos.detalle)
+    if argumentos.perfil:
+        ejecutor.especificacion["perfil"] = argumentos.perfil
+    mostrar_resultado(ejecutor.ejecutar(argumentos.origen, argumentos.salida))
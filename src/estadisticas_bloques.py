@@ -0,0 +1,535 @@
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+
+class EstadisticasNumericas:
+    """
+    Acumula de forma incremental estadísticas de una columna numérica recorrida por bloques:
+    número de valores, media y varianza (algoritmo de Welford/Chan), mínimo y máximo.
+
+    Los valores faltantes (NaN) se ignoran. Dos acumuladores calculados por separado
+    (por ejemplo, en distintos procesos) se pueden combinar con `combinar`. El resultado
+    coincide con el cálculo en memoria salvo errores de redondeo (del orden de 1e-12 relativo).
+    """
+    def __init__(self):
+        """
+        Inicializa el acumulador vacío.
+        """
+        self.n = 0
+        self.media = 0.0
+        self.m2 = 0.0 # Suma de cuadrados de las desviaciones respecto a la media
+        self.minimo = np.inf
+        self.maximo = -np.inf
+
+    def actualizar(self, valores):
+        """
+        Incorpora un bloque de valores al acumulador.
+
+        Parámetros:
+            valores (array-like): Valores numéricos del bloque.
+        """
+        valores = np.asarray(valores, dtype=float)
+        valores = valores[~np.isnan(valores)]
+        if valores.size == 0:
+            return
+        media_bloque = valores.mean()
+        m2_bloque = ((valores - media_bloque) ** 2).sum()
+        self._combinar_momentos(valores.size, media_bloque, m2_bloque)
+        self.minimo = min(self.minimo, valores.min())
+        self.maximo = max(self.maximo, valores.max())
+
+    def combinar(self, otra):
+        """
+        Incorpora las estadísticas de otro acumulador.
+
+        Parámetros:
+            otra (EstadisticasNumericas): Acumulador calculado sobre otros datos.
+        """
+        if otra.n == 0:
+            return
+        self._combinar_momentos(otra.n, otra.media, otra.m2)
+        self.minimo = min(self.minimo, otra.minimo)
+        self.maximo = max(self.maximo, otra.maximo)
+
+    def _combinar_momentos(self, n_otro, media_otro, m2_otro):
+        """
+        Combina media y suma de cuadrados con las de otro grupo de valores (fórmula de Chan).
+        """
+        n_total = self.n + n_otro
+        delta = media_otro - self.media
+        self.media += delta * n_otro / n_total
+        self.m2 += m2_otro + delta ** 2 * self.n * n_otro / n_total
+        self.n = n_total
+
+    def varianza(self, ddof=0):
+        """
+        Devuelve la varianza de los valores acumulados.
+
+        Parámetros:
+            ddof (int): Grados de libertad restados al denominador (0 = poblacional, 1 = muestral).
+        """
+        if self.n - ddof <= 0:
+            return np.nan
+        return self.m2 / (self.n - ddof)
+
+
+class SketchCuantiles:
+    """
+    Resumen compacto y combinable para estimar cuantiles de una columna numérica
+    recorrida por bloques, basado en compactadores por niveles (esquema KLL).
+
+    Cada nivel guarda como mucho `k` valores; al llenarse, se ordena y se promueve
+    la mitad de sus elementos (posiciones pares o impares al azar) al nivel siguiente,
+    donde cada valor representa el doble de observaciones. La memoria crece con
+    k·log2(n/k) y no con n.
+
+    Mientras no se ha compactado ningún nivel (n <= k) el resultado es exacto e igual
+    al de `pandas.Series.quantile`. A partir de ahí es aproximado: con el valor por
+    defecto k=2048 el error de rango observado es inferior al 0,1 % del número de valores.
+    """
+    def __init__(self, k=2048, semilla=0):
+        """
+        Inicializa el sketch vacío.
+
+        Parámetros:
+            k (int): Capacidad de cada nivel; a mayor k, mayor precisión y memoria.
+            semilla (int): Semilla del generador aleatorio, para resultados reproducibles.
+        """
+        self.k = k
+        self.n = 0
+        self.niveles = [np.empty(0)]
+        self._aleatorio = np.random.default_rng(semilla)
+
+    def actualizar(self, valores):
+        """
+        Incorpora un bloque de valores al sketch, ignorando los valores faltantes.
+
+        Parámetros:
+            valores (array-like): Valores numéricos del bloque.
+        """
+        valores = np.asarray(valores, dtype=float)
+        valores = valores[~np.isnan(valores)]
+        self.n += valores.size
+        self.niveles[0] = np.concatenate([self.niveles[0], valores])
+        self._compactar()
+
+    def combinar(self, otro):
+        """
+        Incorpora el contenido de otro sketch calculado sobre otros datos.
+
+        Parámetros:
+            otro (SketchCuantiles): Sketch a combinar.
+        """
+        self.n += otro.n
+        for nivel, valores in enumerate(otro.niveles):
+            if nivel == len(self.niveles):
+                self.niveles.append(np.empty(0))
+            self.niveles[nivel] = np.concatenate([self.niveles[nivel], valores])
+        self._compactar()
+
+    def _compactar(self):
+        """
+        Reduce los niveles que superan la capacidad promoviendo la mitad de sus valores al nivel siguiente.
+        """
+        nivel = 0
+        while nivel < len(self.niveles):
+            valores = self.niveles[nivel]
+            if valores.size > self.k:
+                valores = np.sort(valores)
+                pares = valores.size - valores.size % 2 # Si el tamaño es impar, el último valor se queda en el nivel
+                desplazamiento = self._aleatorio.integers(2)
+                promovidos = valores[desplazamiento:pares:2]
+                self.niveles[nivel] = valores[pares:]
+                if nivel + 1 == len(self.niveles):
+                    self.niveles.append(np.empty(0))
+                self.niveles[nivel + 1] = np.concatenate([self.niveles[nivel + 1], promovidos])
+            nivel += 1
+
+    def cuantil(self, q):
+        """
+        Estima el cuantil q de los valores acumulados.
+
+        Parámetros:
+            q (float o list): Cuantil o lista de cuantiles entre 0 y 1.
+
+        Retorna:
+            float o np.ndarray: Valor (o valores) estimado del cuantil.
+        """
+        if self.n == 0:
+            return np.full(np.shape(q), np.nan) if np.ndim(q) else np.nan
+        if len(self.niveles) == 1:
+            return np.quantile(self.niveles[0], q) # Sin compactar: cálculo exacto
+        valores = np.concatenate(self.niveles)
+        pesos = np.concatenate([np.full(v.size, 2.0 ** nivel) for nivel, v in enumerate(self.niveles)])
+        orden = np.argsort(valores, kind="stable")
+        valores = valores[orden]
+        # Posición de cada valor en el rango acumulado, centrada en su peso
+        posiciones = np.cumsum(pesos[orden]) - pesos[orden] / 2
+        return np.interp(np.asarray(q) * self.n, posiciones, valores)
+
+    def rangos(self, valores):
+        """
+        Estima el rango relativo (entre 0 y 1) de cada valor entre los valores acumulados, con el
+        rango medio en caso de empate. Mientras el sketch es exacto (n <= k), el resultado es una
+        transformación lineal de `pandas.Series.rank`; después, su resolución es de 1/(2k).
+
+        Parámetros:
+            valores (array-like): Valores numéricos; los faltantes se devuelven como NaN.
+
+        Retorna:
+            np.ndarray: Rango relativo de cada valor.
+        """
+        valores = np.asarray(valores, dtype=float)
+        if len(self.niveles) == 1:
+            referencia = np.sort(self.niveles[0])
+        else:
+            referencia = self.cuantil(np.linspace(0, 1, 2 * self.k + 1))
+        if referencia.size == 0:
+            return np.full(valores.shape, np.nan)
+        rangos = (np.searchsorted(referencia, valores, "left") + np.searchsorted(referencia, valores, "right")) / (2 * referencia.size)
+        return np.where(np.isnan(valores), np.nan, rangos)
+
+
+def ordenar_categorias(valores):
+    """
+    Ordena una colección de categorías. Si tienen tipos que no se pueden comparar entre sí
+    (por ejemplo, textos y números), se ordenan por su representación como texto.
+
+    Retorna:
+        list: Categorías ordenadas.
+    """
+    valores = list(valores)
+    try:
+        return sorted(valores)
+    except TypeError:
+        return sorted(valores, key=str)
+
+
+class TablaFrecuencias:
+    """
+    Acumula las frecuencias de los valores de una columna recorrida por bloques.
+
+    Sirve para calcular la moda y el conjunto de categorías de forma exacta. Las tablas
+    de distintos bloques o procesos se pueden combinar con `combinar`.
+    """
+    def __init__(self):
+        """
+        Inicializa la tabla vacía.
+        """
+        self.conteos = Counter()
+
+    def actualizar(self, serie):
+        """
+        Incorpora las frecuencias de un bloque, ignorando los valores faltantes.
+
+        Parámetros:
+            serie (pd.Series): Valores de la columna en el bloque.
+        """
+        self.conteos.update(serie.value_counts(dropna=True).to_dict())
+
+    def combinar(self, otra):
+        """
+        Suma las frecuencias de otra tabla.
+
+        Parámetros:
+            otra (TablaFrecuencias): Tabla calculada sobre otros datos.
+        """
+        self.conteos.update(otra.conteos)
+
+    def categorias(self):
+        """
+        Devuelve las categorías observadas, ordenadas (ver `ordenar_categorias`).
+        """
+        return ordenar_categorias(self.conteos)
+
+    def moda(self):
+        """
+        Devuelve la moda; en caso de empate, el menor valor (como `pandas.Series.mode`).
+        Si no hay valores, devuelve None.
+        """
+        if not self.conteos:
+            return None
+        maximo = max(self.conteos.values())
+        return min(valor for valor, conteo in self.conteos.items() if conteo == maximo)
+
+    def mas_frecuentes(self, k):
+        """
+        Devuelve las `k` categorías más frecuentes; en caso de empate, las menores primero.
+        """
+        return sorted(self.conteos, key=lambda valor: (-self.conteos[valor], valor))[:k]
+
+    def frecuencias(self):
+        """
+        Devuelve la frecuencia relativa de cada categoría (sobre los valores no faltantes).
+        """
+        total = sum(self.conteos.values())
+        return {valor: conteo / total for valor, conteo in self.conteos.items()}
+
+
+class MediasPorCategoria:
+    """
+    Acumula la suma y el número de valores de una columna numérica (por ejemplo, la columna
+    objetivo) para cada categoría de otra columna, recorriéndolas por bloques.
+
+    Sirve para la codificación por target con suavizado. Las filas con la categoría o el
+    valor faltante se ignoran. Los acumuladores se pueden combinar con `combinar`.
+    """
+    def __init__(self):
+        """
+        Inicializa el acumulador vacío.
+        """
+        self.sumas = Counter()
+        self.conteos = Counter()
+
+    def actualizar(self, categorias, valores):
+        """
+        Incorpora las parejas (categoría, valor) de un bloque.
+
+        Parámetros:
+            categorias (pd.Series): Categoría de cada fila.
+            valores (pd.Series): Valor numérico de cada fila.
+        """
+        validos = categorias.notna() & valores.notna()
+        agrupados = valores[validos].astype(float).groupby(categorias[validos]).agg(["sum", "count"])
+        self.sumas.update(agrupados["sum"].to_dict())
+        self.conteos.update(agrupados["count"].to_dict())
+
+    def combinar(self, otro):
+        """
+        Suma las sumas y los conteos de otro acumulador.
+        """
+        self.sumas.update(otro.sumas)
+        self.conteos.update(otro.conteos)
+
+    def media_global(self):
+        """
+        Devuelve la media de todos los valores, o None si no hay ninguno.
+        """
+        total = sum(self.conteos.values())
+        return sum(self.sumas.values()) / total if total else None
+
+    def medias(self, suavizado=0.0):
+        """
+        Devuelve la media de cada categoría, suavizada hacia la media global:
+        (suma + suavizado * media_global) / (conteo + suavizado).
+
+        Parámetros:
+            suavizado (float): Peso de la media global; cuanto mayor, más se acercan a ella
+                las medias de las categorías con pocos valores.
+        """
+        media_global = self.media_global()
+        return {
+            categoria: (self.sumas[categoria] + suavizado * media_global) / (conteo + suavizado)
+            for categoria, conteo in self.conteos.items()
+        }
+
+
+class MuestraReservorio:
+    """
+    Muestra aleatoria uniforme, de tamaño fijo, de las filas de unos datos recorridos por bloques
+    (muestreo por reservorio).
+
+    A cada fila se le asigna una clave aleatoria y se conservan las `tamano` filas de menor clave,
+    lo que equivale a elegir `tamano` filas al azar sin reemplazo. Por eso dos muestras de datos
+    distintos (por ejemplo, de distintos bloques o procesos) se pueden combinar con `combinar`.
+    """
+    def __init__(self, tamano=10_000, semilla=0):
+        """
+        Inicializa la muestra vacía.
+
+        Parámetros:
+            tamano (int): Número máximo de filas de la muestra.
+            semilla (int): Semilla del generador aleatorio, para resultados reproducibles.
+        """
+        self.tamano = tamano
+        self.n = 0
+        self.claves = np.empty(0)
+        self.filas = None
+        self._aleatorio = np.random.default_rng(semilla)
+
+    def actualizar(self, datos):
+        """
+        Incorpora las filas de un bloque.
+
+        Parámetros:
+            datos (pd.DataFrame o pd.Series): Filas del bloque.
+        """
+        self.n += len(datos)
+        self._conservar(self._aleatorio.random(len(datos)), datos)
+
+    def combinar(self, otra):
+        """
+        Incorpora otra muestra calculada sobre otros datos.
+
+        Parámetros:
+            otra (MuestraReservorio): Muestra a combinar.
+        """
+        self.n += otra.n
+        if otra.filas is not None:
+            self._conservar(otra.claves, otra.filas)
+
+    def _conservar(self, claves, datos):
+        """
+        Añade filas con sus claves y se queda con las `tamano` de menor clave.
+        """
+        if len(claves) > self.tamano: # Se descartan antes de concatenar las que no pueden entrar
+            seleccion = np.argpartition(claves, self.tamano - 1)[:self.tamano]
+            claves, datos = claves[seleccion], datos.iloc[seleccion]
+        if self.filas is not None:
+            claves = np.concatenate([self.claves, claves])
+            datos = pd.concat([self.filas, datos])
+        if len(claves) > self.tamano:
+            seleccion = np.argpartition(claves, self.tamano - 1)[:self.tamano]
+            claves, datos = claves[seleccion], datos.iloc[seleccion]
+        self.claves, self.filas = claves, datos
+
+    def muestra(self):
+        """
+        Devuelve las filas de la muestra en el orden de su índice, o None si no hay datos.
+        """
+        return self.filas.sort_index(kind="stable") if self.filas is not None else None
+
+
+class MatrizCorrelacion:
+    """
+    Acumula de forma incremental los co-momentos de varias columnas numéricas recorridas por
+    bloques para calcular su matriz de correlación de Pearson. Como `pandas.DataFrame.corr`,
+    cada par de columnas usa las filas en que ambas tienen valor.
+
+    Para cada par (i, j) se guardan el número de filas con ambos valores, la media y la suma de
+    cuadrados centrada de la columna i en esas filas y el co-momento del par. En cada bloque se
+    calculan con productos de matrices sobre los datos centrados (O(n·p²) en BLAS) y se combinan
+    con los acumulados con las fórmulas de Chan, igual que `EstadisticasNumericas`, por lo que
+    dos matrices calculadas por separado (en distintos bloques o procesos) se pueden combinar.
+    """
+    def __init__(self, columnas):
+        """
+        Inicializa la matriz vacía.
+
+        Parámetros:
+            columnas (list): Columnas numéricas cuya correlación se calcula.
+        """
+        self.columnas = list(columnas)
+        dimension = (len(self.columnas), len(self.columnas))
+        self.n = np.zeros(dimension)
+        self.media = np.zeros(dimension) # media[i, j]: media de la columna i en las filas con i y j
+        self.m2 = np.zeros(dimension)    # m2[i, j]: suma de cuadrados centrada de i en esas filas
+        self.c = np.zeros(dimension)     # c[i, j]: co-momento de i y j
+
+    def actualizar(self, datos):
+        """
+        Incorpora un bloque de filas, ignorando los valores faltantes de cada par.
+
+        Parámetros:
+            datos (pd.DataFrame): Bloque con (al menos) las columnas de la matriz.
+        """
+        x = datos[self.columnas].to_numpy(dtype=float)
+        validos = ~np.isnan(x)
+        conteos = validos.sum(axis=0)
+        # Se centra cada columna en su media del bloque para no perder precisión en los productos
+        desplazamiento = np.divide(np.where(validos, x, 0.0).sum(axis=0), conteos,
+                                   out=np.zeros(x.shape[1]), where=conteos > 0)
+        x = np.where(validos, x - desplazamiento, 0.0)
+        mascara = validos.astype(float)
+        n = mascara.T @ mascara
+        suma = x.T @ mascara # suma[i, j]: suma de la columna i en las filas con i y j
+        media = np.divide(suma, n, out=np.zeros_like(suma), where=n > 0)
+        m2 = (x * x).T @ mascara - suma * media
+        c = x.T @ x - suma * media.T
+        self._combinar_momentos(n, media + desplazamiento[:, np.newaxis], m2, c)
+
+    def combinar(self, otra):
+        """
+        Incorpora los co-momentos de otra matriz de las mismas columnas calculada sobre otros datos.
+
+        Parámetros:
+            otra (MatrizCorrelacion): Matriz a combinar.
+        """
+        self._combinar_momentos(otra.n, otra.media, otra.m2, otra.c)
+
+    def _combinar_momentos(self, n_otro, media_otro, m2_otro, c_otro):
+        """
+        Combina los momentos acumulados con los de otro grupo de filas (fórmulas de Chan).
+        """
+        n = self.n + n_otro
+        delta = media_otro - self.media
+        factor = np.divide(self.n * n_otro, n, out=np.zeros_like(n), where=n > 0)
+        self.m2 = self.m2 + m2_otro + delta ** 2 * factor
+        self.c = self.c + c_otro + delta * delta.T * factor
+        self.media = self.media + np.divide(delta * n_otro, n, out=np.zeros_like(n), where=n > 0)
+        self.n = n
+
+    def correlaciones(self):
+        """
+        Devuelve la matriz de correlación de Pearson. Los pares sin variación (o con menos de
+        dos filas con ambos valores) valen NaN.
+
+        Retorna:
+            pd.DataFrame: Matriz de correlación, con las columnas como índice y como columnas.
+        """
+        denominador = np.sqrt(self.m2 * self.m2.T)
+        correlacion = np.divide(self.c, denominador, out=np.full_like(self.c, np.nan), where=denominador > 0)
+        return pd.DataFrame(np.clip(correlacion, -1.0, 1.0), index=self.columnas, columns=self.columnas)
+
+
+METODOS_CORRELACION = ("pearson", "spearman")
+
+
+def calcular_correlaciones(obtener_bloques, columnas, metodo="pearson"):
+    """
+    Calcula la matriz de correlación de unas columnas recorriendo los datos por bloques, sin
+    cargarlos completos en memoria (ver `MatrizCorrelacion`).
+
+    Con "spearman" se hace una primera pasada para resumir la distribución de cada columna con
+    `SketchCuantiles` y, en la segunda, se calcula la correlación de Pearson de los rangos
+    estimados (ver `SketchCuantiles.rangos`). Cada columna se ordena sobre todos sus valores no
+    faltantes, también en los pares con valores faltantes en la otra columna.
+
+    Parámetros:
+        obtener_bloques (callable): Función sin argumentos que devuelve un nuevo iterador sobre los
+            bloques (pd.DataFrame); con "spearman" se llama dos veces.
+        columnas (list): Columnas numéricas.
+        metodo (str): "pearson" o "spearman".
+
+    Retorna:
+        pd.DataFrame: Matriz de correlación.
+
+    Lanza:
+        ValueError: Si el método no es válido.
+    """
+    if metodo not in METODOS_CORRELACION:
+        raise ValueError(f"Método de correlación no válido: {metodo}")
+    transformar = lambda bloque: bloque
+    if metodo == "spearman":
+        sketches = {col: SketchCuantiles() for col in columnas}
+        for bloque in obtener_bloques():
+            for col in columnas:
+                sketches[col].actualizar(bloque[col])
+        transformar = lambda bloque: pd.DataFrame({col: sketches[col].rangos(bloque[col]) for col in columnas})
+    matriz = MatrizCorrelacion(columnas)
+    for bloque in obtener_bloques():
+        matriz.actualizar(transformar(bloque))
+    return matriz.correlaciones()
+
+
+def combinar_acumuladores(acumulados, nuevos):
+    """
+    Combina, columna a columna, dos diccionarios de acumuladores del mismo tipo.
+
+    Parámetros:
+        acumulados (dict): Acumuladores por columna obtenidos hasta el momento (o None).
+        nuevos (dict): Acumuladores por columna de un nuevo bloque.
+
+    Retorna:
+        dict: Acumuladores combinados.
+    """
+    if acumulados is None:
+        return nuevos
+    for col, acumulador in nuevos.items():
+        if col in acumulados:
+            acumulados[col].combinar(acumulador)
+        else:
+            acumulados[col] = acumulador
+    return acumulados
@@ -0,0 +1,174 @@
+import warnings
+import weakref
+
+import numpy as np
+import pandas as pd
+
+
+# Estadísticas numéricas que se calculan juntas, en el mismo orden que `DataFrame.describe()`
+ESTADISTICAS_NUMERICAS = ("count", "mean", "std", "min", "25%", "50%", "75%", "max")
+
+
+def describir_columnas(datos, columnas):
+    """
+    Calcula de una vez las estadísticas de `ESTADISTICAS_NUMERICAS` de varias columnas numéricas.
+
+    Las columnas se convierten a un único bloque 2-D de decimales: el mínimo, los cuartiles y el
+    máximo salen de una sola llamada a `np.nanquantile` (una única partición de cada columna), y el
+    número de valores, la media y la desviación típica de reducciones sobre el mismo bloque. Los
+    valores faltantes se ignoran y el resultado coincide con `describe()` de pandas.
+
+    Parámetros:
+        datos (pd.DataFrame): Datos.
+        columnas (list): Columnas numéricas a describir.
+
+    Retorna:
+        dict: Diccionario {estadística: valor} por columna.
+    """
+    bloque = datos[columnas].to_numpy(dtype=float, na_value=np.nan)
+    presentes = ~np.isnan(bloque)
+    n = presentes.sum(axis=0)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning) # Columnas sin ningún valor o con uno solo
+        if len(bloque):
+            cuantiles = np.nanquantile(bloque, [0, 0.25, 0.5, 0.75, 1], axis=0)
+        else:
+            cuantiles = np.full((5, len(columnas)), np.nan)
+        media = np.nansum(bloque, axis=0) / n
+        varianza = np.nansum((bloque - media) ** 2, axis=0) / (n - 1)
+    varianza[n < 2] = np.nan
+    valores = np.vstack([n, media, np.sqrt(varianza), cuantiles]) # Una fila por estadística
+    return {col: dict(zip(ESTADISTICAS_NUMERICAS, valores[:, j].tolist())) for j, col in enumerate(columnas)}
+
+
+class CacheEstadisticas:
+    """
+    Caché de estadísticas descriptivas de un dataset, compartida por el preprocesado y la visualización.
+
+    Cada estadística se guarda por columna y por versión de los datos: se calcula la primera vez que
+    se pide y las siguientes se lee de la caché. La versión cambia con `invalidar`, que se llama cada
+    vez que un paso modifica el dataset, y también si se consultan otros datos (otro DataFrame u otro
+    número de filas); al cambiar de versión se descartan todas las estadísticas guardadas. Los datos
+    se recuerdan con una referencia débil, para no mantener en memoria un dataset ya sustituido.
+
+    Atributos:
+        version (int): Versión actual de los datos.
+        aciertos (int): Estadísticas leídas de la caché.
+        fallos (int): Estadísticas que se han tenido que calcular.
+    """
+    def __init__(self):
+        """
+        Inicializa la caché vacía.
+        """
+        self.version = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self._datos = None # Referencia débil a los datos de las estadísticas guardadas
+        self._filas = None
+        self._valores = {} # {(columna, versión): {estadística: valor}}
+
+    def invalidar(self):
+        """
+        Descarta las estadísticas guardadas y pasa a una nueva versión de los datos.
+        """
+        self.version += 1
+        self._valores.clear()
+        self._datos = self._filas = None
+
+    def _comprobar_datos(self, datos):
+        """
+        Invalida la caché si los datos consultados no son los de las estadísticas guardadas.
+        """
+        if self._datos is None or self._datos() is not datos or len(datos) != self._filas:
+            self.invalidar()
+            self._datos, self._filas = weakref.ref(datos), len(datos)
+
+    def _guardadas(self, columna):
+        """
+        Devuelve el diccionario de estadísticas guardadas de una columna en la versión actual.
+        """
+        return self._valores.setdefault((columna, self.version), {})
+
+    def describir(self, datos, columnas, repartir=None):
+        """
+        Devuelve las estadísticas de `ESTADISTICAS_NUMERICAS` de varias columnas numéricas. Las
+        columnas que no están en la caché se calculan juntas con `describir_columnas`.
+
+        Parámetros:
+            datos (pd.DataFrame): Datos.
+            columnas (list): Columnas numéricas.
+            repartir (callable, opcional): Función que recibe otra función y la lista de columnas
+                pendientes y devuelve el resultado de aplicarla a cada grupo de columnas (por ejemplo,
+                `PreprocesadoDatos._por_columnas`, que reparte los grupos entre hilos).
+
+        Retorna:
+            dict: Diccionario {estadística: valor} por columna.
+        """
+        self._comprobar_datos(datos)
+        pendientes = [col for col in columnas if "mean" not in self._guardadas(col)]
+        self.aciertos += len(columnas) - len(pendientes)
+        self.fallos += len(pendientes)
+        if pendientes:
+            calcular = lambda grupo: describir_columnas(datos, grupo)
+            for parcial in (repartir(calcular, pendientes) if repartir else [calcular(pendientes)]):
+                for col, estadisticas in parcial.items():
+                    self._guardadas(col).update(estadisticas)
+        return {col: {clave: self._guardadas(col)[clave] for clave in ESTADISTICAS_NUMERICAS} for col in columnas}
+
+    def resumen(self, datos, columnas):
+        """
+        Devuelve las estadísticas de varias columnas numéricas con el formato de `describe()`.
+
+        Retorna:
+            pd.DataFrame: Una fila por estadística y una columna por cada columna de datos.
+        """
+        return pd.DataFrame(self.describir(datos, columnas), index=list(ESTADISTICAS_NUMERICAS), columns=columnas)
+
+    def media(self, datos, columna):
+        """
+        Devuelve la media de una columna numérica, sin contar los valores faltantes.
+        """
+        return self.describir(datos, [columna])[columna]["mean"]
+
+    def mediana(self, datos, columna):
+        """
+        Devuelve la mediana de una columna numérica, sin contar los valores faltantes.
+        """
+        return self.describir(datos, [columna])[columna]["50%"]
+
+    def frecuencias(self, datos, columna):
+        """
+        Devuelve el número de apariciones de cada valor de una columna, de mayor a menor,
+        sin contar los valores faltantes (como `Series.value_counts()`).
+        """
+        self._comprobar_datos(datos)
+        guardadas = self._guardadas(columna)
+        if "frecuencias" in guardadas:
+            self.aciertos += 1
+        else:
+            self.fallos += 1
+            guardadas["frecuencias"] = datos[columna].value_counts()
+        return guardadas["frecuencias"]
+
+    def moda(self, datos, columna):
+        """
+        Devuelve la moda de una columna a partir de su tabla de frecuencias. Si hay varios valores
+        igual de frecuentes, devuelve el menor, como `Series.mode()[0]`.
+
+        Retorna:
+            El valor más frecuente, o None si la columna no tiene ningún valor.
+        """
+        conteos = self.frecuencias(datos, columna)
+        if conteos.empty or conteos.iloc[0] == 0: # Las categorías sin ninguna aparición también se cuentan
+            return None
+        empatados = conteos.index[conteos.to_numpy() == conteos.iloc[0]]
+        try:
+            return empatados.sort_values()[0]
+        except TypeError: # Valores que no se pueden ordenar entre sí
+            return empatados[0]
+
+    def estadisticas(self):
+        """
+        Devuelve los aciertos, los fallos y la versión actual de la caché.
+        """
+        return {"aciertos": self.aciertos, "fallos": self.fallos, "version": self.version}
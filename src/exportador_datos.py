@@ -1,20 +1,180 @@
+import bz2
+import gzip
+import os
+import secrets
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import pandas as pd
 
+from formato_columnar import COMPRESIONES_FEATHER, COMPRESIONES_PARQUET, escribir_bloques_columnar, escribir_feather, escribir_parquet
+from perfilado import medir_etapa
+
+FORMATOS_EXTENSION = {".csv": "csv", ".xlsx": "excel", ".xls": "excel", ".parquet": "parquet", ".pq": "parquet",
+                      ".feather": "feather", ".arrow": "feather"}
+COMPRESIONES_CSV = ["none", "gzip", "bz2", "zstd"]
+EXTENSIONES_COMPRESION = {"gzip": ".gz", "bz2": ".bz2", "zstd": ".zst"}
+TAMANO_BLOQUE_CSV = 100_000 # Filas de cada bloque que se formatea y comprime por separado
+
+
+def importar_zstandard():
+    """
+    Importa zstandard solo cuando se pide la compresión zstd, para que el resto funcione sin él.
+
+    Lanza:
+        ImportError: Si zstandard no está instalado, con un mensaje que indica cómo instalarlo.
+    """
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError("La compresión zstd de CSV requiere zstandard (pip install zstandard).") from None
+    return zstandard
+
+
+def comprimir(datos, compresion):
+    """
+    Comprime un bloque de bytes como un miembro (gzip), flujo (bz2) o trama (zstd) independiente.
+    Varios bloques comprimidos por separado y escritos uno tras otro forman un archivo válido que
+    se descomprime como uno solo (pandas, gzip, bzip2 y zstd lo leen entero).
+
+    Parámetros:
+        datos (bytes): Datos a comprimir.
+        compresion (str): Una de `COMPRESIONES_CSV`.
+
+    Retorna:
+        bytes: Datos comprimidos.
+    """
+    if compresion == "none":
+        return datos
+    if compresion == "gzip":
+        return gzip.compress(datos, compresslevel=6, mtime=0)
+    if compresion == "bz2":
+        return bz2.compress(datos)
+    if compresion == "zstd":
+        return importar_zstandard().ZstdCompressor(level=3).compress(datos) # Los compresores no se comparten entre hilos
+    raise ValueError(f"Compresión de CSV no válida: {compresion}")
+
+
+def compresion_extension(ruta):
+    """
+    Devuelve la compresión que corresponde a la extensión de la ruta ("none" si no tiene ninguna).
+    """
+    extension = os.path.splitext(ruta)[1].lower()
+    return next((compresion for compresion, ext in EXTENSIONES_COMPRESION.items() if ext == extension), "none")
+
+
+def separar_extension(ruta):
+    """
+    Separa la extensión del formato y la de la compresión de una ruta de salida:
+    "salida.csv.gz" da (".csv", ".gz") y "salida.parquet" da (".parquet", "").
+    """
+    base, extension = os.path.splitext(ruta)
+    if extension.lower() in EXTENSIONES_COMPRESION.values():
+        return os.path.splitext(base)[1], extension
+    return extension, ""
+
+
+def dividir_filas(df, tamano_bloque=TAMANO_BLOQUE_CSV):
+    """
+    Divide un DataFrame en bloques consecutivos de `tamano_bloque` filas, sin copiarlos.
+    """
+    for inicio in range(0, max(len(df), 1), tamano_bloque): # Un DataFrame vacío da un bloque, con la cabecera
+        yield df.iloc[inicio:inicio + tamano_bloque]
+
+
+def escribir_csv(ruta, bloques, compresion="none", hilos=None, progreso=None):
+    """
+    Escribe una secuencia de bloques en un único archivo CSV, opcionalmente comprimido.
+
+    Cada bloque se formatea como texto CSV y se comprime en un hilo, hasta `2 * hilos` bloques a la
+    vez (la compresión de zlib, bz2 y zstd libera el GIL); un único escritor añade los resultados al
+    archivo en el orden de los bloques. Así la memoria necesaria no depende del tamaño de los datos.
+
+    El archivo se escribe primero con un nombre temporal en el mismo directorio y se renombra al
+    terminar, de modo que nunca aparece un archivo a medio escribir en `ruta`; si hay un error, el
+    temporal se borra.
+
+    Parámetros:
+        ruta (str): Ruta del archivo de salida.
+        bloques (iterable): Bloques (pd.DataFrame) a escribir, en orden. La cabecera es la del primero.
+        compresion (str): Una de `COMPRESIONES_CSV`.
+        hilos (int, opcional): Hilos que formatean y comprimen los bloques; por defecto, uno por CPU.
+        progreso (callable, opcional): Función que recibe las filas y los bytes escritos hasta el
+            momento tras cada bloque.
+
+    Retorna:
+        dict: "filas", "bytes" (tamaño del archivo), "segundos" y "filas_por_segundo".
+
+    Lanza:
+        ValueError: Si la compresión no es válida.
+        ImportError: Si se pide zstd y zstandard no está instalado.
+    """
+    if compresion not in COMPRESIONES_CSV:
+        raise ValueError(f"Compresión de CSV no válida: {compresion}")
+    if compresion == "zstd":
+        importar_zstandard() # Falla antes de crear el archivo
+    hilos = max(1, int(hilos or os.cpu_count() or 1))
+    directorio, nombre = os.path.split(os.path.abspath(ruta))
+    temporal = os.path.join(directorio, f".{nombre}.{secrets.token_hex(4)}.tmp")
+
+    def formatear(bloque, cabecera):
+        return len(bloque), comprimir(bloque.to_csv(index=False, header=cabecera).encode("utf-8"), compresion)
+
+    inicio = time.perf_counter()
+    filas = escritos = 0
+    try:
+        with open(temporal, "xb") as archivo, ThreadPoolExecutor(max_workers=hilos) as ejecutor:
+            pendientes = []
+
+            def escribir_siguiente():
+                nonlocal filas, escritos
+                n, datos = pendientes.pop(0).result()
+                archivo.write(datos)
+                filas += n
+                escritos += len(datos)
+                if progreso is not None:
+                    progreso(filas, escritos)
+
+            for i, bloque in enumerate(bloques):
+                pendientes.append(ejecutor.submit(formatear, bloque, i == 0)) # La cabecera solo se escribe una vez
+                if len(pendientes) >= 2 * hilos:
+                    escribir_siguiente()
+            while pendientes:
+                escribir_siguiente()
+        os.replace(temporal, ruta)
+    except BaseException:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        raise
+    segundos = time.perf_counter() - inicio
+    return {"filas": filas, "bytes": escritos, "segundos": segundos,
+            "filas_por_segundo": filas / segundos if segundos > 0 else float("inf")}
+
+
 class ExportarDatos:
     """
-    Clase para exportar un DataFrame a archivos en formato CSV o Excel.
+    Clase para exportar un DataFrame a archivos en formato CSV, Excel, Parquet o Feather.
+
+    Los CSV se escriben por bloques de filas, opcionalmente comprimidos (gzip, bz2 o zstd), con
+    varios hilos y mediante un archivo temporal que se renombra al terminar (ver `escribir_csv`).
 
     Atributos:
         dataset (pd.DataFrame): Conjunto de datos que se desea exportar.
+        bloques (iterable): Bloques preprocesados a exportar en lugar de `dataset` (modo por bloques).
+        ultima_exportacion (dict): Filas, bytes, segundos y filas por segundo de la última exportación CSV.
     """
-    def __init__(self, dataset):
+    def __init__(self, dataset, bloques=None):
         """
         Inicializa la clase con el DataFrame a exportar.
 
         Parámetros:
             dataset (pd.DataFrame): Datos a guardar en disco.
+            bloques (iterable, opcional): Bloques preprocesados (pd.DataFrame) que se escriben
+                de uno en uno cuando el dataset se ha cargado por bloques.
         """
         self.dataset = dataset
+        self.bloques = bloques
+        self.ultima_exportacion = None
 
     def exportar(self):
         """
@@ -29,29 +189,138 @@ class ExportarDatos:
 
         while True:
             print("Seleccione el formato de exportación:")
-            print("  [1] CSV (.csv)")
+            print("  [1] CSV (.csv, sin comprimir o con gzip, bz2 o zstd)")
             print("  [2] Excel (.xlsx)")
-            print("  [3] Volver al menú principal")
+            print("  [3] Parquet (.parquet)")
+            print("  [4] Feather (.feather)")
+            print("  [5] Volver al menú principal")
             opcion = input("Seleccione una opción: ")
 
             # Exportar como CSV
             if opcion == "1":
                 nombre_archivo = input("Ingrese el nombre del archivo de salida (sin extensión): ")
-                self.dataset.to_csv(f"{nombre_archivo}.csv", index=False)
-                print(f'Datos exportados correctamente como "{nombre_archivo}.csv".\n')
+                compresion = self.pedir_compresion(COMPRESIONES_CSV)
+                ruta = f"{nombre_archivo}.csv{EXTENSIONES_COMPRESION.get(compresion, '')}"
+                try:
+                    self.aplicar_exportacion(ruta, "csv", compresion, progreso=self.mostrar_progreso)
+                except ImportError as e:
+                    print(e)
+                    continue
+                print(f'Datos exportados correctamente como "{ruta}".\n')
                 return True
             
             # Exportar como Excel
             elif opcion == "2":
+                if self.bloques is not None:
+                    print("La exportación por bloques no está disponible en formato Excel.")
+                    continue
                 nombre_archivo = input("Ingrese el nombre del archivo de salida (sin extensión): ")
-                self.dataset.to_excel(f"{nombre_archivo}.xlsx", index=False)
+                self.aplicar_exportacion(f"{nombre_archivo}.xlsx", "excel")
                 print(f'Datos exportados correctamente como "{nombre_archivo}.xlsx".\n')
                 return True
             
+            # Exportar como Parquet o Feather
+            elif opcion in ("3", "4"):
+                formato, compresiones = ("parquet", COMPRESIONES_PARQUET) if opcion == "3" else ("feather", COMPRESIONES_FEATHER)
+                nombre_archivo = input("Ingrese el nombre del archivo de salida (sin extensión): ")
+                compresion = self.pedir_compresion(compresiones)
+                ruta = f"{nombre_archivo}.{formato}"
+                try:
+                    self.aplicar_exportacion(ruta, formato, compresion)
+                except ImportError as e:
+                    print(e)
+                    continue
+                print(f'Datos exportados correctamente como "{ruta}".\n')
+                return True
+
             # Volver al menú principal
-            elif opcion == "3":
+            elif opcion == "5":
                 return False
             
             #Gestión de entradas inválidas
             else:
                 print("Opción no válida. Intente nuevamente.")
+
+    @medir_etapa(entrada="dataset", archivo_escrito="ruta")
+    def aplicar_exportacion(self, ruta, formato=None, compresion=None, hilos=None, tamano_bloque=TAMANO_BLOQUE_CSV,
+                            progreso=None):
+        """
+        Exporta los datos sin interacción con el usuario. Si hay bloques, se escriben de uno en uno.
+
+        Parámetros:
+            ruta (str): Ruta del archivo de salida.
+            formato (str, opcional): "csv", "excel", "parquet" o "feather"; por defecto, según la extensión de `ruta`
+                (sin contar la de la compresión: "salida.csv.gz" es un CSV).
+            compresion (str, opcional): Compresión para CSV (por defecto, según la extensión), Parquet o Feather.
+            hilos (int, opcional): Hilos que formatean y comprimen los bloques del CSV; por defecto, uno por CPU.
+            tamano_bloque (int): Filas de cada bloque del CSV cuando se exporta el dataset en memoria.
+            progreso (callable, opcional): Se llama con las filas y los bytes escritos tras cada bloque del CSV.
+
+        Retorna:
+            int: Número de filas escritas.
+        """
+        formato = formato or FORMATOS_EXTENSION.get(separar_extension(ruta)[0].lower())
+        if formato not in ("csv", "excel", "parquet", "feather"):
+            raise ValueError(f"Formato de exportación no válido: {formato}")
+        if formato == "csv":
+            bloques = self.bloques if self.bloques is not None else dividir_filas(self.dataset, tamano_bloque)
+            return self.exportar_csv_bloques(ruta, bloques, compresion, hilos, progreso)
+        if self.bloques is not None:
+            if formato == "excel":
+                raise ValueError("La exportación por bloques no está disponible en formato Excel.")
+            filas = escribir_bloques_columnar(ruta, self.bloques, formato, compresion)
+            print(f"Se han escrito {filas} filas por bloques.")
+            return filas
+        if formato == "excel":
+            self.dataset.to_excel(ruta, index=False)
+        elif formato == "parquet":
+            escribir_parquet(self.dataset, ruta, compresion or COMPRESIONES_PARQUET[0])
+        else:
+            escribir_feather(self.dataset, ruta, compresion or COMPRESIONES_FEATHER[0])
+        return len(self.dataset)
+
+    def pedir_compresion(self, compresiones):
+        """
+        Pide al usuario el tipo de compresión; la primera opción de la lista es la predeterminada.
+
+        Parámetros:
+            compresiones (list): Compresiones disponibles para el formato.
+
+        Retorna:
+            str: Compresión elegida.
+        """
+        entrada = input(f"Compresión ({'/'.join(compresiones)}, Enter para {compresiones[0]}): ").strip().lower()
+        if entrada not in compresiones:
+            if entrada:
+                print(f"Compresión no válida. Se usará {compresiones[0]}.")
+            return compresiones[0]
+        return entrada
+
+    def exportar_csv_bloques(self, ruta, bloques, compresion=None, hilos=None, progreso=None):
+        """
+        Escribe una secuencia de bloques en un único archivo CSV sin reunir el dataset completo
+        en memoria (ver `escribir_csv`), y muestra el rendimiento de la escritura.
+
+        Parámetros:
+            ruta (str): Ruta del archivo CSV de salida.
+            bloques (iterable): Bloques (pd.DataFrame) a escribir, en orden.
+            compresion (str, opcional): Una de `COMPRESIONES_CSV`; por defecto, según la extensión de `ruta`.
+            hilos (int, opcional): Hilos que formatean y comprimen los bloques.
+            progreso (callable, opcional): Se llama con las filas y los bytes escritos tras cada bloque.
+
+        Retorna:
+            int: Número total de filas escritas.
+        """
+        self.ultima_exportacion = escribir_csv(ruta, bloques, compresion or compresion_extension(ruta), hilos, progreso)
+        if progreso is not None:
+            print() # Termina la línea de progreso
+        informe = self.ultima_exportacion
+        print(f"Se han escrito {informe['filas']} filas ({informe['bytes'] / 1024 ** 2:.1f} MB) en "
+              f"{informe['segundos']:.2f} s: {informe['filas_por_segundo']:,.0f} filas/s.")
+        return informe["filas"]
+
+    def mostrar_progreso(self, filas, escritos):
+        """
+        Muestra, en la misma línea, las filas y los megabytes escritos hasta el momento.
+        """
+        print(f"\r  {filas:,} filas escritas ({escritos / 1024 ** 2:.1f} MB)", end="", flush=True)
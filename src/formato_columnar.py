@@ -0,0 +1,250 @@
+import os
+import secrets
+
+import pandas as pd
+
+COMPRESIONES_PARQUET = ["snappy", "zstd", "gzip", "none"]
+COMPRESIONES_FEATHER = ["lz4", "zstd", "none"]
+
+
+def importar_pyarrow():
+    """
+    Importa pyarrow solo cuando se necesita, para que el resto de la aplicación funcione sin él.
+
+    Retorna:
+        module: Módulo `pyarrow`, con los submódulos `parquet`, `feather`, `ipc` y `dataset` cargados.
+
+    Lanza:
+        ImportError: Si pyarrow no está instalado, con un mensaje que indica cómo instalarlo.
+    """
+    try:
+        import pyarrow
+        import pyarrow.dataset
+        import pyarrow.feather
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("Los formatos Parquet y Feather requieren pyarrow (pip install pyarrow).") from None
+    return pyarrow
+
+
+def es_feather(archivo):
+    """
+    Indica si la extensión del archivo corresponde a Feather / Arrow IPC.
+    """
+    return os.path.splitext(archivo)[1].lower() in (".feather", ".arrow", ".ipc")
+
+
+def es_parquet(archivo):
+    """
+    Indica si la extensión del archivo corresponde a Parquet.
+    """
+    return os.path.splitext(archivo)[1].lower() in (".parquet", ".pq")
+
+
+def columnas_columnar(archivo):
+    """
+    Devuelve los nombres de las columnas de un archivo Parquet o Feather leyendo solo su esquema.
+    """
+    pa = importar_pyarrow()
+    if es_feather(archivo):
+        with pa.memory_map(archivo) as fuente:
+            return list(pa.ipc.open_file(fuente).schema.names)
+    return list(pa.parquet.read_schema(archivo).names)
+
+
+def _a_pandas(tabla, tipos=None):
+    """
+    Convierte una tabla de Arrow en DataFrame y aplica los tipos pedidos.
+    """
+    df = tabla.to_pandas()
+    return df.astype(tipos) if tipos else df
+
+
+def leer_parquet(archivo, columnas=None, filtros=None, tipos=None, memory_map=True):
+    """
+    Lee un archivo Parquet en un DataFrame.
+
+    Solo se leen las columnas indicadas y, si hay filtros, los grupos de filas cuyas
+    estadísticas (mínimo y máximo) no pueden cumplirlos se descartan sin leerse.
+
+    Parámetros:
+        archivo (str): Ruta al archivo Parquet.
+        columnas (list, opcional): Columnas a leer.
+        filtros (list, opcional): Condiciones como tuplas (columna, operador, valor),
+            por ejemplo [("Pclass", "==", 1)]. Se combinan con AND.
+        tipos (dict, opcional): Tipo de dato de cada columna.
+        memory_map (bool): Leer el archivo proyectándolo en memoria en lugar de con lecturas de disco.
+
+    Retorna:
+        pd.DataFrame: Filas leídas.
+    """
+    pa = importar_pyarrow()
+    tabla = pa.parquet.read_table(archivo, columns=columnas, filters=filtros or None, memory_map=memory_map)
+    return _a_pandas(tabla, tipos)
+
+
+def leer_parquet_bloques(archivo, tamano_bloque, columnas=None, filtros=None, tipos=None):
+    """
+    Lee un archivo Parquet por bloques de filas, con las mismas proyección y filtros que `leer_parquet`.
+
+    Retorna:
+        generator: Bloques (pd.DataFrame), en orden.
+    """
+    pa = importar_pyarrow()
+    dataset = pa.dataset.dataset(archivo, format="parquet")
+    filtro = pa.parquet.filters_to_expression(filtros) if filtros else None
+    for lote in dataset.to_batches(columns=columnas, filter=filtro, batch_size=tamano_bloque):
+        if lote.num_rows:
+            yield _a_pandas(lote, tipos)
+
+
+def leer_feather(archivo, columnas=None, tipos=None, memory_map=True):
+    """
+    Lee un archivo Feather (Arrow IPC) en un DataFrame.
+
+    Parámetros:
+        archivo (str): Ruta al archivo Feather.
+        columnas (list, opcional): Columnas a leer.
+        tipos (dict, opcional): Tipo de dato de cada columna.
+        memory_map (bool): Proyectar el archivo en memoria; sin compresión, las columnas
+            no seleccionadas no llegan a leerse del disco.
+
+    Retorna:
+        pd.DataFrame: Filas leídas.
+    """
+    pa = importar_pyarrow()
+    tabla = pa.feather.read_table(archivo, columns=columnas, memory_map=memory_map)
+    return _a_pandas(tabla, tipos)
+
+
+def _a_arrow(df):
+    """
+    Convierte un DataFrame en una tabla Arrow. Arrow no admite columnas dispersas de pandas
+    (`pd.SparseDtype`), así que se convierten antes a columnas densas.
+    """
+    pa = importar_pyarrow()
+    dispersas = [col for col in df.columns if isinstance(df[col].dtype, pd.SparseDtype)]
+    if dispersas:
+        df = df.assign(**{col: df[col].sparse.to_dense() for col in dispersas})
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def escribir_parquet(df, ruta, compresion="snappy"):
+    """
+    Escribe un DataFrame en un archivo Parquet.
+
+    Parámetros:
+        df (pd.DataFrame): Datos a escribir.
+        ruta (str): Ruta del archivo de salida.
+        compresion (str): Uno de `COMPRESIONES_PARQUET`.
+    """
+    pa = importar_pyarrow()
+    pa.parquet.write_table(_a_arrow(df), ruta, compression=compresion)
+
+
+def escribir_feather(df, ruta, compresion="lz4"):
+    """
+    Escribe un DataFrame en un archivo Feather (Arrow IPC).
+
+    Parámetros:
+        df (pd.DataFrame): Datos a escribir.
+        ruta (str): Ruta del archivo de salida.
+        compresion (str): Uno de `COMPRESIONES_FEATHER`; "none" permite leerlo después sin copias con `memory_map`.
+    """
+    pa = importar_pyarrow()
+    pa.feather.write_feather(_a_arrow(df), ruta,
+                             compression="uncompressed" if compresion == "none" else compresion)
+
+
+def escribir_bloques_columnar(ruta, bloques, formato="parquet", compresion=None):
+    """
+    Escribe una secuencia de bloques en un único archivo Parquet (un grupo de filas por bloque)
+    o Feather, sin reunir el dataset completo en memoria.
+
+    Todos los bloques deben tener las mismas columnas, pero sus tipos pueden variar de un bloque a
+    otro (por ejemplo, int8 en uno e int16 en otro, enteros y decimales, o una columna sin ningún valor
+    en el primero). Mientras los tipos coinciden con los del primer bloque, se escribe directamente; si
+    un bloque tiene otros tipos, lo escrito y los bloques siguientes se guardan aparte y al final se
+    reescriben con el esquema que admite todos (`pa.unify_schemas` con promoción permisiva).
+
+    El archivo se escribe con un nombre temporal en el mismo directorio y se renombra al terminar,
+    de modo que nunca queda un archivo a medio escribir en `ruta`.
+
+    Parámetros:
+        ruta (str): Ruta del archivo de salida.
+        bloques (iterable): Bloques (pd.DataFrame) a escribir, en orden.
+        formato (str): "parquet" o "feather".
+        compresion (str, opcional): Compresión; por defecto, "snappy" en Parquet y "lz4" en Feather.
+
+    Retorna:
+        int: Número total de filas escritas.
+    """
+    pa = importar_pyarrow()
+    compresion = compresion or ("snappy" if formato == "parquet" else "lz4")
+    directorio, nombre = os.path.split(os.path.abspath(ruta))
+    temporal = os.path.join(directorio, f".{nombre}.{secrets.token_hex(4)}.tmp")
+    escritor, esquema, filas = None, None, 0
+    partes, esquemas = [], [] # Archivos con lo escrito por separado desde que cambian los tipos
+
+    def abrir(esquema):
+        if formato == "parquet":
+            return pa.parquet.ParquetWriter(temporal, esquema, compression=compresion)
+        opciones = pa.ipc.IpcWriteOptions(compression=None if compresion == "none" else compresion)
+        return pa.ipc.new_file(temporal, esquema, options=opciones)
+
+    try:
+        for bloque in bloques:
+            tabla = _a_arrow(bloque)
+            if escritor is None and not partes:
+                esquema = tabla.schema
+                escritor = abrir(esquema)
+            if not partes and tabla.schema == esquema:
+                escritor.write_table(tabla)
+                filas += tabla.num_rows
+                continue
+            if not partes: # Primer cambio de tipos: lo escrito hasta ahora pasa a ser la primera parte
+                escritor.close()
+                escritor = None
+                partes.append(f"{temporal}.0")
+                esquemas.append(esquema)
+                os.replace(temporal, partes[0])
+            partes.append(f"{temporal}.{len(partes)}")
+            esquemas.append(tabla.schema)
+            with pa.ipc.new_file(partes[-1], tabla.schema) as parte:
+                parte.write_table(tabla)
+        if partes:
+            esquema = pa.unify_schemas(esquemas, promote_options="permissive")
+            escritor, filas = abrir(esquema), 0
+            for i, parte in enumerate(partes):
+                for lote in _leer_lotes(parte, formato if i == 0 else "feather"):
+                    tabla = pa.Table.from_batches([lote]).select(esquema.names).cast(esquema)
+                    escritor.write_table(tabla)
+                    filas += tabla.num_rows
+                os.remove(parte)
+        if escritor is not None:
+            escritor.close()
+            escritor = None
+            os.replace(temporal, ruta)
+    except BaseException:
+        if escritor is not None:
+            escritor.close()
+        for archivo in [temporal] + partes:
+            if os.path.exists(archivo):
+                os.remove(archivo)
+        raise
+    return filas
+
+
+def _leer_lotes(archivo, formato):
+    """
+    Recorre un archivo Parquet (por grupos de filas) o Feather (por lotes) sin leerlo completo.
+    """
+    pa = importar_pyarrow()
+    if formato == "parquet":
+        yield from pa.parquet.ParquetFile(archivo).iter_batches()
+        return
+    with pa.memory_map(archivo) as fuente:
+        lector = pa.ipc.open_file(fuente)
+        for i in range(lector.num_record_batches):
+            yield lector.get_batch(i)
@@ -0,0 +1,192 @@
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+_local = threading.local() # Cada hilo tiene su propio conjunto de conexiones (sqlite3 no las comparte entre hilos)
+
+
+def citar_identificador(nombre):
+    """
+    Devuelve un nombre de tabla o columna entre comillas dobles para usarlo en una consulta SQL,
+    escapando las comillas que contenga.
+    """
+    return '"' + str(nombre).replace('"', '""') + '"'
+
+
+def conectar(ruta, inmutable=False):
+    """
+    Abre una conexión nueva de solo lectura (URI con `mode=ro` y, opcionalmente, `immutable=1`).
+    """
+    uri = Path(ruta).resolve().as_uri() + "?mode=ro" + ("&immutable=1" if inmutable else "")
+    return sqlite3.connect(uri, uri=True)
+
+
+def obtener_conexion(ruta, inmutable=False):
+    """
+    Devuelve una conexión de solo lectura a la base de datos, reutilizando la del hilo actual si ya existe.
+
+    Parámetros:
+        ruta (str): Ruta al archivo de base de datos SQLite.
+        inmutable (bool): Si es True, se abre con `immutable=1`: SQLite no usa bloqueos ni comprueba
+            cambios. Solo debe usarse si nadie modifica el archivo mientras se lee.
+
+    Retorna:
+        sqlite3.Connection: Conexión abierta en modo `mode=ro`.
+    """
+    conexiones = getattr(_local, "conexiones", None)
+    if conexiones is None:
+        conexiones = _local.conexiones = {}
+    clave = (str(Path(ruta).resolve()), inmutable)
+    if clave not in conexiones:
+        conexiones[clave] = conectar(ruta, inmutable)
+    return conexiones[clave]
+
+
+def cerrar_conexiones():
+    """
+    Cierra las conexiones abiertas por el hilo actual.
+    """
+    for conexion in getattr(_local, "conexiones", {}).values():
+        conexion.close()
+    _local.conexiones = {}
+
+
+class FuenteSQLite:
+    """
+    Lectura de tablas SQLite en modo de solo lectura, con conexiones reutilizadas,
+    lectura por bloques, filtros y límites aplicados en la propia consulta y
+    lectura en paralelo por rangos de rowid para tablas grandes.
+
+    Atributos:
+        ruta (str): Ruta al archivo de base de datos.
+        inmutable (bool): Si la base de datos se abre con `immutable=1`.
+    """
+    def __init__(self, ruta, inmutable=False):
+        """
+        Inicializa la fuente sin abrir todavía ninguna conexión.
+
+        Parámetros:
+            ruta (str): Ruta al archivo de base de datos SQLite.
+            inmutable (bool): Abrir la base de datos como inmutable (ver `obtener_conexion`).
+        """
+        self.ruta = ruta
+        self.inmutable = inmutable
+
+    def conexion(self):
+        """
+        Devuelve la conexión de solo lectura del hilo actual.
+        """
+        return obtener_conexion(self.ruta, self.inmutable)
+
+    def tablas(self):
+        """
+        Devuelve los nombres de las tablas de la base de datos.
+        """
+        tablas = pd.read_sql_query("SELECT name FROM sqlite_master WHERE type='table';", self.conexion())
+        return list(tablas['name'])
+
+    def columnas(self, tabla):
+        """
+        Devuelve los nombres de las columnas de una tabla sin leer sus filas.
+        """
+        info = pd.read_sql_query(f"PRAGMA table_info({citar_identificador(tabla)});", self.conexion())
+        return list(info['name'])
+
+    def consulta(self, tabla, columnas=None, where=None, limite=None):
+        """
+        Construye la consulta SELECT con las columnas, el filtro y el límite indicados.
+
+        Parámetros:
+            tabla (str): Tabla a consultar.
+            columnas (list, opcional): Columnas a seleccionar; por defecto, todas.
+            where (str, opcional): Condición SQL, que puede usar parámetros `?`.
+            limite (int, opcional): Número máximo de filas.
+
+        Retorna:
+            str: Consulta SQL.
+        """
+        seleccion = ", ".join(citar_identificador(col) for col in columnas) if columnas else "*"
+        query = f"SELECT {seleccion} FROM {citar_identificador(tabla)}"
+        if where:
+            query += f" WHERE {where}"
+        if limite is not None:
+            query += f" LIMIT {int(limite)}"
+        return query
+
+    def leer(self, tabla, columnas=None, where=None, parametros=(), limite=None, tipos=None):
+        """
+        Lee una tabla (o la parte filtrada) en un único DataFrame.
+
+        Parámetros:
+            tabla (str): Tabla a leer.
+            columnas (list, opcional): Columnas a leer.
+            where (str, opcional): Condición SQL con parámetros `?`.
+            parametros (tuple): Valores de los parámetros de `where`.
+            limite (int, opcional): Número máximo de filas.
+            tipos (dict, opcional): Tipo de dato de cada columna.
+
+        Retorna:
+            pd.DataFrame: Filas leídas.
+        """
+        query = self.consulta(tabla, columnas, where, limite)
+        return pd.read_sql_query(query, self.conexion(), params=tuple(parametros), dtype=tipos)
+
+    def leer_bloques(self, tabla, tamano_bloque, columnas=None, where=None, parametros=(), limite=None, tipos=None):
+        """
+        Lee una tabla por bloques de filas; el cursor va entregando las filas (fetchmany)
+        sin reunir la tabla completa en memoria.
+
+        Parámetros:
+            tabla (str): Tabla a leer.
+            tamano_bloque (int): Número de filas por bloque.
+            columnas, where, parametros, limite, tipos: Como en `leer`.
+
+        Retorna:
+            generator: Bloques (pd.DataFrame), en orden.
+        """
+        query = self.consulta(tabla, columnas, where, limite)
+        for bloque in pd.read_sql_query(query, self.conexion(), params=tuple(parametros), dtype=tipos, chunksize=tamano_bloque):
+            yield bloque
+
+    def leer_paralelo(self, tabla, hilos=4, columnas=None, where=None, parametros=(), tipos=None):
+        """
+        Lee una tabla grande repartiendo rangos de rowid entre varios hilos, cada uno con su
+        propia conexión, y une los resultados en el orden de la tabla.
+
+        Si la tabla no tiene rowid (WITHOUT ROWID) se lee de forma secuencial.
+
+        Parámetros:
+            tabla (str): Tabla a leer.
+            hilos (int): Número de hilos de lectura.
+            columnas, where, parametros, tipos: Como en `leer`.
+
+        Retorna:
+            pd.DataFrame: Filas leídas.
+        """
+        try:
+            minimo, maximo = self.conexion().execute(
+                f"SELECT min(rowid), max(rowid) FROM {citar_identificador(tabla)}"
+            ).fetchone()
+        except sqlite3.OperationalError:
+            return self.leer(tabla, columnas, where, parametros, tipos=tipos)
+        if minimo is None or hilos <= 1:
+            return self.leer(tabla, columnas, where, parametros, tipos=tipos)
+
+        paso = (maximo - minimo) // hilos + 1
+        rangos = [(inicio, min(inicio + paso - 1, maximo)) for inicio in range(minimo, maximo + 1, paso)]
+        condicion = "rowid BETWEEN ? AND ?" + (f" AND ({where})" if where else "")
+        query = self.consulta(tabla, columnas, condicion) + " ORDER BY rowid"
+
+        def leer_rango(rango):
+            conexion = conectar(self.ruta, self.inmutable) # Conexión propia del hilo de lectura
+            try:
+                return pd.read_sql_query(query, conexion, params=(*rango, *parametros), dtype=tipos)
+            finally:
+                conexion.close()
+
+        with ThreadPoolExecutor(max_workers=hilos) as ejecutor:
+            partes = list(ejecutor.map(leer_rango, rangos))
+        return pd.concat(partes, ignore_index=True)
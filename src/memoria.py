@@ -0,0 +1,96 @@
+import ctypes
+import os
+import sys
+
+try:
+    import resource
+except ImportError: # No disponible en Windows
+    resource = None
+
+RUTA_ESTADO = "/proc/self/status"
+RUTA_CLEAR_REFS = "/proc/self/clear_refs"
+
+
+def _leer_estado_linux(campo):
+    """
+    Lee un campo en kB de /proc/self/status (por ejemplo, "VmRSS" o "VmHWM") y lo devuelve en MB.
+    """
+    with open(RUTA_ESTADO) as estado:
+        for linea in estado:
+            if linea.startswith(campo + ":"):
+                return int(linea.split()[1]) / 1024
+    return None
+
+
+def _contadores_windows():
+    """
+    Devuelve los contadores de memoria del proceso actual en Windows (GetProcessMemoryInfo).
+    """
+    class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+        _fields_ = [
+            ("cb", ctypes.c_ulong),
+            ("PageFaultCount", ctypes.c_ulong),
+            ("PeakWorkingSetSize", ctypes.c_size_t),
+            ("WorkingSetSize", ctypes.c_size_t),
+            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+            ("PagefileUsage", ctypes.c_size_t),
+            ("PeakPagefileUsage", ctypes.c_size_t),
+        ]
+    contadores = PROCESS_MEMORY_COUNTERS()
+    contadores.cb = ctypes.sizeof(contadores)
+    proceso = ctypes.windll.kernel32.GetCurrentProcess()
+    ctypes.windll.psapi.GetProcessMemoryInfo(proceso, ctypes.byref(contadores), contadores.cb)
+    return contadores
+
+
+def rss_mb():
+    """
+    Devuelve la memoria residente (RSS) actual del proceso en MB, o None si no se puede medir.
+    """
+    try:
+        if os.path.exists(RUTA_ESTADO):
+            return _leer_estado_linux("VmRSS")
+        if sys.platform == "win32":
+            return _contadores_windows().WorkingSetSize / 1024 ** 2
+    except (OSError, AttributeError, ValueError):
+        pass
+    return None
+
+
+def pico_rss_mb():
+    """
+    Devuelve el pico de memoria residente (RSS) del proceso en MB, o None si no se puede medir.
+
+    En Linux es el pico desde la última llamada a `reiniciar_pico_rss`; en el resto de
+    sistemas es el pico desde el inicio del proceso.
+    """
+    try:
+        if os.path.exists(RUTA_ESTADO):
+            return _leer_estado_linux("VmHWM")
+        if sys.platform == "win32":
+            return _contadores_windows().PeakWorkingSetSize / 1024 ** 2
+        if resource is not None:
+            pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            return pico / 1024 ** 2 if sys.platform == "darwin" else pico / 1024 # macOS lo da en bytes
+    except (OSError, AttributeError, ValueError):
+        pass
+    return None
+
+
+def reiniciar_pico_rss():
+    """
+    Reinicia el pico de memoria residente del proceso para medir el de la siguiente operación.
+    Solo es posible en Linux; en otros sistemas no hace nada.
+
+    Retorna:
+        bool: True si el pico se ha reiniciado.
+    """
+    try:
+        with open(RUTA_CLEAR_REFS, "w") as clear_refs:
+            clear_refs.write("5")
+        return True
+    except OSError:
+        return False
@@ -1,7 +1,14 @@
+import argparse
+import os
+
 from data_loader import DataLoader
 from preprocesado_datos import PreprocesadoDatos
 from visualizador_datos import VisualizadorDatos
 from exportador_datos import ExportarDatos
+from fuente_sqlite import cerrar_conexiones
+from cache_resultados import AlmacenCache, CacheFuentes
+from pipeline_ajustado import PipelineAjustado
+from perfilado import Perfilador
 
 
 class Menu:
@@ -17,15 +24,29 @@ class Menu:
     Asegura que los pasos se realicen en orden y que cada etapa se habilite
     solo si la etapa anterior ha sido completada correctamente.
     """
-    def __init__(self):
+    def __init__(self, ahorro_memoria=False, optimizar_tipos=False, hilos=1, cache=None):
         """
         Inicializa el menú y su estado.
+
+        Parámetros:
+            ahorro_memoria (bool): Si es True, el preprocesado trabaja en modo de ahorro de memoria
+                (sin copia completa del dataset y con el pico de memoria de cada paso).
+            optimizar_tipos (bool): Si es True, al cargar los datos se reducen sus tipos
+                (enteros y decimales más pequeños, texto como categoría).
+            hilos (int): Número de hilos entre los que el preprocesado reparte las columnas.
+            cache (AlmacenCache, opcional): Caché en disco de los archivos analizados y del resultado
+                de cada paso del preprocesado.
         """
+        self.ahorro_memoria = ahorro_memoria
+        self.hilos = hilos
+        self.cache = cache
         self.reiniciar_estado()
-        self.data_loader = DataLoader()
+        self.data_loader = DataLoader(optimizar_memoria=optimizar_tipos,
+                                      cache=CacheFuentes(cache) if cache is not None else None)
         self.preprocesado_datos = None
         self.visualizador_datos = None
         self.exportador = None
+        self.perfilador = Perfilador() # Tiempo, memoria, filas y bytes de cada etapa (opción 6)
 
         # Diccionarios que mapean las opciones del menú a las funciones del sistema
         self.opciones_estado = {
@@ -96,6 +117,7 @@ class Menu:
             print("[-] 5. Salir")
         else:
             print("[✓] 5. Salir")
+        print("[-] 6. Perfil de rendimiento")
         
 
     def habilitado(self, texto, hab, error):
@@ -136,7 +158,7 @@ class Menu:
             if self.estado_subopciones["manejo_datos_faltantes"]:
                 print("No se puede volver a seleccionar columnas después de comenzar el manejo de datos faltantes.")
             else:
-                self.preprocesado_datos = PreprocesadoDatos(self.data_loader)
+                self.preprocesado_datos = PreprocesadoDatos(self.data_loader, self.ahorro_memoria, self.hilos, self.cache)
                 desbloquear = self.preprocesado_datos.seleccionar_columnas()
                 if desbloquear:
                     self.estado_subopciones["seleccionar_columnas"] = True # Habilita el siguiente paso
@@ -175,19 +197,30 @@ class Menu:
                 self.preprocesado_datos.dataset_modificado,  # Datos preprocesados
                 self.preprocesado_datos.columnas_seleccionadas,  # Columnas seleccionadas
                 self.preprocesado_datos.columnas_numericas,  # Columnas numéricas
-                self.preprocesado_datos.columnas_categoricas  # Columnas categóricas
+                self.preprocesado_datos.columnas_categoricas,  # Columnas categóricas
+                estadisticas=self.preprocesado_datos.estadisticas  # Estadísticas ya calculadas al preprocesar
             )
             self.visualizador_datos.menu_visualizacion()  # Llamar al menú de visualización
             self.estado["visualizar_datos"] = True # Habilita el siguiente paso
         # Paso 4: Exportación de datos
         elif opcion == "4" and self.estado["visualizar_datos"]:
-            self.exportador = ExportarDatos(self.preprocesado_datos.dataset_modificado)
+            bloques = None
+            if self.data_loader.archivo_bloques is not None:
+                # En modo por bloques se recorre el archivo completo aplicando los pasos elegidos
+                print("Calculando estadísticas globales del archivo por bloques...")
+                self.preprocesado_datos.ajustar_bloques(self.data_loader.iterar_bloques)
+                bloques = self.preprocesado_datos.procesar_bloques(self.data_loader.iterar_bloques())
+            self.exportador = ExportarDatos(self.preprocesado_datos.dataset_modificado, bloques)
             desbloquear = self.exportador.exportar()
             if desbloquear:
+                self.guardar_pipeline()
                 self.estado["exportar_datos"] = True # Habilita el siguiente paso
         # Paso 5: Salir del menú
         elif opcion == "5":
             return self.salir()
+        # Perfil de rendimiento de las etapas ejecutadas
+        elif opcion == "6":
+            self.ver_perfil()
         else:
             print("Opción no válida o bloqueada. Intente nuevamente.")
         return True
@@ -210,6 +243,7 @@ class Menu:
             opcion = input("Seleccione una opción: ")
             if opcion == "1":
                 print("\n Cerrando la aplicación...")
+                cerrar_conexiones() # Cierra las conexiones SQLite reutilizadas
                 return False # Finaliza el bucle principal en `iniciar()`
             elif opcion == "2":
                 print("\n Regresando al menú principal...")
@@ -221,7 +255,7 @@ class Menu:
         """
         Método que permite al usuario cargar datos desde diferentes fuentes.
 
-        Ofrece opciones para cargar archivos CSV, Excel o bases de datos SQLite.
+        Ofrece opciones para cargar archivos CSV, Excel, Parquet, Feather o bases de datos SQLite.
         Si la carga es exitosa, actualiza el estado interno y muestra un resumen del dataset.
         """
         if self.estado["cargar_datos"]:
@@ -236,19 +270,44 @@ class Menu:
         print("  [1] CSV")
         print("  [2] Excel")
         print("  [3] SQLite")
-        print("  [4] Volver al menú principal")
+        print("  [4] Parquet")
+        print("  [5] Feather / Arrow")
+        print("  [6] Estadísticas de la caché de archivos")
+        print("  [7] Volver al menú principal")
         # Lógica de carga según tipo de archivo
         opcion = input("Seleccione una opción: ")
         if opcion == "1":
             archivo = input("Ingrese la ruta del archivo CSV: ")
-            self.data_loader.cargar_csv(archivo)
+            columnas = self.pedir_columnas(archivo)
+            tamano = input("Tamaño de bloque en filas para archivos grandes (Enter para cargar completo): ").strip()
+            self.data_loader.cargar_csv(archivo, tamano_bloque=int(tamano) if tamano.isdigit() else None, columnas=columnas)
         elif opcion == "2":
             archivo = input("Ingrese la ruta del archivo Excel: ")
-            self.data_loader.cargar_excel(archivo)
+            self.data_loader.cargar_excel(archivo, columnas=self.pedir_columnas(archivo))
         elif opcion == "3":
             archivo = input("Ingrese la ruta de la base de datos SQLite: ")
-            self.data_loader.cargar_sqlite(archivo)
+            tabla = self.data_loader.seleccionar_tabla(archivo) if os.path.exists(archivo) else None
+            if tabla is not None:
+                columnas = self.pedir_columnas(archivo, tabla)
+                tamano = input("Tamaño de bloque en filas para tablas grandes (Enter para cargar completa): ").strip()
+                self.data_loader.cargar_sqlite(archivo, tabla=tabla, columnas=columnas,
+                                               tamano_bloque=int(tamano) if tamano.isdigit() else None)
+            else:
+                print("Base de datos no encontrada o tabla no válida.")
         elif opcion == "4":
+            archivo = input("Ingrese la ruta del archivo Parquet: ")
+            columnas = self.pedir_columnas(archivo)
+            filtros = self.pedir_filtros()
+            tamano = input("Tamaño de bloque en filas para archivos grandes (Enter para cargar completo): ").strip()
+            self.data_loader.cargar_parquet(archivo, columnas=columnas, filtros=filtros,
+                                            tamano_bloque=int(tamano) if tamano.isdigit() else None)
+        elif opcion == "5":
+            archivo = input("Ingrese la ruta del archivo Feather: ")
+            self.data_loader.cargar_feather(archivo, columnas=self.pedir_columnas(archivo))
+        elif opcion == "6":
+            self.data_loader.mostrar_estadisticas_cache()
+            return
+        elif opcion == "7":
             return # Vuelve al menú principal sin hacer nada
         else:
             print("Opción no válida. Intente nuevamente.")
@@ -260,6 +319,111 @@ class Menu:
             self.estado["cargar_datos"] = True  # Habilita los siguientes pasos del pipeline
         
 
+    def ver_perfil(self):
+        """
+        Muestra el tiempo, la memoria, las filas y los bytes de cada etapa ejecutada y permite
+        exportarlos a JSON o pedir un perfil detallado (cProfile o tracemalloc) de una etapa.
+        """
+        while True:
+            print("=============================")
+            print("Perfil de Rendimiento")
+            print("=============================")
+            self.perfilador.mostrar()
+            print("\n  [1] Exportar a JSON")
+            print("  [2] Perfilar una etapa con cProfile (tiempo por función)")
+            print("  [3] Perfilar una etapa con tracemalloc (memoria por línea)")
+            print("  [4] Volver al menú principal")
+            opcion = input("Seleccione una opción: ")
+            if opcion == "1":
+                ruta = input("Ruta del archivo JSON: ").strip()
+                try:
+                    self.perfilador.exportar_json(ruta)
+                    print(f'Perfil exportado como "{ruta}".')
+                except OSError as e:
+                    print(f"Error al exportar el perfil: {e}")
+            elif opcion in ("2", "3"):
+                etapas = sorted({registro["etapa"] for registro in self.perfilador.etapas})
+                if etapas:
+                    print("Etapas medidas: " + ", ".join(etapas))
+                etapa = input("Nombre de la etapa (p. ej. PreprocesadoDatos.aplicar_normalizacion): ").strip()
+                if etapa:
+                    destino = self.perfilador.etapas_cprofile if opcion == "2" else self.perfilador.etapas_tracemalloc
+                    destino.add(etapa)
+                    print(f"La próxima vez que se ejecute '{etapa}' se guardará su perfil detallado.")
+            elif opcion == "4":
+                return
+            else:
+                print("Opción no válida. Intente nuevamente.")
+
+    def guardar_pipeline(self):
+        """
+        Ofrece guardar el pipeline ajustado (selección y pasos con sus parámetros) para
+        aplicarlo después a datos nuevos sin repetir el preprocesado.
+        """
+        ruta = input("Ruta para guardar el pipeline ajustado (.pkl, Enter para omitir): ").strip()
+        if not ruta:
+            return
+        try:
+            PipelineAjustado.desde_preprocesado(self.preprocesado_datos).guardar(ruta)
+            print(f'Pipeline ajustado guardado en "{ruta}".')
+        except Exception as e:
+            print(f"Error al guardar el pipeline: {e}")
+
+    def pedir_columnas(self, archivo, tabla=None):
+        """
+        Muestra las columnas de un archivo (leyendo solo su cabecera) y permite al usuario
+        elegir cuáles cargar, de forma que las demás no se lean ni ocupen memoria.
+
+        Parámetros:
+            archivo (str): Ruta al archivo de datos.
+            tabla (str, opcional): Tabla de la base de datos SQLite.
+
+        Retorna:
+            list: Columnas elegidas, o None para cargar todas.
+        """
+        if not os.path.exists(archivo):
+            return None
+        try:
+            columnas = self.data_loader.obtener_columnas(archivo, tabla)
+        except Exception:
+            return None # Si no se puede leer la cabecera, la carga informará del error
+        print("Columnas disponibles en el archivo:")
+        for i, columna in enumerate(columnas, 1):
+            print(f"  [{i}] {columna}")
+        entrada = input("Números de las columnas a cargar, separados por comas (Enter para todas): ").strip()
+        if not entrada:
+            return None
+        try:
+            return [columnas[int(x.strip()) - 1] for x in entrada.split(",")]
+        except (ValueError, IndexError):
+            print("Selección no válida. Se cargarán todas las columnas.")
+            return None
+
+    def pedir_filtros(self):
+        """
+        Pide al usuario condiciones de filtrado de filas para archivos Parquet, con el formato
+        `columna operador valor` separadas por comas (por ejemplo, "Pclass == 1, Age > 30").
+
+        Retorna:
+            list: Condiciones como tuplas (columna, operador, valor), o None para leer todas las filas.
+        """
+        entrada = input("Filtro de filas, p. ej. 'Pclass == 1, Age > 30' (Enter para ninguno): ").strip()
+        if not entrada:
+            return None
+        filtros = []
+        for condicion in entrada.split(","):
+            partes = condicion.split()
+            if len(partes) != 3 or partes[1] not in ("==", "!=", "<", "<=", ">", ">="):
+                print("Filtro no válido. Se leerán todas las filas.")
+                return None
+            columna, operador, valor = partes
+            try:
+                valor = float(valor) if "." in valor else int(valor)
+            except ValueError:
+                pass # Se compara como texto
+            filtros.append((columna, operador, valor))
+        return filtros
+
     def iniciar(self):
         """
         Método principal que inicia el ciclo de ejecución del menú.
@@ -267,13 +431,21 @@ class Menu:
         Muestra continuamente el menú principal y espera una opción del usuario.
         Sale del bucle solo si el usuario elige salir y lo confirma.
         """
-        while True:
-            self.menu() # Muestra las opciones disponibles según el estado
-            opcion = input("Seleccione una opción: ")
-            if not self.opciones(opcion):
-                break # Sale si `opciones()` devuelve False (caso de salir)
+        with self.perfilador: # Las etapas se miden mientras el menú está en marcha
+            while True:
+                self.menu() # Muestra las opciones disponibles según el estado
+                opcion = input("Seleccione una opción: ")
+                if not self.opciones(opcion):
+                    break # Sale si `opciones()` devuelve False (caso de salir)
 
 # Programa principal
 if __name__ == "__main__":
-    menu = Menu()
-    menu.iniciar()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Menú interactivo de carga, preprocesado, visualización y exportación de datos.")
+    parser.add_argument("--hilos", type=int, default=1, help="Hilos entre los que se reparten las columnas al preprocesar.")
+    parser.add_argument("--cache", action="store_true", help="Guarda en caché los archivos analizados y el resultado de cada paso.")
+    parser.add_argument("--ahorro-memoria", action="store_true", help="Trabaja sin copiar el dataset original (copy-on-write).")
+    parser.add_argument("--optimizar-tipos", action="store_true", help="Reduce los tipos de datos al cargar.")
+    argumentos = parser.parse_args()
+    menu = Menu(ahorro_memoria=argumentos.ahorro_memoria, optimizar_tipos=argumentos.optimizar_tipos,
+                hilos=argumentos.hilos, cache=AlmacenCache() if argumentos.cache else None)
+    menu.iniciar()
@@ -0,0 +1,278 @@
+import contextlib
+import cProfile
+import functools
+import inspect
+import io
+import json
+import os
+import pstats
+import time
+import tracemalloc
+
+from memoria import pico_rss_mb, reiniciar_pico_rss, rss_mb
+
+# Perfilador activo en el proceso (ver `Perfilador.activar`); None si no se mide nada
+_activo = None
+
+
+def perfilador_activo():
+    """
+    Devuelve el perfilador activo, o None si no hay ninguno.
+    """
+    return _activo
+
+
+def etapa_en_curso():
+    """
+    Indica si se está midiendo alguna etapa en este momento.
+    """
+    return _activo is not None and bool(_activo._pila)
+
+
+def medir_etapa(nombre=None, entrada=None, salida=None, archivo_leido=None, archivo_escrito=None):
+    """
+    Decorador de los métodos que forman las etapas del pipeline (carga, pasos de preprocesado,
+    visualización y exportación). Si hay un perfilador activo, registra la etapa en él; si no,
+    el método se ejecuta sin ninguna medición.
+
+    Parámetros:
+        nombre (str, opcional): Nombre de la etapa; por defecto, "<Clase>.<método>".
+        entrada (str, opcional): Atributo del objeto con el DataFrame cuyas filas se cuentan
+            antes de la etapa (filas de entrada).
+        salida (str, opcional): Atributo del objeto con el DataFrame cuyas filas se cuentan
+            después de la etapa (filas de salida). Si el método devuelve un entero, se toma
+            como el número de filas de salida (por ejemplo, las filas exportadas).
+        archivo_leido (str, opcional): Argumento con la ruta del archivo que lee la etapa.
+        archivo_escrito (str, opcional): Argumento con la ruta del archivo que escribe la etapa.
+    """
+    def decorador(metodo):
+        firma = inspect.signature(metodo)
+        etapa = nombre or metodo.__qualname__
+
+        @functools.wraps(metodo)
+        def envoltura(self, *args, **kwargs):
+            if _activo is None:
+                return metodo(self, *args, **kwargs)
+            argumentos = firma.bind(self, *args, **kwargs).arguments
+            with _activo.medir(etapa) as registro:
+                if entrada:
+                    registro["filas_entrada"] = _contar_filas(getattr(self, entrada, None))
+                if archivo_leido:
+                    registro["bytes_leidos"] = _tamano_archivo(argumentos.get(archivo_leido))
+                resultado = metodo(self, *args, **kwargs)
+                if salida:
+                    registro["filas_salida"] = _contar_filas(getattr(self, salida, None))
+                if isinstance(resultado, int) and not isinstance(resultado, bool):
+                    registro["filas_salida"] = resultado
+                if archivo_escrito:
+                    registro["bytes_escritos"] = _tamano_archivo(argumentos.get(archivo_escrito))
+            return resultado
+
+        return envoltura
+
+    return decorador
+
+
+def _contar_filas(datos):
+    """
+    Devuelve el número de filas de un DataFrame, o None si no hay datos.
+    """
+    return len(datos) if datos is not None else None
+
+
+def _tamano_archivo(ruta):
+    """
+    Devuelve el tamaño en bytes de un archivo, o None si no existe.
+    """
+    try:
+        return os.path.getsize(ruta)
+    except (OSError, TypeError):
+        return None
+
+
+class Perfilador:
+    """
+    Registra, para cada etapa del pipeline, el tiempo real, el tiempo de CPU, la memoria, las
+    filas de entrada y de salida y los bytes leídos y escritos.
+
+    Las etapas se miden con los métodos decorados con `medir_etapa` mientras el perfilador está
+    activo. Además, se puede pedir un perfil detallado de una etapa concreta con cProfile (tiempo
+    por función) o con tracemalloc (pico de memoria reservada por Python y líneas que más reservan).
+
+    El pico de memoria residente (RSS) es el de la etapa en Linux; en otros sistemas, el del
+    proceso desde su inicio. Si una etapa se ejecuta dentro de otra, el pico de la exterior
+    incluye el de la interior.
+
+    Atributos:
+        etapas (list): Un diccionario por etapa medida, en orden de finalización.
+        etapas_cprofile (set): Etapas que se perfilan con cProfile.
+        etapas_tracemalloc (set): Etapas que se perfilan con tracemalloc.
+        lineas_perfil (int): Número de funciones o líneas que se guardan de cada perfil detallado.
+    """
+    def __init__(self, etapas_cprofile=(), etapas_tracemalloc=(), lineas_perfil=15):
+        """
+        Inicializa el perfilador, sin activarlo.
+
+        Parámetros:
+            etapas_cprofile (iterable): Nombres de las etapas que se perfilan con cProfile.
+            etapas_tracemalloc (iterable): Nombres de las etapas que se perfilan con tracemalloc.
+            lineas_perfil (int): Número de funciones o líneas de cada perfil detallado.
+        """
+        self.etapas = []
+        self.etapas_cprofile = set(etapas_cprofile)
+        self.etapas_tracemalloc = set(etapas_tracemalloc)
+        self.lineas_perfil = lineas_perfil
+        self._pila = [] # Etapas en curso, para no reiniciar el pico de memoria de una etapa exterior
+
+    def activar(self):
+        """
+        Activa el perfilador en el proceso: a partir de ahora, las etapas se registran en él.
+        """
+        global _activo
+        _activo = self
+        return self
+
+    def desactivar(self):
+        """
+        Desactiva el perfilador si es el activo.
+        """
+        global _activo
+        if _activo is self:
+            _activo = None
+
+    def __enter__(self):
+        return self.activar()
+
+    def __exit__(self, *excepcion):
+        self.desactivar()
+
+    @contextlib.contextmanager
+    def medir(self, etapa):
+        """
+        Mide un bloque de código como una etapa. Dentro del bloque se pueden completar las
+        claves "filas_entrada", "filas_salida", "bytes_leidos" y "bytes_escritos" del registro.
+
+        Parámetros:
+            etapa (str): Nombre de la etapa.
+
+        Retorna:
+            dict: Registro de la etapa (mediante `with ... as registro`).
+        """
+        registro = {"etapa": etapa, "filas_entrada": None, "filas_salida": None,
+                    "bytes_leidos": None, "bytes_escritos": None}
+        if not self._pila:
+            reiniciar_pico_rss()
+        self._pila.append(etapa)
+        perfil = cProfile.Profile() if etapa in self.etapas_cprofile else None
+        trazar = etapa in self.etapas_tracemalloc and not tracemalloc.is_tracing()
+        if trazar:
+            tracemalloc.start()
+        inicio, inicio_cpu = time.perf_counter(), time.process_time()
+        if perfil is not None:
+            perfil.enable()
+        try:
+            yield registro
+            registro["estado"] = "ok"
+        except BaseException as e:
+            registro["estado"] = f"error: {type(e).__name__}"
+            raise
+        finally:
+            if perfil is not None:
+                perfil.disable()
+            registro["segundos"] = time.perf_counter() - inicio
+            registro["segundos_cpu"] = time.process_time() - inicio_cpu
+            registro["rss_mb"] = rss_mb()
+            registro["pico_rss_mb"] = pico_rss_mb()
+            if perfil is not None:
+                registro["cprofile"] = self._resumen_cprofile(perfil)
+            if trazar:
+                registro["tracemalloc"] = self._resumen_tracemalloc()
+                tracemalloc.stop()
+            self._pila.pop()
+            self.etapas.append(registro)
+
+    def _resumen_cprofile(self, perfil):
+        """
+        Devuelve las funciones con más tiempo acumulado de un perfil de cProfile, como texto.
+        """
+        salida = io.StringIO()
+        pstats.Stats(perfil, stream=salida).sort_stats("cumulative").print_stats(self.lineas_perfil)
+        return salida.getvalue()
+
+    def _resumen_tracemalloc(self):
+        """
+        Devuelve el pico de memoria reservada por Python durante la etapa y las líneas que
+        más memoria mantienen reservada al terminar.
+        """
+        _, pico = tracemalloc.get_traced_memory()
+        lineas = tracemalloc.take_snapshot().statistics("lineno")[:self.lineas_perfil]
+        return {
+            "pico_mb": pico / 1024 ** 2,
+            "lineas": [{"linea": str(estadistica.traceback), "mb": estadistica.size / 1024 ** 2}
+                       for estadistica in lineas],
+        }
+
+    def resumen(self):
+        """
+        Devuelve el total de cada métrica por etapa, sumando las ejecuciones repetidas de una
+        misma etapa, en el orden en que se ejecutaron por primera vez.
+
+        Retorna:
+            list: Un diccionario por etapa con "etapa", "ejecuciones", "segundos", "segundos_cpu",
+                "pico_rss_mb" (el mayor), "filas_entrada" y "filas_salida" (de la última ejecución),
+                "bytes_leidos" y "bytes_escritos".
+        """
+        totales = {}
+        for registro in self.etapas:
+            total = totales.setdefault(registro["etapa"], {
+                "etapa": registro["etapa"], "ejecuciones": 0, "segundos": 0.0, "segundos_cpu": 0.0,
+                "pico_rss_mb": None, "filas_entrada": None, "filas_salida": None,
+                "bytes_leidos": None, "bytes_escritos": None,
+            })
+            total["ejecuciones"] += 1
+            total["segundos"] += registro["segundos"]
+            total["segundos_cpu"] += registro["segundos_cpu"]
+            if registro["pico_rss_mb"] is not None:
+                total["pico_rss_mb"] = max(total["pico_rss_mb"] or 0.0, registro["pico_rss_mb"])
+            for clave in ("filas_entrada", "filas_salida"):
+                if registro[clave] is not None:
+                    total[clave] = registro[clave]
+            for clave in ("bytes_leidos", "bytes_escritos"):
+                if registro[clave] is not None:
+                    total[clave] = (total[clave] or 0) + registro[clave]
+        return list(totales.values())
+
+    def mostrar(self):
+        """
+        Muestra una tabla con las métricas de cada etapa (ver `resumen`).
+        """
+        if not self.etapas:
+            print("Todavía no se ha medido ninguna etapa.")
+            return
+        print(f"{'Etapa':<44}{'Real (s)':>10}{'CPU (s)':>10}{'Pico (MB)':>11}"
+              f"{'Filas ent.':>12}{'Filas sal.':>12}{'Leído (MB)':>12}{'Escrito (MB)':>14}")
+        formato = lambda valor, patron: format(valor, patron) if valor is not None else "-"
+        for total in self.resumen():
+            etapa = total["etapa"] if total["ejecuciones"] == 1 else f"{total['etapa']} (x{total['ejecuciones']})"
+            leidos = total["bytes_leidos"] / 1024 ** 2 if total["bytes_leidos"] is not None else None
+            escritos = total["bytes_escritos"] / 1024 ** 2 if total["bytes_escritos"] is not None else None
+            print(f"{etapa:<44}{total['segundos']:>10.3f}{total['segundos_cpu']:>10.3f}"
+                  f"{formato(total['pico_rss_mb'], '.1f'):>11}{formato(total['filas_entrada'], 'd'):>12}"
+                  f"{formato(total['filas_salida'], 'd'):>12}{formato(leidos, '.2f'):>12}{formato(escritos, '.2f'):>14}")
+        for registro in self.etapas:
+            if "cprofile" in registro:
+                print(f"\ncProfile de {registro['etapa']}:\n{registro['cprofile']}")
+            if "tracemalloc" in registro:
+                print(f"\ntracemalloc de {registro['etapa']}: pico de {registro['tracemalloc']['pico_mb']:.2f} MB")
+                for linea in registro["tracemalloc"]["lineas"]:
+                    print(f"  {linea['mb']:8.3f} MB  {linea['linea']}")
+
+    def exportar_json(self, ruta):
+        """
+        Guarda las mediciones (el resumen por etapa y el registro de cada ejecución) en un archivo JSON.
+
+        Parámetros:
+            ruta (str): Ruta del archivo de salida.
+        """
+        with open(ruta, "w", encoding="utf-8") as archivo:
+            json.dump({"resumen": self.resumen(), "etapas": self.etapas}, archivo, ensure_ascii=False, indent=2)
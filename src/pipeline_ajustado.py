@@ -0,0 +1,137 @@
+import copy
+import pickle
+
+from preprocesado_datos import PreprocesadoDatos, invertir_label
+
+VERSION_FORMATO = 1
+
+
+class PipelineAjustado:
+    """
+    Pipeline de preprocesado ya ajustado: la selección de columnas y los pasos aplicados,
+    con los parámetros calculados al ajustarlos (valores de relleno, categorías, escalador,
+    límites del IQR...).
+
+    Permite transformar datos nuevos (por ejemplo, lotes de inferencia) exactamente igual
+    que los datos de ajuste, sin preguntas al usuario y sin volver a calcular nada, y se
+    puede guardar en disco y cargar después.
+
+    Atributos:
+        seleccion (dict): Selección de columnas (ver `PreprocesadoDatos.seleccion`).
+        pasos (list): Pasos con las claves "paso", "estrategia" y "parametros".
+        columnas (list): Columnas del resultado del ajuste, en orden. Las columnas one-hot de
+            categorías que no aparecen en los datos nuevos se crean con ceros, y las de
+            categorías nuevas se descartan, de modo que el resultado siempre tiene esta forma.
+    """
+    def __init__(self, seleccion, pasos, columnas=None):
+        """
+        Inicializa el pipeline con una selección y unos pasos ya ajustados.
+
+        Parámetros:
+            seleccion (dict): Selección de columnas.
+            pasos (list): Pasos registrados, con sus parámetros.
+            columnas (list, opcional): Columnas del resultado del ajuste.
+        """
+        self.seleccion = seleccion
+        self.pasos = pasos
+        self.columnas = columnas
+
+    @classmethod
+    def desde_preprocesado(cls, preprocesado):
+        """
+        Crea el pipeline a partir de los pasos aplicados en un `PreprocesadoDatos`.
+
+        Los pasos se copian, de modo que cambios posteriores en el preprocesador no afectan al pipeline.
+
+        Parámetros:
+            preprocesado (PreprocesadoDatos): Preprocesador con la selección hecha y los pasos aplicados.
+
+        Retorna:
+            PipelineAjustado: Pipeline ajustado.
+        """
+        if preprocesado.seleccion is None:
+            raise ValueError("El preprocesador no tiene ninguna selección de columnas.")
+        return cls(copy.deepcopy(preprocesado.seleccion), copy.deepcopy(preprocesado.pasos),
+                   list(preprocesado.dataset_modificado.columns))
+
+    def transformar(self, datos, hilos=1):
+        """
+        Aplica el pipeline a unos datos nuevos. Los datos no se modifican.
+
+        Parámetros:
+            datos (pd.DataFrame): Datos con (al menos) las features originales; el target es opcional.
+            hilos (int): Número de hilos (ver `PreprocesadoDatos`).
+
+        Retorna:
+            pd.DataFrame: Datos transformados.
+        """
+        preprocesado = PreprocesadoDatos.desde_seleccion(datos, self.seleccion, hilos)
+        preprocesado.reproducir_pasos(self.pasos)
+        resultado = preprocesado.dataset_modificado
+        if self.columnas is None:
+            return resultado
+        columnas = [col for col in self.columnas if col != self.seleccion["target"] or col in resultado.columns]
+        if list(resultado.columns) != columnas:
+            resultado = resultado.reindex(columns=columnas, fill_value=0)
+        return resultado
+
+    def transformar_bloques(self, bloques, hilos=1):
+        """
+        Aplica el pipeline a una secuencia de bloques, de uno en uno.
+
+        Parámetros:
+            bloques (iterable): Bloques de datos nuevos (pd.DataFrame).
+            hilos (int): Número de hilos (ver `PreprocesadoDatos`).
+
+        Retorna:
+            generator: Bloques transformados, en el mismo orden.
+        """
+        for bloque in bloques:
+            yield self.transformar(bloque, hilos)
+
+    def invertir_label(self, datos):
+        """
+        Deshace la codificación "label" del pipeline en unos datos transformados, por ejemplo
+        para mostrar las categorías originales junto a las predicciones.
+
+        Parámetros:
+            datos (pd.DataFrame): Datos transformados con el pipeline.
+
+        Retorna:
+            pd.DataFrame: Copia de los datos con las categorías originales.
+        """
+        return invertir_label(datos, self.pasos)
+
+    def guardar(self, ruta):
+        """
+        Guarda el pipeline en un archivo (formato pickle).
+
+        Parámetros:
+            ruta (str): Ruta del archivo de salida.
+        """
+        contenido = {"version": VERSION_FORMATO, "seleccion": self.seleccion, "pasos": self.pasos, "columnas": self.columnas}
+        with open(ruta, "wb") as archivo:
+            pickle.dump(contenido, archivo, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def cargar(cls, ruta):
+        """
+        Carga un pipeline guardado con `guardar`.
+
+        Como cualquier archivo pickle, solo se deben cargar archivos de confianza.
+
+        Parámetros:
+            ruta (str): Ruta del archivo.
+
+        Retorna:
+            PipelineAjustado: Pipeline cargado.
+
+        Lanza:
+            ValueError: Si el archivo no contiene un pipeline en un formato compatible.
+        """
+        with open(ruta, "rb") as archivo:
+            contenido = pickle.load(archivo)
+        if not isinstance(contenido, dict) or contenido.get("version") != VERSION_FORMATO:
+            raise ValueError(f"El archivo {ruta} no contiene un pipeline ajustado compatible.")
+        return cls(contenido["seleccion"], contenido["pasos"], contenido["columnas"])
+
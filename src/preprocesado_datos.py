@@ -1,25 +1,269 @@
+import contextlib
+import copy
+import functools
+import inspect
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
 import pandas as pd
-from sklearn.preprocessing import LabelEncoder, MinMaxScaler, StandardScaler
+import scipy.sparse
+from sklearn.preprocessing import MinMaxScaler, StandardScaler
+
+from cache_resultados import calcular_clave, huella_archivo
+from data_loader import DataLoader
+from estadisticas_bloques import (EstadisticasNumericas, MediasPorCategoria, SketchCuantiles, TablaFrecuencias,
+                                  combinar_acumuladores, ordenar_categorias)
+from estadisticas_descriptivas import CacheEstadisticas
+from memoria import pico_rss_mb, reiniciar_pico_rss, rss_mb
+from perfilado import etapa_en_curso, medir_etapa
+
+
+def contexto_copy_on_write():
+    """
+    Devuelve un contexto que activa el modo copy-on-write de pandas solo mientras dura (las selecciones
+    y copias superficiales comparten los datos y solo se copian las columnas que se modifican) y restaura
+    después el valor anterior de la opción. En pandas 3 ya está siempre activo y la opción no existe.
+    """
+    try:
+        pd.get_option("mode.copy_on_write")
+    except (KeyError, ValueError):
+        return contextlib.nullcontext()
+    return pd.option_context("mode.copy_on_write", True)
+
+
+def con_copy_on_write(metodo):
+    """
+    Decorador de los métodos que modifican el dataset: en modo de ahorro de memoria se ejecutan
+    dentro de `contexto_copy_on_write`, sin cambiar la opción de pandas para el resto del proceso.
+    """
+    @functools.wraps(metodo)
+    def envoltura(self, *args, **kwargs):
+        with contexto_copy_on_write() if self.ahorro_memoria else contextlib.nullcontext():
+            return metodo(self, *args, **kwargs)
+
+    return envoltura
+
+
+# Estrategias de codificación de columnas categóricas (ver `PreprocesadoDatos.aplicar_datos_categoricos`)
+ESTRATEGIAS_CODIFICACION = (
+    "one_hot", "label", "one_hot_uint8", "one_hot_disperso", "top_k", "hashing", "frecuencia", "target",
+)
+
+# Categoría en la que se agrupan las menos frecuentes con la estrategia "top_k"
+OTRAS_CATEGORIAS = "Otros"
+
+def codificar_label(serie, categorias=None):
+    """
+    Codificación "label" de una columna: cada valor se sustituye por la posición de su categoría
+    en la lista ordenada de categorías.
+
+    Los valores se agrupan con `pd.factorize`, que recorre la columna una sola vez sin convertirla
+    a texto; después solo se ordenan y buscan los valores distintos, no todas las filas.
+
+    Parámetros:
+        serie (pd.Series): Columna a codificar.
+        categorias (list, opcional): Categorías ordenadas (por ejemplo, las calculadas sobre los
+            datos de ajuste). Si no se indican, son los valores distintos de la columna, ordenados.
+
+    Retorna:
+        tuple: (np.ndarray de códigos int64, lista de categorías). Los valores faltantes y las
+            categorías que no están en la lista tienen el código -1.
+    """
+    codigos, unicos = pd.factorize(serie)
+    unicos = np.asarray(unicos, dtype=object)
+    if categorias is None:
+        categorias = ordenar_categorias(unicos)
+    posiciones = pd.Index(categorias, dtype=object).get_indexer(unicos)
+    # El código -1 de factorize (valor faltante) selecciona el -1 añadido al final
+    return np.append(posiciones, -1).astype("int64")[codigos], categorias
+
+
+def codificar_one_hot(df, vocabulario, tipo=np.int64, disperso=False):
+    """
+    Codificación one-hot con un vocabulario fijo: una columna "<columna>_<categoría>" por cada
+    categoría del vocabulario, en su orden, tanto si aparece en los datos como si no. Los valores
+    faltantes y las categorías que no están en el vocabulario dejan todas las columnas a 0.
+
+    Como las columnas dependen solo del vocabulario, los bloques de un archivo (o de varios archivos)
+    codificados por separado tienen siempre la misma disposición y se pueden concatenar sin alinearlos.
+    La matriz de resultado se reserva de una vez y se rellena a partir de los códigos de `codificar_label`.
+
+    Parámetros:
+        df (pd.DataFrame): Datos con las columnas del vocabulario.
+        vocabulario (dict): Lista de categorías de cada columna; por ejemplo, las de
+            `TablaFrecuencias.categorias` acumuladas sobre todos los bloques (ver `escanear_vocabulario`).
+        tipo (numpy dtype): Tipo de las columnas binarias.
+        disperso (bool): Devolver columnas dispersas (`pd.SparseDtype`) en lugar de densas.
+
+    Retorna:
+        pd.DataFrame: Columnas binarias, con el mismo índice que `df`.
+    """
+    nombres = [f"{col}_{categoria}" for col, categorias in vocabulario.items() for categoria in categorias]
+    filas, columnas, desplazamiento = [], [], 0
+    for col, categorias in vocabulario.items():
+        codigos, _ = codificar_label(df[col], categorias)
+        validos = codigos >= 0
+        filas.append(np.flatnonzero(validos))
+        columnas.append(codigos[validos] + desplazamiento)
+        desplazamiento += len(categorias)
+    filas = np.concatenate(filas) if filas else np.empty(0, dtype=np.intp)
+    columnas = np.concatenate(columnas) if columnas else np.empty(0, dtype=np.intp)
+    if disperso:
+        matriz = scipy.sparse.csr_matrix((np.ones(len(filas), dtype=tipo), (filas, columnas)), shape=(len(df), desplazamiento))
+        return pd.DataFrame.sparse.from_spmatrix(matriz, index=df.index, columns=nombres)
+    matriz = np.zeros((len(df), desplazamiento), dtype=tipo)
+    matriz[filas, columnas] = 1
+    return pd.DataFrame(matriz, index=df.index, columns=nombres)
+
+
+def escanear_vocabulario(bloques, columnas):
+    """
+    Recorre una secuencia de bloques (de un archivo o de varios) y cuenta las categorías de
+    cada columna, sin guardar los bloques. Las tablas de distintos recorridos (por ejemplo, de
+    archivos procesados en paralelo) se pueden unir con `combinar_acumuladores`.
+
+    Parámetros:
+        bloques (iterable): Bloques de datos (pd.DataFrame).
+        columnas (list): Columnas categóricas.
+
+    Retorna:
+        dict: `TablaFrecuencias` de cada columna; el vocabulario de `codificar_one_hot` es
+            {col: tabla.categorias() for col, tabla in tablas.items()}.
+    """
+    tablas = {col: TablaFrecuencias() for col in columnas}
+    for bloque in bloques:
+        for col in columnas:
+            tablas[col].actualizar(bloque[col].astype(object))
+    return tablas
+
+
+def invertir_label(datos, pasos):
+    """
+    Deshace la codificación "label" registrada en `pasos`: sustituye los códigos de cada
+    columna codificada por su categoría. El código -1 pasa a ser un valor faltante.
+
+    Parámetros:
+        datos (pd.DataFrame): Datos codificados. No se modifican.
+        pasos (list): Pasos registrados (ver `PreprocesadoDatos.pasos`).
+
+    Retorna:
+        pd.DataFrame: Copia de los datos con las categorías originales.
+
+    Lanza:
+        ValueError: Si no se aplicó la codificación "label" o algún código no es válido.
+    """
+    clases = next((paso["parametros"]["clases"] for paso in reversed(pasos)
+                   if paso["paso"] == "datos_categoricos" and paso["estrategia"] == "label"), None)
+    if clases is None:
+        raise ValueError("No se ha aplicado la codificación label.")
+    resultado = datos.copy()
+    for col, categorias in clases.items():
+        if col not in resultado.columns:
+            continue
+        codigos = resultado[col].to_numpy()
+        if ((codigos < -1) | (codigos >= len(categorias))).any():
+            raise ValueError(f"La columna '{col}' tiene códigos que no corresponden a ninguna categoría.")
+        valores = np.append(np.asarray(categorias, dtype=object), np.nan) # El código -1 toma el último valor
+        resultado[col] = valores[codigos]
+    return resultado
+
+
+# Atributos que describen el estado del preprocesado y se guardan en la caché tras cada paso
+ATRIBUTOS_ESTADO = (
+    "dataset_modificado", "features", "target", "columnas_seleccionadas", "columnas_numericas",
+    "columnas_categoricas", "pasos", "categoricos_transformados", "normalizacion_completada", "outliers_gestionados",
+)
+
+
+def paso_cacheable(aplicar):
+    """
+    Decorador de los métodos `aplicar_*`. Si el preprocesador tiene caché, la clave del paso
+    combina la del estado anterior con el nombre del paso y sus argumentos: si ya está en la
+    caché se restaura el estado guardado sin calcular nada; si no, se aplica el paso y se guarda.
+    """
+    firma = inspect.signature(aplicar)
+
+    @functools.wraps(aplicar)
+    def envoltura(self, *args, **kwargs):
+        if self.cache is None or self._clave_cache is None:
+            return aplicar(self, *args, **kwargs)
+        argumentos = firma.bind(self, *args, **kwargs)
+        argumentos.apply_defaults()
+        del argumentos.arguments["self"]
+        clave = calcular_clave(self._clave_cache, aplicar.__name__, dict(argumentos.arguments))
+        estado = self.cache.obtener(clave)
+        if estado is None:
+            resultado = aplicar(self, *args, **kwargs)
+            estado = {atributo: getattr(self, atributo) for atributo in ATRIBUTOS_ESTADO if hasattr(self, atributo)}
+            estado["resultado"] = resultado
+            self.cache.guardar(clave, estado)
+        else:
+            for atributo in ATRIBUTOS_ESTADO:
+                if atributo in estado:
+                    setattr(self, atributo, estado[atributo])
+            self._cache_atipicos = None
+        self._clave_cache = clave
+        return estado["resultado"]
+
+    return envoltura
+
 
 class PreprocesadoDatos:
     """
     Clase encargada de realizar el preprocesamiento de un conjunto de datos
     cargado previamente mediante el objeto DataLoader.
     """
-    def __init__(self, data_loader):
+    def __init__(self, data_loader, ahorro_memoria=False, hilos=1, cache=None):
         """
         Inicializa el objeto PreprocesadoDatos con el dataset cargado.
 
         Parámetros:
         data_loader (DataLoader): Objeto que contiene el dataset original cargado.
+        ahorro_memoria (bool): Si es True, no se copia el dataset original: los pasos se aplican
+            con el modo copy-on-write de pandas activado solo durante cada paso (ver `con_copy_on_write`),
+            se trabaja solo con las columnas seleccionadas y se muestra el pico de memoria residente
+            (RSS) de cada paso.
+        hilos (int): Número de hilos entre los que se reparten las columnas al imputar, escalar
+            y tratar valores atípicos. NumPy libera el GIL en estas operaciones, por lo que los
+            grupos de columnas se procesan en paralelo; el resultado es idéntico al de un solo hilo.
+        cache (AlmacenCache, opcional): Caché en disco del resultado de cada paso. Al repetir los mismos
+            pasos sobre el mismo archivo (mismo tamaño y fecha de modificación) y con las mismas
+            opciones, el resultado se lee de la caché en lugar de calcularse.
         """
         self.data_loader = data_loader
-        self.dataset_modificado = data_loader.dataset.copy() # Se trabaja sobre una copia del dataset original
+        self.estadisticas = CacheEstadisticas() # Medias, medianas, modas y cuartiles del dataset actual
+        self.ahorro_memoria = ahorro_memoria
+        self.hilos = max(1, int(hilos or 1))
+        if ahorro_memoria:
+            with contexto_copy_on_write():
+                self.dataset_modificado = data_loader.dataset.copy(deep=False) # Comparte los datos hasta que se modifiquen
+            reiniciar_pico_rss()
+        else:
+            self.dataset_modificado = data_loader.dataset.copy() # Se trabaja sobre una copia del dataset original
         self.features = [] # Columnas de entrada seleccionadas
         self.columnas_numericas = [] # Subconjunto de columnas de entrada que son numéricas
         self.target = None # Columna objetivo (variable a predecir)
         self.columnas_seleccionadas = [] # Todas las columnas seleccionadas (features + target)
         self.columnas_categoricas = [] # Columnas categóricas detectadas entre las seleccionadas
+        self.seleccion = None # Selección original de columnas, necesaria para reproducir los pasos sobre bloques
+        self.pasos = [] # Pasos de preprocesado aplicados, en orden, con su estrategia y parámetros
+        self._cache_atipicos = None # Límites y máscara de valores atípicos calculados en la última detección
+        self.memoria_pasos = [] # Pico de memoria de cada paso (solo en modo de ahorro de memoria)
+        self.cache = cache
+        self._clave_cache = None # Clave del estado actual en la caché (None mientras no se han seleccionado columnas)
+
+    @property
+    def dataset_modificado(self):
+        """
+        Dataset con los pasos de preprocesado aplicados hasta el momento.
+        """
+        return self._dataset_modificado
+
+    @dataset_modificado.setter
+    def dataset_modificado(self, datos):
+        self._dataset_modificado = datos
+        self.estadisticas.invalidar()
 
     def seleccionar_columnas(self):
         """
@@ -50,43 +294,88 @@ class PreprocesadoDatos:
             features_idx = [int(x.strip()) for x in features_input.split(",")]
             target_idx = int(target_input)
             # Asigna los nombres de columnas según los índices seleccionados
-            self.features = [columnas[i - 1] for i in features_idx]
-            self.target = columnas[target_idx - 1]
-            df = self.dataset_modificado
-            # Verifica que la columna target no esté dentro de las features
-            if self.target in self.features:
-                print("⚠ Error: La columna de salida no puede ser una feature.")
-                self.features = []
-                self.target = None
-                return False
-            else:
-                # Guarda la selección total y clasifica por tipo de dato
-                df = self.dataset_modificado
-                self.columnas_seleccionadas = self.features + [self.target]
-                # Indentifica las columnas numéricas
-                self.columnas_numericas = [
-                    col for col in self.columnas_seleccionadas
-                    if pd.api.types.is_numeric_dtype(df[col])
-                    ]
-                # Identifica las columnas categóricas
-                self.columnas_categoricas = [
-                    col for col in self.columnas_seleccionadas
-                    if df[col].dtype == 'object' or pd.api.types.is_categorical_dtype(df[col])
-                ]
-
-                print(f"Selección guardada: Features = {self.features}, Target = {self.target}")
-                return True
+            features = [columnas[i - 1] for i in features_idx]
+            target = columnas[target_idx - 1]
+            return self.aplicar_seleccion(features, target)
             
         # Gestión de entradas inválidas
         except (ValueError, IndexError):
             print("⚠ Error: Debe seleccionar columnas válidas. Intente nuevamente.")
             return False
+
+    @medir_etapa(entrada="dataset_modificado", salida="dataset_modificado")
+    @con_copy_on_write
+    def aplicar_seleccion(self, features, target):
+        """
+        Registra la selección de columnas sin interacción con el usuario y
+        clasifica las columnas seleccionadas en numéricas o categóricas.
+
+        Parámetros:
+        features (list): Nombres de las columnas de entrada.
+        target (str): Nombre de la columna de salida.
+
+        Retorna:
+        bool: True si la selección fue válida, False en caso de error.
+        """
+        self.features = list(features)
+        self.target = target
+        df = self.dataset_modificado
+        # Verifica que la columna target no esté dentro de las features
+        if self.target in self.features:
+            print("⚠ Error: La columna de salida no puede ser una feature.")
+            self.features = []
+            self.target = None
+            return False
+        # Guarda la selección total y clasifica por tipo de dato
+        self.columnas_seleccionadas = self.features + [self.target]
+        if self.ahorro_memoria:
+            # Solo se conservan las columnas seleccionadas (sin copiar los datos)
+            self.dataset_modificado = df = df[self.columnas_seleccionadas]
+        # Indentifica las columnas numéricas
+        self.columnas_numericas = [
+            col for col in self.columnas_seleccionadas
+            if pd.api.types.is_numeric_dtype(df[col])
+            ]
+        # Identifica las columnas categóricas
+        self.columnas_categoricas = [
+            col for col in self.columnas_seleccionadas
+            if df[col].dtype == 'object' or isinstance(df[col].dtype, pd.CategoricalDtype)
+        ]
+        self.seleccion = {
+            "features": list(self.features),
+            "target": self.target,
+            "columnas_numericas": list(self.columnas_numericas),
+            "columnas_categoricas": list(self.columnas_categoricas),
+        }
+        if self.cache is not None:
+            self._clave_cache = calcular_clave(self._clave_origen(), self.features, self.target, self.ahorro_memoria)
+        print(f"Selección guardada: Features = {self.features}, Target = {self.target}")
+        if self.ahorro_memoria:
+            self._medir_memoria("seleccion")
+        return True
     
+    def _clave_origen(self):
+        """
+        Identifica los datos de partida para la caché: el archivo (ruta, tamaño y fecha de modificación)
+        y las opciones con las que se cargó o, si no proceden de un archivo, un hash de su contenido.
+        """
+        origen = getattr(self.data_loader, "origen", None)
+        if origen is not None:
+            try:
+                return huella_archivo(origen["ruta"]), origen["formato"], origen["opciones"]
+            except OSError:
+                pass
+        datos = self.data_loader.dataset
+        return "datos", list(datos.columns), pd.util.hash_pandas_object(datos, index=True).to_numpy().tobytes()
+
     def valores_faltantes(self):
         """
         Detecta y permite tratar valores faltantes en las columnas seleccionadas (features y target)
         utilizando diferentes estrategias de imputación o eliminación.
 
+        En modo por bloques solo se conoce la muestra del primer bloque: aunque en ella no haya
+        valores faltantes, se pide la estrategia, que se aplicará a todos los bloques al exportar.
+
         Retorna:
             bool: True si se aplicó alguna estrategia, False si el usuario elige salir.
         """
@@ -101,14 +390,18 @@ class PreprocesadoDatos:
         print("=============================")
 
         # Si no hay valores faltantes, se informa y se termina la función
-        if columnas_con_faltantes.empty:
+        if columnas_con_faltantes.empty and not self._modo_bloques():
             print("No se han detectado valores faltantes en las columnas seleccionadas.")
             return True
-        
-        # Muestra columnas que contienen valores faltantes y la cantidad en cada una
-        print("Se han detectado valores faltantes en las siguientes columnas seleccionadas:")
-        for col, count in columnas_con_faltantes.items():
-            print(f"  - {col}: {count} valores faltantes")
+
+        if columnas_con_faltantes.empty:
+            print("No se han detectado valores faltantes en la muestra del primer bloque, pero el resto del archivo puede tenerlos.")
+        else:
+            # Muestra columnas que contienen valores faltantes y la cantidad en cada una
+            print("Se han detectado valores faltantes en las siguientes columnas seleccionadas"
+                  + (" (en la muestra del primer bloque):" if self._modo_bloques() else ":"))
+            for col, count in columnas_con_faltantes.items():
+                print(f"  - {col}: {count} valores faltantes")
 
         while True:
             print("\nSeleccione una estrategia para manejar los valores faltantes:")
@@ -122,39 +415,27 @@ class PreprocesadoDatos:
 
             # Opción 1: elimina cualquier fila que tenga valores faltantes en las columnas seleccionadas
             if opcion == "1":
-                self.dataset_modificado = df.dropna(subset=columnas_a_revisar)
+                self.aplicar_valores_faltantes("eliminar")
                 print("Filas con valores faltantes eliminadas.")
                 return True
 
             # Opción 2: rellena valores faltantes con la media de cada columna (solo numéricas)
             elif opcion == "2":
-                for col in columnas_con_faltantes.index:
-                    if pd.api.types.is_numeric_dtype(df[col]):
-                        media = df[col].mean()
-                        df[col] = df[col].fillna(media)
-                    else:
-                        print(f"⚠ No se puede calcular la media para la columna '{col}' (no numérica).")
+                for col in self.aplicar_valores_faltantes("media"):
+                    print(f"⚠ No se puede calcular la media para la columna '{col}' (no numérica).")
                 print("Valores faltantes rellenados con la media de cada columna numérica.")
                 return True
 
             # Opción 3: rellena valores faltantes con la mediana de cada columna (solo numéricas)
             elif opcion == "3":
-                for col in columnas_con_faltantes.index:
-                    if pd.api.types.is_numeric_dtype(df[col]):
-                        mediana = df[col].median()
-                        df[col] = df[col].fillna(mediana)
-                        print(mediana)
-                    else:
-                        print(f"⚠ No se puede calcular la mediana para la columna '{col}' (no numérica).")
+                for col in self.aplicar_valores_faltantes("mediana"):
+                    print(f"⚠ No se puede calcular la mediana para la columna '{col}' (no numérica).")
                 print("Valores faltantes rellenados con la mediana de cada columna numérica.")
                 return True
 
             # Opción 4: rellena valores faltantes con la moda de cada columna
             elif opcion == "4":
-                for col in columnas_con_faltantes.index:
-                    moda = df[col].mode()
-                    if not moda.empty:
-                        df[col] = df[col].fillna(moda[0])
+                self.aplicar_valores_faltantes("moda")
                 print("Valores faltantes rellenados con la moda de cada columna.")
                 return True
 
@@ -162,8 +443,7 @@ class PreprocesadoDatos:
             elif opcion == "5":
                 try:
                     constante = input("Seleccione un valor para reemplazar los valores faltantes: ")
-                    for col in columnas_con_faltantes.index:
-                        df[col] = df[col].fillna(constante)
+                    self.aplicar_valores_faltantes("constante", constante=constante)
                     print(f"Valores faltantes reemplazados con el valor '{constante}'.")
                     return True
                 except Exception as e:
@@ -177,6 +457,79 @@ class PreprocesadoDatos:
             else:
                 print("Opción no válida. Intente nuevamente.")
 
+    @medir_etapa(entrada="dataset_modificado", salida="dataset_modificado")
+    @paso_cacheable
+    @con_copy_on_write
+    def aplicar_valores_faltantes(self, estrategia, constante=None, valores=None):
+        """
+        Aplica, sin interacción con el usuario, una estrategia de manejo de valores faltantes
+        sobre las columnas seleccionadas que contienen valores nulos, y registra el paso.
+
+        Parámetros:
+            estrategia (str): "eliminar", "media", "mediana", "moda" o "constante".
+            constante: Valor de relleno para la estrategia "constante".
+            valores (dict, opcional): Valor de relleno ya calculado por columna (media, mediana o moda).
+                Si no se indica, se calcula sobre el dataset actual.
+
+        Retorna:
+            list: Columnas que no se pudieron rellenar por no ser numéricas (estrategias "media" y "mediana").
+        """
+        df = self.dataset_modificado
+        columnas_a_revisar = self._columnas_revisar()
+        faltantes = df[columnas_a_revisar].isnull().sum()
+        columnas_con_faltantes = list(faltantes[faltantes > 0].index)
+        omitidas = []
+
+        if estrategia == "eliminar":
+            self.dataset_modificado = df.dropna(subset=columnas_a_revisar)
+        elif estrategia in ("media", "mediana", "moda"):
+            if valores is None:
+                valores = self._calcular_valores_relleno(estrategia)
+            omitidas = [col for col in columnas_con_faltantes if col not in valores and estrategia != "moda"]
+            rellenar = lambda grupo: {col: df[col].fillna(valores[col]) for col in grupo}
+            for rellenas in self._por_columnas(rellenar, [col for col in columnas_con_faltantes if col in valores]):
+                for col, serie in rellenas.items():
+                    df[col] = serie
+        elif estrategia == "constante":
+            for col in columnas_con_faltantes:
+                if isinstance(df[col].dtype, pd.CategoricalDtype) and constante not in df[col].cat.categories:
+                    df[col] = df[col].cat.add_categories([constante]) # Las categorías admitidas son fijas
+                df[col] = df[col].fillna(constante)
+        else:
+            raise ValueError(f"Estrategia de valores faltantes no válida: {estrategia}")
+
+        self._registrar_paso("valores_faltantes", estrategia, {"constante": constante, "valores": valores})
+        return omitidas
+
+    def _modo_bloques(self):
+        """
+        Indica si los datos se han cargado por bloques, es decir, si el dataset es solo una muestra del archivo.
+        """
+        return getattr(self.data_loader, "archivo_bloques", None) is not None
+
+    def _columnas_revisar(self):
+        """
+        Devuelve las features y el target; el target se omite si los datos no lo incluyen
+        (por ejemplo, datos nuevos transformados con un pipeline ya ajustado).
+        """
+        return self.features + ([self.target] if self.target is not None else [])
+
+    def _calcular_valores_relleno(self, estrategia):
+        """
+        Calcula el valor de relleno (media, mediana o moda) de cada columna seleccionada
+        a la que se puede aplicar la estrategia. Los valores se leen de la caché de estadísticas,
+        que calcula juntas las medias y medianas de todas las columnas numéricas.
+        """
+        df = self.dataset_modificado
+        columnas = self._columnas_revisar()
+        if estrategia == "moda":
+            modas = {col: self.estadisticas.moda(df, col) for col in columnas}
+            return {col: moda for col, moda in modas.items() if moda is not None}
+        numericas = [col for col in columnas if pd.api.types.is_numeric_dtype(df[col])]
+        estadistica = "mean" if estrategia == "media" else "50%"
+        descripcion = self.estadisticas.describir(df, numericas, self._por_columnas)
+        return {col: descripcion[col][estadistica] for col in numericas}
+
 
     def datos_categoricos(self):
         """
@@ -213,50 +566,304 @@ class PreprocesadoDatos:
             print("\nSeleccione una estrategia de transformación:")
             print("  [1] One-Hot Encoding (genera nuevas columnas binarias)")
             print("  [2] Label Encoding (convierte categorías a números enteros)")
-            print("  [3] Volver al menú principal")
+            print("  [3] One-Hot Encoding con columnas uint8 (8 veces menos memoria)")
+            print("  [4] One-Hot Encoding disperso (solo se guardan los unos)")
+            print("  [5] One-Hot de las K categorías más frecuentes, agrupando el resto en 'Otros'")
+            print("  [6] Hashing (número fijo de columnas, sea cual sea el número de categorías)")
+            print("  [7] Codificación por frecuencia (frecuencia relativa de cada categoría)")
+            print("  [8] Codificación por target (media suavizada del target en cada categoría)")
+            print("  [9] Comparar la memoria y el tiempo de cada estrategia")
+            print("  [10] Volver al menú principal")
             opcion = input("Seleccione una opción: ")
 
             # Opción 1: One-Hot Encoding
             if opcion == "1":
-                df_transformado = pd.get_dummies(df, columns=columnas_categoricas)
-                columnas_dummies = [col for col in df_transformado.columns if df_transformado[col].dtype == 'bool']
-                df_transformado[columnas_dummies] = df_transformado[columnas_dummies].astype(int)
-                self.dataset_modificado = df_transformado
-                nuevas_columnas = list(df_transformado.columns)
-                nuevas_features = []
-                for f in self.features:
-                    if f == self.target:
-                        continue
-                    elif f in nuevas_columnas:
-                        nuevas_features.append(f)  
-                    elif f in columnas_categoricas:
-                          nuevas_features.extend([col for col in nuevas_columnas if col.startswith(f + "_") or col == f])
-                self.features = nuevas_features
-                self.columnas_categoricas = [
-                    col for col in nuevas_features
-                    if any(orig + "_" in col for orig in columnas_categoricas)
-                ]
+                self.aplicar_datos_categoricos("one_hot")
                 print("Transformación completada con One-Hot Encoding.")
-                self.categoricos_transformados = True
                 return True
 
             # Opción 2: Label Encoding
             elif opcion == "2":
-                for col in columnas_categoricas:
-                    le = LabelEncoder()
-                    df[col] = le.fit_transform(df[col].astype(str))
+                self.aplicar_datos_categoricos("label")
                 print("Transformación completada con Label Encoding Encoding.")
-                self.categoricos_transformados = True
                 return True
 
-            # Opción 3: regresar al menú sin aplicar cambios
-            elif opcion == "3":
+            # Opciones 3 a 8: codificaciones que limitan la memoria o el número de columnas
+            elif opcion in ("3", "4", "5", "6", "7", "8"):
+                estrategia = ESTRATEGIAS_CODIFICACION[int(opcion) - 1]
+                argumentos = {}
+                if opcion == "5":
+                    argumentos["k"] = self._pedir_entero("Número de categorías a conservar por columna", 10)
+                elif opcion == "6":
+                    argumentos["n_columnas"] = self._pedir_entero("Número de columnas por variable", 16)
+                try:
+                    self.aplicar_datos_categoricos(estrategia, **argumentos)
+                except ValueError as e:
+                    print(f"⚠ {e}")
+                    continue
+                print(f"Transformación completada ({estrategia}).")
+                return True
+
+            # Opción 9: comparación de las estrategias, sin aplicar ninguna
+            elif opcion == "9":
+                self.mostrar_comparacion_codificaciones()
+
+            # Opción 10: regresar al menú sin aplicar cambios
+            elif opcion == "10":
                 return False
             
             # Gestión de entradas inválidas
             else:
                 print("Opción no válida. Intente nuevamente.")
 
+    def _pedir_entero(self, mensaje, defecto):
+        """
+        Pide al usuario un número entero positivo; si no escribe nada, se usa el valor por defecto.
+        """
+        while True:
+            valor = input(f"{mensaje} (por defecto {defecto}): ").strip()
+            if not valor:
+                return defecto
+            if valor.isdigit() and int(valor) > 0:
+                return int(valor)
+            print("Introduzca un número entero positivo.")
+
+    @medir_etapa(entrada="dataset_modificado", salida="dataset_modificado")
+    @paso_cacheable
+    @con_copy_on_write
+    def aplicar_datos_categoricos(self, estrategia, clases=None, vocabulario=None, k=10, categorias=None, n_columnas=16,
+                                  frecuencias=None, suavizado=10.0, medias=None, medias_globales=None):
+        """
+        Codifica, sin interacción con el usuario, las columnas categóricas de entrada y registra el paso.
+
+        Parámetros:
+            estrategia (str): Una de `ESTRATEGIAS_CODIFICACION`:
+                - "one_hot": una columna binaria (int64) por categoría.
+                - "label": un entero por categoría.
+                - "one_hot_uint8": como "one_hot", con columnas uint8 (ocupan 8 veces menos).
+                - "one_hot_disperso": columnas uint8 dispersas (`pd.SparseDtype`), que solo guardan
+                  las posiciones de los unos (ver `matriz_dispersa`).
+                - "top_k": columnas uint8 solo para las `k` categorías más frecuentes de cada columna
+                  y una más, "<columna>_Otros", para el resto.
+                - "hashing": `n_columnas` columnas uint8 por variable; cada categoría se asigna a una
+                  de ellas con un hash, por lo que no se calcula nada sobre los datos y el número de
+                  columnas no depende del número de categorías.
+                - "frecuencia": cada categoría se sustituye por su frecuencia relativa.
+                - "target": cada categoría se sustituye por la media del target en esa categoría,
+                  suavizada hacia la media global. Necesita un target numérico.
+            clases (dict, opcional): Para "label", categorías ordenadas de cada columna (la tabla
+                de la codificación, ver `codificar_label`).
+            vocabulario (dict, opcional): Para "one_hot", "one_hot_uint8" y "one_hot_disperso",
+                categorías de cada columna que tienen su propia columna binaria (ver `codificar_one_hot`).
+                Con un vocabulario fijo, todos los bloques tienen las mismas columnas, en el mismo orden.
+            k (int): Para "top_k", número de categorías que se conservan por columna.
+            categorias (dict, opcional): Para "top_k", categorías conservadas de cada columna.
+            n_columnas (int): Para "hashing", número de columnas por variable.
+            frecuencias (dict, opcional): Para "frecuencia", frecuencia de cada categoría por columna
+                (las categorías que no aparecen valen 0).
+            suavizado (float): Para "target", peso de la media global (ver `MediasPorCategoria.medias`).
+            medias (dict, opcional): Para "target", media de cada categoría por columna.
+            medias_globales (dict, opcional): Para "target", valor de cada columna para las categorías
+                que no aparecen en `medias` y para los valores faltantes.
+
+        Los parámetros calculados que no se indican se calculan sobre el dataset actual.
+
+        Lanza:
+            ValueError: Si la estrategia no es válida, o si es "target" y no hay un target numérico.
+        """
+        df = self.dataset_modificado
+        columnas_categoricas = [
+            col for col in self.features
+            if col in self.columnas_categoricas
+        ]
+
+        if estrategia in ("one_hot", "one_hot_uint8", "one_hot_disperso"):
+            if vocabulario is None:
+                vocabulario = {col: self._tabla_frecuencias(df[col]).categorias() for col in columnas_categoricas}
+            dummies = codificar_one_hot(df, vocabulario, np.int64 if estrategia == "one_hot" else np.uint8,
+                                        disperso=estrategia == "one_hot_disperso")
+            # Solo se codifican las columnas categóricas; el resto no se copia (copy-on-write)
+            self._sustituir_codificadas(pd.concat([df.drop(columns=columnas_categoricas), dummies], axis=1),
+                                        columnas_categoricas)
+            parametros = {"vocabulario": vocabulario}
+        elif estrategia == "top_k":
+            if categorias is None:
+                categorias = {col: self._tabla_frecuencias(df[col]).mas_frecuentes(k) for col in columnas_categoricas}
+            agrupadas = {}
+            for col in columnas_categoricas:
+                serie = df[col].astype(object)
+                serie = serie.where(serie.isin(categorias[col]) | serie.isna(), OTRAS_CATEGORIAS)
+                # Con las categorías fijadas, todos los bloques tienen las mismas columnas
+                agrupadas[col] = pd.Categorical(serie, categories=list(dict.fromkeys(list(categorias[col]) + [OTRAS_CATEGORIAS])))
+            dummies = pd.get_dummies(pd.DataFrame(agrupadas, index=df.index), dtype=np.uint8)
+            self._sustituir_codificadas(pd.concat([df.drop(columns=columnas_categoricas), dummies], axis=1),
+                                        columnas_categoricas)
+            parametros = {"k": k, "categorias": categorias}
+        elif estrategia == "hashing":
+            partes = [df.drop(columns=columnas_categoricas)]
+            for col in columnas_categoricas:
+                validos = df[col].notna().to_numpy()
+                cubos = pd.util.hash_array(df[col].astype(str).to_numpy(dtype=object)) % n_columnas
+                matriz = np.zeros((len(df), n_columnas), dtype=np.uint8)
+                matriz[np.flatnonzero(validos), cubos[validos].astype(np.intp)] = 1
+                partes.append(pd.DataFrame(matriz, index=df.index, columns=[f"{col}_hash{i}" for i in range(n_columnas)]))
+            self._sustituir_codificadas(pd.concat(partes, axis=1), columnas_categoricas)
+            parametros = {"n_columnas": n_columnas}
+        elif estrategia == "label":
+            codificar = lambda grupo: {col: codificar_label(df[col], clases[col] if clases else None) for col in grupo}
+            codificadas = {}
+            for parcial in self._por_columnas(codificar, columnas_categoricas):
+                codificadas.update(parcial)
+            if clases is None:
+                clases = {col: categorias for col, (_, categorias) in codificadas.items()}
+            for col, (codigos, _) in codificadas.items():
+                df[col] = codigos
+            parametros = {"clases": clases}
+        elif estrategia == "frecuencia":
+            if frecuencias is None:
+                frecuencias = {col: self._tabla_frecuencias(df[col]).frecuencias() for col in columnas_categoricas}
+            for col in columnas_categoricas:
+                serie = df[col].astype(object)
+                codificada = serie.map(frecuencias[col]).astype(float)
+                df[col] = codificada.where(codificada.notna() | serie.isna(), 0.0)
+            parametros = {"frecuencias": frecuencias}
+        elif estrategia == "target":
+            if medias is None:
+                if self.target is None or not pd.api.types.is_numeric_dtype(df[self.target]):
+                    raise ValueError("La codificación por target necesita una columna objetivo numérica.")
+                medias, medias_globales = {}, {}
+                for col in columnas_categoricas:
+                    acumulador = MediasPorCategoria()
+                    acumulador.actualizar(df[col].astype(object), df[self.target])
+                    medias[col] = acumulador.medias(suavizado)
+                    medias_globales[col] = acumulador.media_global()
+            for col in columnas_categoricas:
+                df[col] = df[col].astype(object).map(medias[col]).astype(float).fillna(medias_globales[col])
+            parametros = {"suavizado": suavizado, "medias": medias, "medias_globales": medias_globales}
+        else:
+            raise ValueError(f"Estrategia de codificación no válida: {estrategia}")
+
+        self.categoricos_transformados = True
+        self._registrar_paso("datos_categoricos", estrategia, parametros)
+
+    def _tabla_frecuencias(self, serie):
+        """
+        Devuelve la tabla de frecuencias de una columna (la misma que se acumula por bloques).
+        """
+        tabla = TablaFrecuencias()
+        tabla.actualizar(serie.astype(object))
+        return tabla
+
+    def _sustituir_codificadas(self, df_transformado, columnas_categoricas):
+        """
+        Sustituye el dataset por el resultado de una codificación que reemplaza cada columna
+        categórica por varias columnas "<columna>_..." y actualiza las features.
+        """
+        self.dataset_modificado = df_transformado
+        nuevas_columnas = list(df_transformado.columns)
+        nuevas_features = []
+        for f in self.features:
+            if f == self.target:
+                continue
+            elif f in nuevas_columnas:
+                nuevas_features.append(f)
+            elif f in columnas_categoricas:
+                  nuevas_features.extend([col for col in nuevas_columnas if col.startswith(f + "_") or col == f])
+        self.features = nuevas_features
+        self.columnas_categoricas = [
+            col for col in nuevas_features
+            if any(orig + "_" in col for orig in columnas_categoricas)
+        ]
+
+    def invertir_label(self, datos=None):
+        """
+        Deshace la codificación "label" aplicada (ver la función `invertir_label`).
+
+        Parámetros:
+            datos (pd.DataFrame, opcional): Datos codificados; por defecto, el dataset modificado.
+
+        Retorna:
+            pd.DataFrame: Copia de los datos con las categorías originales.
+        """
+        return invertir_label(self.dataset_modificado if datos is None else datos, self.pasos)
+
+    def comparar_codificaciones(self, estrategias=ESTRATEGIAS_CODIFICACION):
+        """
+        Aplica cada estrategia de codificación, con sus parámetros por defecto, sobre una copia
+        de los datos y mide el tiempo y la memoria de las columnas que genera. El preprocesador
+        no se modifica.
+
+        Parámetros:
+            estrategias (iterable): Estrategias a comparar.
+
+        Retorna:
+            list: Un diccionario por estrategia con "estrategia", "columnas" (número de columnas
+                codificadas), "memoria_mb" y "segundos", o con "estrategia" y "error" si no se puede aplicar.
+        """
+        columnas_categoricas = [col for col in self.features if col in self.columnas_categoricas]
+        conservadas = set(self.dataset_modificado.columns) - set(columnas_categoricas)
+        resultados = []
+        for estrategia in estrategias:
+            copia = copy.copy(self)
+            copia.estadisticas = CacheEstadisticas() # La copia no comparte las estadísticas del preprocesador
+            copia.dataset_modificado = self.dataset_modificado.copy()
+            copia.features = list(self.features)
+            copia.columnas_categoricas = list(self.columnas_categoricas)
+            copia.pasos, copia.cache, copia.ahorro_memoria = [], None, False
+            inicio = time.perf_counter()
+            try:
+                copia.aplicar_datos_categoricos(estrategia)
+            except ValueError as e:
+                resultados.append({"estrategia": estrategia, "error": str(e)})
+                continue
+            segundos = time.perf_counter() - inicio
+            df = copia.dataset_modificado
+            codificadas = [col for col in df.columns if col not in conservadas]
+            resultados.append({
+                "estrategia": estrategia,
+                "columnas": len(codificadas),
+                "memoria_mb": df[codificadas].memory_usage(index=False, deep=True).sum() / 1024 ** 2,
+                "segundos": segundos,
+            })
+        return resultados
+
+    def mostrar_comparacion_codificaciones(self):
+        """
+        Muestra la comparación de las estrategias de codificación (ver `comparar_codificaciones`).
+        """
+        print(f"\n{'Estrategia':<18}{'Columnas':>10}{'Memoria (MB)':>15}{'Tiempo (s)':>12}")
+        for resultado in self.comparar_codificaciones():
+            if "error" in resultado:
+                print(f"{resultado['estrategia']:<18}  {resultado['error']}")
+            else:
+                print(f"{resultado['estrategia']:<18}{resultado['columnas']:>10}"
+                      f"{resultado['memoria_mb']:>15.3f}{resultado['segundos']:>12.3f}")
+
+    def matriz_dispersa(self):
+        """
+        Devuelve las features del dataset modificado como una matriz dispersa CSR de SciPy, que
+        se puede pasar directamente a los modelos de scikit-learn. Las columnas dispersas (por
+        ejemplo, las de "one_hot_disperso") se convierten sin pasar por una matriz densa.
+
+        Retorna:
+            tuple: (scipy.sparse.csr_matrix, list con los nombres de las columnas, en orden).
+
+        Lanza:
+            ValueError: Si alguna feature no es numérica.
+        """
+        df = self.dataset_modificado[self.features]
+        no_numericas = [col for col in df.columns if not pd.api.types.is_numeric_dtype(df[col])]
+        if no_numericas:
+            raise ValueError(f"Hay features no numéricas: {no_numericas}")
+        dispersas = [col for col in df.columns if isinstance(df[col].dtype, pd.SparseDtype)]
+        densas = [col for col in df.columns if col not in dispersas]
+        partes = []
+        if densas:
+            partes.append(scipy.sparse.csr_matrix(df[densas].to_numpy(dtype=float)))
+        if dispersas:
+            partes.append(df[dispersas].sparse.to_coo().tocsr())
+        return scipy.sparse.hstack(partes, format="csr"), densas + dispersas
+
     def normalizar_escalar_datos(self):
         """
         Aplica técnicas de normalización o escalado a las columnas numéricas seleccionadas como variables de entrada (features).
@@ -296,19 +903,14 @@ class PreprocesadoDatos:
 
             # Opción 1: Min-Max Scaling
             if opcion == "1":
-                scaler = MinMaxScaler()
-                df[columnas_numericas_entrada] = scaler.fit_transform(df[columnas_numericas_entrada])
+                self.aplicar_normalizacion("min_max")
                 print("Normalización completada con Min-Max Scaling.")
-                self.normalizacion_completada = True
-                
                 return True
 
             # Opción 2: Z-score Normalization (StandardScaler)
             elif opcion == "2":
-                scaler = StandardScaler()
-                df[columnas_numericas_entrada] = scaler.fit_transform(df[columnas_numericas_entrada])
+                self.aplicar_normalizacion("z_score")
                 print("Normalización completada con Z-score Normalization.")
-                self.normalizacion_completada = True
                 return True
 
             # Opción 3: regresar al menú sin aplicar cambios
@@ -319,11 +921,96 @@ class PreprocesadoDatos:
             else:
                 print("Opción no válida. Intente nuevamente.")
 
+    @medir_etapa(entrada="dataset_modificado", salida="dataset_modificado")
+    @paso_cacheable
+    @con_copy_on_write
+    def aplicar_normalizacion(self, estrategia, escalador=None):
+        """
+        Normaliza o escala, sin interacción con el usuario, las columnas numéricas de entrada y registra el paso.
+
+        Parámetros:
+            estrategia (str): "min_max" o "z_score".
+            escalador (MinMaxScaler o StandardScaler, opcional): Escalador ya ajustado. Si no se indica,
+                se ajusta sobre el dataset actual.
+        """
+        df = self.dataset_modificado
+        columnas_numericas_entrada = [
+            col for col in self.features
+            if col in self.columnas_numericas
+        ]
+
+        if estrategia not in ("min_max", "z_score"):
+            raise ValueError(f"Estrategia de normalización no válida: {estrategia}")
+
+        if columnas_numericas_entrada:
+            if escalador is None:
+                escalador = MinMaxScaler() if estrategia == "min_max" else StandardScaler()
+                escalador.fit(df[columnas_numericas_entrada])
+            if self.hilos > 1:
+                self._transformar_por_columnas(escalador, columnas_numericas_entrada)
+            else:
+                df[columnas_numericas_entrada] = escalador.transform(df[columnas_numericas_entrada])
+        self.normalizacion_completada = True
+        self._registrar_paso("normalizacion", estrategia, {"escalador": escalador})
+
+    def _transformar_por_columnas(self, escalador, columnas):
+        """
+        Aplica un escalador ya ajustado repartiendo las columnas entre hilos. Hace las mismas
+        operaciones que `transform` de scikit-learn (X * scale_ + min_ o (X - mean_) / scale_)
+        sobre el mismo tipo de dato, por lo que el resultado es idéntico.
+        """
+        df = self.dataset_modificado
+        tipo = np.result_type(*[df[col].dtype for col in columnas])
+        if tipo not in (np.float64, np.float32, np.float16):
+            tipo = np.float64 # scikit-learn convierte a float64 los datos que no son decimales
+        posiciones = {col: i for i, col in enumerate(columnas)}
+
+        def transformar(grupo):
+            indices = [posiciones[col] for col in grupo]
+            X = df[grupo].to_numpy(dtype=tipo, copy=True)
+            if isinstance(escalador, MinMaxScaler):
+                X *= escalador.scale_[indices]
+                X += escalador.min_[indices]
+            else:
+                if escalador.with_mean:
+                    X -= escalador.mean_[indices]
+                if escalador.with_std:
+                    X /= escalador.scale_[indices]
+            return grupo, X
+
+        for grupo, X in self._por_columnas(transformar, columnas):
+            df[grupo] = X
+
+    def _por_columnas(self, funcion, columnas):
+        """
+        Reparte las columnas en tantos grupos como hilos y aplica `funcion` a cada grupo en paralelo.
+        Con un solo hilo, `funcion` se aplica una vez a todas las columnas.
+
+        Parámetros:
+            funcion (callable): Recibe una lista de columnas. Solo debe leer el dataset; los cambios
+                se devuelven y se asignan después, desde el hilo principal.
+            columnas (list): Columnas a repartir.
+
+        Retorna:
+            list: Resultado de cada grupo, en el orden de las columnas.
+        """
+        columnas = list(columnas)
+        grupos_hilos = min(self.hilos, len(columnas))
+        if grupos_hilos <= 1:
+            return [funcion(columnas)]
+        tamano = -(-len(columnas) // grupos_hilos)
+        grupos = [columnas[i:i + tamano] for i in range(0, len(columnas), tamano)]
+        with ThreadPoolExecutor(max_workers=len(grupos)) as ejecutor:
+            return list(ejecutor.map(funcion, grupos))
+
     def valores_atipicos(self):
         """
         Detecta y maneja valores atípicos (outliers) en las columnas numéricas seleccionadas como variables de entrada.
         Utiliza el método del rango intercuartílico (IQR) para identificar los outliers. 
 
+        En modo por bloques la detección se hace sobre la muestra del primer bloque; aunque en ella
+        no haya valores atípicos, se pide la estrategia, que se aplicará a todos los bloques al exportar.
+
         Retorna:
             bool: True si se ejecutó una estrategia (incluso si no había outliers), False si se vuelve al menú.
         """
@@ -342,72 +1029,407 @@ class PreprocesadoDatos:
             return True
 
         # Detectar outliers usando el rango intercuartílico (IQR)
-        valores_atipicos_por_columna = {}
-        for col in columnas_numericas:
-            Q1 = df[col].quantile(0.25)
-            Q3 = df[col].quantile(0.75)
-            IQR = Q3 - Q1
-            outliers = df[(df[col] < (Q1 - 1.5 * IQR)) | (df[col] > (Q3 + 1.5 * IQR))]
-            if not outliers.empty:
-                valores_atipicos_por_columna[col] = outliers.shape[0]
+        valores_atipicos_por_columna = self.detectar_valores_atipicos()
 
         # Si no hay outliers, finalizar
-        if not valores_atipicos_por_columna:
+        if not valores_atipicos_por_columna and not self._modo_bloques():
             print("No se han detectado valores atípicos en las columnas seleccionadas.")
             print("No es necesario aplicar ninguna estrategia.")
             self.outliers_gestionados = True
             return True
 
-        print("Se han detectado valores atípicos en las siguientes columnas numéricas seleccionadas:")
-        for col, count in valores_atipicos_por_columna.items():
-            print(f"  - {col}: {count} valores atípicos detectados")
+        if not valores_atipicos_por_columna:
+            print("No se han detectado valores atípicos en la muestra del primer bloque, pero el resto del archivo puede tenerlos.")
+        else:
+            print("Se han detectado valores atípicos en las siguientes columnas numéricas seleccionadas"
+                  + (" (en la muestra del primer bloque):" if self._modo_bloques() else ":"))
+            for col, count in valores_atipicos_por_columna.items():
+                print(f"  - {col}: {count} valores atípicos detectados")
 
         while True:
             print("\nSeleccione una estrategia para manejar los valores atípicos:")
             print("  [1] Eliminar filas con valores atípicos")
             print("  [2] Reemplazar valores atípicos con la mediana de la columna")
             print("  [3] Mantener valores atípicos sin cambios")
-            print("  [4] Volver al menú principal")
+            print("  [4] Recortar valores atípicos a los límites del IQR (winsorización)")
+            print("  [5] Volver al menú principal")
             opcion = input("Seleccione una opción: ")
 
             # Opción 1: eliminar filas con outliers
             if opcion == "1":
-                for col in valores_atipicos_por_columna:
-                    Q1 = df[col].quantile(0.25)
-                    Q3 = df[col].quantile(0.75)
-                    IQR = Q3 - Q1
-                    df = df[(df[col] >= (Q1 - 1.5 * IQR)) & (df[col] <= (Q3 + 1.5 * IQR))]
-                self.dataset_modificado = df
+                self.aplicar_valores_atipicos("eliminar")
                 print("Filas con valores atípicos eliminadas.")
-                self.outliers_gestionados = True
                 return True
 
             # Opción 2: reemplazar outliers por la mediana
             elif opcion == "2":
-                for col in valores_atipicos_por_columna:
-                    Q1 = df[col].quantile(0.25)
-                    Q3 = df[col].quantile(0.75)
-                    IQR = Q3 - Q1
-                    lower_bound = Q1 - 1.5 * IQR
-                    upper_bound = Q3 + 1.5 * IQR
-                    mediana = df[col].median()
-                    df[col] = df[col].apply(lambda x: mediana if x < lower_bound or x > upper_bound else x)
-                self.dataset_modificado = df
+                self.aplicar_valores_atipicos("mediana")
                 print("Valores atípicos reemplazados con la mediana de cada columna.")
-                self.outliers_gestionados = True
                 return True
 
             # Opción 3: dejar los valores atípicos tal como están
             elif opcion == "3":
+                self.aplicar_valores_atipicos("mantener")
                 print("Valores atípicos mantenidos sin cambios.")
-                self.outliers_gestionados = True
                 return True
 
-            # Opción 4: salir sin hacer nada
+            # Opción 4: recortar los outliers al límite más cercano
             elif opcion == "4":
+                self.aplicar_valores_atipicos("recortar")
+                print("Valores atípicos recortados a los límites del rango intercuartílico.")
+                return True
+
+            # Opción 5: salir sin hacer nada
+            elif opcion == "5":
                 return False
             
             # Gestión de entradas inválidas
             else:
                 print("Opción no válida. Intente nuevamente.")
 
+    def detectar_valores_atipicos(self):
+        """
+        Cuenta los valores atípicos de cada columna numérica seleccionada según el rango intercuartílico (IQR).
+
+        Los límites y la máscara de valores atípicos quedan en caché para que el manejo posterior
+        (`aplicar_valores_atipicos`) no vuelva a calcular los cuartiles.
+
+        Retorna:
+            dict: Número de valores atípicos por columna, solo para las columnas que tienen alguno.
+        """
+        estado = self._estado_atipicos()
+        conteos = estado["mascara"].sum(axis=0)
+        return {col: int(n) for col, n in zip(estado["columnas"], conteos) if n > 0}
+
+    def _estado_atipicos(self, limites=None):
+        """
+        Devuelve las columnas, los límites, las medianas y la máscara booleana (filas x columnas)
+        de valores atípicos del dataset actual.
+
+        Si no se indican límites, los cuartiles y la mediana de todas las columnas se leen de la
+        caché de estadísticas (que los calcula a la vez sobre el bloque 2-D de columnas numéricas),
+        y el resultado se guarda en caché mientras el dataset no cambie.
+        """
+        df = self.dataset_modificado
+        if limites is None:
+            columnas = list(self.columnas_numericas)
+            cache = self._cache_atipicos
+            if (cache is not None and cache["datos"] is df and cache["filas"] == len(df) and cache["columnas"] == columnas
+                    and cache["version"] == self.estadisticas.version):
+                return cache
+            descripcion = self.estadisticas.describir(df, columnas, self._por_columnas)
+        else:
+            columnas = [col for col in self.columnas_numericas if col in limites]
+
+        def calcular(grupo):
+            bloque = df[grupo].to_numpy(dtype=float, na_value=np.nan)
+            if limites is None:
+                Q1, mediana, Q3 = (np.array([descripcion[col][clave] for col in grupo], dtype=float)
+                                   for clave in ("25%", "50%", "75%"))
+                IQR = Q3 - Q1
+                inferiores, superiores = Q1 - 1.5 * IQR, Q3 + 1.5 * IQR
+            else:
+                mediana = np.full(len(grupo), np.nan)
+                inferiores = np.array([limites[col][0] for col in grupo], dtype=float)
+                superiores = np.array([limites[col][1] for col in grupo], dtype=float)
+            mascara = (bloque < inferiores) | (bloque > superiores) # Los NaN no se consideran atípicos
+            return inferiores, superiores, mediana, mascara
+
+        partes = self._por_columnas(calcular, columnas)
+        inferiores, superiores, mediana = (np.concatenate([parte[i] for parte in partes]) for i in range(3))
+        estado = {
+            "datos": df,
+            "filas": len(df),
+            "version": self.estadisticas.version,
+            "columnas": columnas,
+            "limites": {col: (float(i), float(s)) for col, i, s in zip(columnas, inferiores, superiores)},
+            "medianas": {col: float(m) for col, m in zip(columnas, mediana)} if limites is None else {},
+            "mascara": np.hstack([parte[3] for parte in partes]) if len(partes) > 1 else partes[0][3],
+        }
+        if limites is None:
+            self._cache_atipicos = estado
+        return estado
+
+    @medir_etapa(entrada="dataset_modificado", salida="dataset_modificado")
+    @paso_cacheable
+    @con_copy_on_write
+    def aplicar_valores_atipicos(self, estrategia, limites=None, medianas=None):
+        """
+        Maneja, sin interacción con el usuario, los valores atípicos de las columnas numéricas
+        seleccionadas según el método del rango intercuartílico (IQR), y registra el paso.
+
+        Los límites de todas las columnas se calculan sobre el mismo dataset (el de entrada al paso),
+        y la eliminación usa una única máscara combinada de filas.
+
+        Parámetros:
+            estrategia (str): "eliminar", "mediana", "recortar" (winsorización) o "mantener".
+            limites (dict, opcional): Límites (inferior, superior) ya calculados por columna.
+            medianas (dict, opcional): Mediana ya calculada por columna, para la estrategia "mediana". Las
+                medianas de las columnas que no aparecen se calculan sobre el dataset actual.
+        """
+        if estrategia not in ("eliminar", "mediana", "recortar", "mantener"):
+            raise ValueError(f"Estrategia de valores atípicos no válida: {estrategia}")
+        df = self.dataset_modificado
+
+        if estrategia != "mantener" and self.columnas_numericas:
+            estado = self._estado_atipicos(limites)
+            limites = estado["limites"]
+            medianas = dict(estado["medianas"] if medianas is None else medianas)
+            faltan = [col for col in estado["columnas"] if col not in medianas]
+            if estrategia == "mediana" and faltan: # Límites dados sin sus medianas: se calculan sobre los datos actuales
+                descripcion = self.estadisticas.describir(df, faltan, self._por_columnas)
+                medianas.update({col: descripcion[col]["50%"] for col in faltan})
+            mascara = estado["mascara"]
+            if estrategia == "eliminar":
+                self.dataset_modificado = df[~mascara.any(axis=1)]
+            else:
+                posiciones = {col: j for j, col in enumerate(estado["columnas"])}
+
+                def manejar(grupo):
+                    nuevas = {}
+                    for col in grupo:
+                        fuera = mascara[:, posiciones[col]]
+                        if not fuera.any():
+                            continue
+                        if estrategia == "mediana":
+                            nuevas[col] = np.where(fuera, medianas[col], df[col].to_numpy())
+                        else:
+                            nuevas[col] = df[col].clip(*limites[col])
+                    return nuevas
+
+                for nuevas in self._por_columnas(manejar, estado["columnas"]):
+                    for col, valores in nuevas.items():
+                        df[col] = valores
+
+        self._cache_atipicos = None # El dataset ha cambiado
+        self.outliers_gestionados = True
+        self._registrar_paso("valores_atipicos", estrategia, {"limites": limites, "medianas": medianas})
+
+    def _registrar_paso(self, paso, estrategia, parametros):
+        """
+        Registra un paso aplicado con su estrategia y sus parámetros y, en modo de ahorro
+        de memoria, mide el pico de memoria que ha necesitado.
+        """
+        self.estadisticas.invalidar() # El paso puede haber modificado columnas del dataset sin sustituirlo
+        self.pasos.append({"paso": paso, "estrategia": estrategia, "parametros": parametros})
+        if self.ahorro_memoria:
+            self._medir_memoria(paso)
+
+    def _medir_memoria(self, paso):
+        """
+        Guarda y muestra la memoria residente actual y el pico alcanzado desde el paso anterior,
+        y reinicia el pico para el paso siguiente.
+        """
+        medicion = {"paso": paso, "rss_mb": rss_mb(), "pico_rss_mb": pico_rss_mb()}
+        self.memoria_pasos.append(medicion)
+        if medicion["rss_mb"] is not None and medicion["pico_rss_mb"] is not None:
+            print(f"Memoria tras '{paso}': {medicion['rss_mb']:.1f} MB (pico {medicion['pico_rss_mb']:.1f} MB)")
+        if not etapa_en_curso():
+            reiniciar_pico_rss() # Si se está perfilando, el perfilador reinicia el pico al empezar cada etapa
+
+    def _preprocesado_bloque(self, bloque):
+        """
+        Crea un preprocesador sobre un bloque de datos con la misma selección de columnas.
+        """
+        return PreprocesadoDatos.desde_seleccion(bloque, self.seleccion, self.hilos)
+
+    @classmethod
+    def desde_seleccion(cls, datos, seleccion, hilos=1):
+        """
+        Crea un preprocesador sobre unos datos con una selección de columnas ya hecha,
+        sin interacción con el usuario, listo para reproducir pasos registrados.
+
+        Si los datos no incluyen la columna objetivo (datos nuevos a los que se aplica un
+        pipeline ya ajustado), los pasos se aplican solo a las features.
+
+        Parámetros:
+            datos (pd.DataFrame): Datos originales.
+            seleccion (dict): Selección guardada en el atributo `seleccion` de otro preprocesador.
+            hilos (int): Número de hilos (ver `__init__`).
+
+        Retorna:
+            PreprocesadoDatos: Preprocesador con la selección aplicada.
+        """
+        cargador = DataLoader()
+        cargador.dataset = datos
+        preprocesado = cls(cargador, hilos=hilos)
+        preprocesado.features = list(seleccion["features"])
+        preprocesado.target = seleccion["target"] if seleccion["target"] in datos.columns else None
+        preprocesado.columnas_seleccionadas = preprocesado._columnas_revisar()
+        preprocesado.columnas_numericas = [col for col in seleccion["columnas_numericas"] if col in datos.columns]
+        preprocesado.columnas_categoricas = [col for col in seleccion["columnas_categoricas"] if col in datos.columns]
+        preprocesado.seleccion = seleccion
+        return preprocesado
+
+    def reproducir_pasos(self, pasos):
+        """
+        Aplica una lista de pasos registrados (por ejemplo, los de otro preprocesador)
+        con sus parámetros ya calculados.
+
+        Parámetros:
+            pasos (list): Pasos con las claves "paso", "estrategia" y "parametros".
+        """
+        for paso in pasos:
+            aplicar = getattr(self, "aplicar_" + paso["paso"])
+            aplicar(paso["estrategia"], **paso["parametros"])
+
+    def procesar_bloque(self, bloque):
+        """
+        Reproduce sobre un bloque de datos la selección de columnas y los pasos de preprocesado
+        aplicados hasta el momento, sin interacción con el usuario.
+
+        Se usan los parámetros registrados en cada paso (valores de relleno, escalador, límites...),
+        de modo que todos los bloques se transforman igual. Para que esos parámetros correspondan
+        al archivo completo y no solo a la muestra cargada, se debe llamar antes a `ajustar_bloques`.
+
+        Parámetros:
+            bloque (pd.DataFrame): Fragmento de filas del dataset original.
+
+        Retorna:
+            pd.DataFrame: Bloque preprocesado.
+        """
+        preprocesado = self._preprocesado_bloque(bloque)
+        preprocesado.reproducir_pasos(self.pasos)
+        return preprocesado.dataset_modificado
+
+    def procesar_bloques(self, bloques):
+        """
+        Preprocesa una secuencia de bloques de uno en uno, de forma que la memoria
+        necesaria depende del tamaño del bloque y no del tamaño total del archivo.
+
+        Parámetros:
+            bloques (iterable): Bloques del dataset original (pd.DataFrame).
+
+        Retorna:
+            generator: Bloques preprocesados, en el mismo orden.
+        """
+        for bloque in bloques:
+            yield self.procesar_bloque(bloque)
+
+    def ajustar_bloques(self, obtener_bloques):
+        """
+        Recalcula los parámetros de los pasos registrados con estadísticas globales del archivo
+        completo, recorriéndolo por bloques sin cargarlo en memoria (fase de ajuste). Después,
+        `procesar_bloques` aplica esos parámetros bloque a bloque (fase de transformación).
+
+        Como cada paso se ajusta sobre la salida de los anteriores, se hace una pasada por
+        cada paso que necesita estadísticas. Medias, varianzas, mínimos, máximos, modas y
+        categorías coinciden con el cálculo en memoria salvo redondeo; las medianas y los
+        cuartiles se estiman con `SketchCuantiles` (error de rango inferior al 0,1 %).
+
+        Parámetros:
+            obtener_bloques (callable): Función sin argumentos que devuelve un nuevo iterador
+                sobre los bloques del dataset original (por ejemplo, `DataLoader.iterar_bloques`).
+        """
+        for indice, paso in enumerate(self.pasos):
+            if not self._necesita_ajuste(paso):
+                continue
+            acumulados = None
+            for bloque in obtener_bloques():
+                preprocesado = self._preprocesado_bloque(bloque)
+                preprocesado.reproducir_pasos(self.pasos[:indice])
+                acumulados = preprocesado._acumular_estadisticas(paso, acumulados)
+            if acumulados is not None:
+                paso["parametros"].update(self._parametros_ajustados(paso, acumulados))
+
+    def _necesita_ajuste(self, paso):
+        """
+        Indica si un paso depende de estadísticas calculadas sobre los datos.
+        """
+        return (paso["paso"], paso["estrategia"]) in {
+            ("valores_faltantes", "media"),
+            ("valores_faltantes", "mediana"),
+            ("valores_faltantes", "moda"),
+            ("datos_categoricos", "one_hot"),
+            ("datos_categoricos", "one_hot_uint8"),
+            ("datos_categoricos", "one_hot_disperso"),
+            ("datos_categoricos", "label"),
+            ("datos_categoricos", "top_k"),
+            ("datos_categoricos", "frecuencia"),
+            ("datos_categoricos", "target"),
+            ("normalizacion", "min_max"),
+            ("normalizacion", "z_score"),
+            ("valores_atipicos", "eliminar"),
+            ("valores_atipicos", "mediana"),
+            ("valores_atipicos", "recortar"),
+        }
+
+    def _acumular_estadisticas(self, paso, acumulados):
+        """
+        Calcula las estadísticas que necesita un paso sobre el dataset actual (un bloque)
+        y las combina con las acumuladas en bloques anteriores.
+        """
+        df = self.dataset_modificado
+        nombre, estrategia = paso["paso"], paso["estrategia"]
+
+        if nombre == "normalizacion":
+            columnas = [col for col in self.features if col in self.columnas_numericas]
+            if acumulados is None:
+                acumulados = MinMaxScaler() if estrategia == "min_max" else StandardScaler()
+            if columnas and not df.empty:
+                acumulados.partial_fit(df[columnas])
+            return acumulados
+
+        if nombre == "valores_faltantes":
+            columnas = self._columnas_revisar()
+            if estrategia != "moda":
+                columnas = [col for col in columnas if pd.api.types.is_numeric_dtype(df[col])]
+        elif nombre == "datos_categoricos":
+            columnas = [col for col in self.features if col in self.columnas_categoricas]
+        else:
+            columnas = self.columnas_numericas
+
+        nuevos = {}
+        for col in columnas:
+            if estrategia == "media":
+                nuevos[col] = EstadisticasNumericas()
+                nuevos[col].actualizar(df[col])
+            elif estrategia == "moda":
+                nuevos[col] = TablaFrecuencias()
+                nuevos[col].actualizar(df[col])
+            elif nombre == "datos_categoricos" and estrategia == "target":
+                nuevos[col] = MediasPorCategoria()
+                nuevos[col].actualizar(df[col].astype(object), df[self.target])
+            elif nombre == "datos_categoricos":
+                nuevos[col] = TablaFrecuencias()
+                nuevos[col].actualizar(df[col].astype(object))
+            else:
+                nuevos[col] = SketchCuantiles()
+                nuevos[col].actualizar(df[col])
+        return combinar_acumuladores(acumulados, nuevos)
+
+    def _parametros_ajustados(self, paso, acumulados):
+        """
+        Convierte las estadísticas acumuladas de un paso en sus parámetros de transformación.
+        """
+        nombre, estrategia = paso["paso"], paso["estrategia"]
+        if nombre == "normalizacion":
+            return {"escalador": acumulados if hasattr(acumulados, "n_features_in_") else None}
+        if nombre == "datos_categoricos":
+            if estrategia == "top_k":
+                k = paso["parametros"]["k"]
+                return {"categorias": {col: tabla.mas_frecuentes(k) for col, tabla in acumulados.items()}}
+            if estrategia == "frecuencia":
+                return {"frecuencias": {col: tabla.frecuencias() for col, tabla in acumulados.items()}}
+            if estrategia == "target":
+                suavizado = paso["parametros"]["suavizado"]
+                return {"medias": {col: acumulador.medias(suavizado) for col, acumulador in acumulados.items()},
+                        "medias_globales": {col: acumulador.media_global() for col, acumulador in acumulados.items()}}
+            if estrategia == "label":
+                return {"clases": {col: tabla.categorias() for col, tabla in acumulados.items()}}
+            return {"vocabulario": {col: tabla.categorias() for col, tabla in acumulados.items()}}
+        if nombre == "valores_faltantes":
+            if estrategia == "media":
+                valores = {col: est.media for col, est in acumulados.items() if est.n > 0}
+            elif estrategia == "mediana":
+                valores = {col: sketch.cuantil(0.5) for col, sketch in acumulados.items() if sketch.n > 0}
+            else:
+                valores = {col: tabla.moda() for col, tabla in acumulados.items() if tabla.conteos}
+            return {"valores": valores}
+        limites, medianas = {}, {}
+        for col, sketch in acumulados.items():
+            Q1, mediana, Q3 = sketch.cuantil([0.25, 0.5, 0.75])
+            IQR = Q3 - Q1
+            limites[col] = (Q1 - 1.5 * IQR, Q3 + 1.5 * IQR)
+            medianas[col] = mediana
+        return {"limites": limites, "medianas": medianas}
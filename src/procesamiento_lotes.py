@@ -0,0 +1,192 @@
+import argparse
+import glob
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from ejecutor_pipeline import FORMATOS_ORIGEN, EjecutorPipeline
+from exportador_datos import separar_extension
+
+
+def buscar_archivos(entrada):
+    """
+    Devuelve los archivos de datos a procesar.
+
+    Parámetros:
+        entrada (str): Directorio (se toman los archivos con una extensión de datos admitida)
+            o patrón glob (por ejemplo, "entradas/*.csv").
+
+    Retorna:
+        list: Rutas de los archivos, ordenadas.
+    """
+    if os.path.isdir(entrada):
+        return sorted(
+            os.path.join(entrada, nombre) for nombre in os.listdir(entrada)
+            if os.path.splitext(nombre)[1].lower() in FORMATOS_ORIGEN
+        )
+    return sorted(ruta for ruta in glob.glob(entrada) if os.path.isfile(ruta))
+
+
+def rutas_salida(archivos, directorio_salida, extension):
+    """
+    Asigna a cada archivo de entrada su archivo de salida en `directorio_salida`,
+    con el mismo nombre y la extensión indicada, sin repetir nombres.
+    """
+    rutas, usados = {}, set()
+    for archivo in archivos:
+        base = os.path.splitext(os.path.basename(archivo))[0]
+        nombre, contador = base, 1
+        while nombre in usados:
+            contador += 1
+            nombre = f"{base}_{contador}"
+        usados.add(nombre)
+        rutas[archivo] = os.path.join(directorio_salida, nombre + extension)
+    return rutas
+
+
+def especificacion_archivo(especificacion, nombre):
+    """
+    Adapta la especificación del lote a un archivo: las rutas de "guardar_pipeline" y "perfil" y el
+    directorio de "graficos" llevan el nombre del archivo (por ejemplo, "pipeline.pkl" pasa a
+    "pipeline_dia1.pkl" y "graficos" a "graficos/dia1"), para que los procesos no escriban en los
+    mismos archivos.
+
+    Parámetros:
+        especificacion (dict): Especificación del pipeline.
+        nombre (str): Nombre del archivo sin extensión, único en el lote (ver `rutas_salida`).
+
+    Retorna:
+        dict: Copia de la especificación con las rutas propias del archivo.
+    """
+    def ruta_propia(ruta):
+        base, extension = os.path.splitext(ruta)
+        return f"{base}_{nombre}{extension}"
+
+    especificacion = dict(especificacion)
+    if especificacion.get("guardar_pipeline"):
+        especificacion["guardar_pipeline"] = ruta_propia(especificacion["guardar_pipeline"])
+    perfil = especificacion.get("perfil")
+    if isinstance(perfil, dict) and perfil.get("ruta"):
+        especificacion["perfil"] = {**perfil, "ruta": ruta_propia(perfil["ruta"])}
+    elif perfil and not isinstance(perfil, dict):
+        especificacion["perfil"] = ruta_propia(perfil)
+    graficos = especificacion.get("graficos")
+    if isinstance(graficos, dict) and graficos.get("directorio"):
+        especificacion["graficos"] = {**graficos, "directorio": os.path.join(graficos["directorio"], nombre)}
+    elif graficos and not isinstance(graficos, dict):
+        especificacion["graficos"] = os.path.join(graficos, nombre)
+    return especificacion
+
+
+def procesar_archivo(especificacion, origen, salida):
+    """
+    Ejecuta el pipeline sobre un archivo. Los errores se devuelven en el resultado en lugar
+    de lanzarse, para que un archivo defectuoso no detenga el resto del lote.
+
+    Se ejecuta en un proceso del grupo, por lo que recibe y devuelve solo datos serializables.
+
+    Retorna:
+        dict: "archivo", "salida", "estado" ("ok" o "error"), "error", "filas", "segundos" y "tiempos".
+    """
+    inicio = time.perf_counter()
+    try:
+        resultado = EjecutorPipeline(especificacion).ejecutar(origen, salida)
+        return {"archivo": origen, "salida": salida, "estado": "ok", "error": None,
+                "filas": resultado["filas"], "segundos": time.perf_counter() - inicio, "tiempos": resultado["tiempos"]}
+    except Exception as e:
+        return {"archivo": origen, "salida": None, "estado": "error", "error": f"{type(e).__name__}: {e}",
+                "filas": 0, "segundos": time.perf_counter() - inicio, "tiempos": {}}
+
+
+def procesar_lotes(entrada, especificacion, directorio_salida, trabajadores=None, mostrar_progreso=True):
+    """
+    Aplica el mismo pipeline a muchos archivos, repartiéndolos entre varios procesos.
+
+    Parámetros:
+        entrada (str o list): Directorio, patrón glob o lista de archivos de entrada.
+        especificacion (dict): Especificación del pipeline (ver `EjecutorPipeline`). El formato
+            de salida se toma de la extensión de su ruta de exportación (CSV si no tiene), incluida
+            la de la compresión del CSV (por ejemplo, "salida.csv.gz").
+            Los archivos de "guardar_pipeline", "perfil" y "graficos" se escriben por separado para
+            cada archivo de entrada (ver `especificacion_archivo`).
+        directorio_salida (str): Directorio donde se escriben los archivos preprocesados.
+        trabajadores (int, opcional): Número de procesos; por defecto, el número de CPUs.
+        mostrar_progreso (bool): Mostrar el estado de cada archivo al terminar.
+
+    Retorna:
+        dict: "resultados" (uno por archivo, en el orden de entrada), "correctos", "fallidos",
+            "filas", "segundos", "archivos_por_segundo" y "filas_por_segundo".
+    """
+    EjecutorPipeline(especificacion) # Valida la especificación antes de lanzar los procesos
+    archivos = list(entrada) if isinstance(entrada, (list, tuple)) else buscar_archivos(entrada)
+    exportar = especificacion.get("exportar") or {}
+    extension, compresion = separar_extension(exportar.get("ruta") or "")
+    extension = (extension or ".csv") + compresion # "salida.csv.gz" da "<archivo>.csv.gz"
+    os.makedirs(directorio_salida, exist_ok=True)
+    salidas = rutas_salida(archivos, directorio_salida, extension)
+
+    inicio = time.perf_counter()
+    resultados = {}
+    with ProcessPoolExecutor(max_workers=trabajadores) as ejecutor:
+        futuros = {}
+        for archivo in archivos:
+            nombre = os.path.basename(salidas[archivo])[:-len(extension)]
+            futuro = ejecutor.submit(procesar_archivo, especificacion_archivo(especificacion, nombre), archivo, salidas[archivo])
+            futuros[futuro] = archivo
+        for futuro in as_completed(futuros):
+            archivo = futuros[futuro]
+            try:
+                resultado = futuro.result()
+            except Exception as e: # El proceso del trabajador terminó de forma inesperada
+                resultado = {"archivo": archivo, "salida": None, "estado": "error", "error": f"{type(e).__name__}: {e}",
+                             "filas": 0, "segundos": 0.0, "tiempos": {}}
+            resultados[archivo] = resultado
+            if mostrar_progreso:
+                detalle = f"{resultado['filas']} filas" if resultado["estado"] == "ok" else resultado["error"]
+                print(f"[{len(resultados)}/{len(archivos)}] {resultado['estado'].upper():5} {archivo} "
+                      f"({resultado['segundos']:.2f} s) {detalle}")
+    segundos = time.perf_counter() - inicio
+
+    resultados = [resultados[archivo] for archivo in archivos]
+    filas = sum(r["filas"] for r in resultados)
+    return {
+        "resultados": resultados,
+        "correctos": sum(r["estado"] == "ok" for r in resultados),
+        "fallidos": [r for r in resultados if r["estado"] == "error"],
+        "filas": filas,
+        "segundos": segundos,
+        "archivos_por_segundo": len(resultados) / segundos if segundos else 0.0,
+        "filas_por_segundo": filas / segundos if segundos else 0.0,
+    }
+
+
+def mostrar_resumen(resumen):
+    """
+    Muestra el resumen de un lote: archivos correctos y fallidos y rendimiento.
+    """
+    total = len(resumen["resultados"])
+    print("=============================")
+    print("Resumen del lote")
+    print("=============================")
+    print(f"Archivos procesados: {resumen['correctos']}/{total}")
+    print(f"Filas: {resumen['filas']} en {resumen['segundos']:.2f} s "
+          f"({resumen['filas_por_segundo']:.0f} filas/s, {resumen['archivos_por_segundo']:.2f} archivos/s)")
+    if resumen["fallidos"]:
+        print("Archivos con errores:")
+        for resultado in resumen["fallidos"]:
+            print(f"  - {resultado['archivo']}: {resultado['error']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Preprocesa muchos archivos en paralelo con el mismo pipeline.")
+    parser.add_argument("especificacion", help="Archivo JSON con la especificación del pipeline.")
+    parser.add_argument("entrada", help="Directorio o patrón glob de los archivos de entrada.")
+    parser.add_argument("--salida", required=True, help="Directorio de los archivos preprocesados.")
+    parser.add_argument("--trabajadores", type=int, default=None, help="Número de procesos (por defecto, uno por CPU).")
+    argumentos = parser.parse_args()
+    with open(argumentos.especificacion, encoding="utf-8") as archivo:
+        especificacion = json.load(archivo)
+    resumen = procesar_lotes(argumentos.entrada, especificacion, argumentos.salida, argumentos.trabajadores)
+    mostrar_resumen(resumen)
+    raise SystemExit(1 if resumen["fallidos"] else 0)
@@ -0,0 +1,55 @@
+import contextlib
+import io
+import tempfile
+import unittest
+
+import pandas as pd
+
+from benchmark_pipeline import SuiteBenchmark, comparar, generar_bloques, generar_titanic
+
+
+class TestBenchmarkPipeline(unittest.TestCase):
+
+    def test_generar_titanic(self):
+        datos = generar_titanic(20_000, columnas_extra=2, faltantes=0.1, cardinalidad=7, atipicos=0.05)
+        self.assertEqual(len(datos), 20_000)
+        self.assertIn("extra1", datos.columns)
+        self.assertAlmostEqual(datos["Age"].isna().mean(), 0.1, delta=0.01)
+        self.assertEqual(datos["Ticket"].nunique(), 7)
+        self.assertGreater((datos["Fare"] > 32 * 15).mean(), 0.01)
+        self.assertEqual((generar_titanic(20_000, atipicos=0)["Fare"] > 32 * 15).sum(), 0)
+        pd.testing.assert_frame_equal(generar_titanic(100, semilla=3), generar_titanic(100, semilla=3))
+
+    def test_generar_bloques(self):
+        bloques = list(generar_bloques(250, 100))
+        self.assertEqual([len(bloque) for bloque in bloques], [100, 100, 50])
+        self.assertEqual(pd.concat(bloques)["PassengerId"].tolist(), list(range(1, 251)))
+
+    def test_comparar(self):
+        referencia = [
+            {"grupo": "carga", "operacion": "csv", "filas": 10, "columnas_extra": 0, "segundos": 1.0},
+            {"grupo": "carga", "operacion": "excel", "filas": 10, "columnas_extra": 0, "segundos": 0.001},
+        ]
+        resultados = [
+            {"grupo": "carga", "operacion": "csv", "filas": 10, "columnas_extra": 0, "segundos": 1.5},
+            {"grupo": "carga", "operacion": "excel", "filas": 10, "columnas_extra": 0, "segundos": 0.002},
+            {"grupo": "carga", "operacion": "parquet", "filas": 10, "columnas_extra": 0, "segundos": 0.1},
+        ]
+        comparacion = comparar(resultados, referencia, tolerancia=0.25, minimo=0.01)
+        # La medición sin referencia no se compara; la muy corta no cuenta como regresión
+        self.assertEqual([fila["operacion"] for fila in comparacion], ["csv", "excel"])
+        self.assertEqual([fila["regresion"] for fila in comparacion], [True, False])
+        self.assertAlmostEqual(comparacion[0]["cambio"], 0.5)
+
+    def test_suite(self):
+        with tempfile.TemporaryDirectory() as directorio, contextlib.redirect_stdout(io.StringIO()):
+            suite = SuiteBenchmark(directorio, repeticiones=1)
+            resultados = suite.ejecutar([200], grupos=("carga", "exportacion"))
+        operaciones = [(resultado["grupo"], resultado["operacion"]) for resultado in resultados]
+        self.assertIn(("carga", "sqlite"), operaciones)
+        self.assertIn(("exportacion", "parquet"), operaciones)
+        self.assertTrue(all(resultado["segundos"] >= 0 for resultado in resultados))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+import pandas as pd
+
+from cache_resultados import AlmacenCache, CacheFuentes, calcular_clave, huella_archivo
+
+
+class TestAlmacenCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directorio = tempfile.TemporaryDirectory()
+        self.cache = AlmacenCache(self.directorio.name)
+
+    def tearDown(self):
+        self.directorio.cleanup()
+
+    def test_guardar_y_obtener(self):
+        df = pd.DataFrame({'a': [1, 2], 'b': pd.Categorical(['x', 'y'])})
+        clave = calcular_clave("paso", {"estrategia": "media"})
+        self.assertIsNone(self.cache.obtener(clave))
+        self.cache.guardar(clave, {"dataset": df})
+
+        pd.testing.assert_frame_equal(self.cache.obtener(clave)["dataset"], df)
+        self.assertEqual(self.cache.estadisticas()["entradas"], 1)
+        self.assertEqual((self.cache.aciertos, self.cache.fallos), (1, 1))
+
+    def test_clave_depende_de_los_parametros(self):
+        self.assertEqual(calcular_clave("a", {"x": 1}), calcular_clave("a", {"x": 1}))
+        self.assertNotEqual(calcular_clave("a", {"x": 1}), calcular_clave("a", {"x": 2}))
+
+    def test_expulsion_lru(self):
+        cache = AlmacenCache(self.directorio.name, max_entradas=2)
+        for i, clave in enumerate(["a", "b"]):
+            cache.guardar(clave, i)
+            os.utime(cache._ruta(clave), ns=(i * 10 ** 9, i * 10 ** 9))
+        cache.obtener("a")  # "a" pasa a ser la usada más recientemente
+        cache.guardar("c", 2)
+
+        self.assertTrue(cache.contiene("a"))
+        self.assertFalse(cache.contiene("b"))
+        self.assertTrue(cache.contiene("c"))
+
+    def test_expulsion_por_tamano(self):
+        cache = AlmacenCache(self.directorio.name, tamano_maximo_mb=0.001)
+        cache.guardar("grande", b"x" * 4096)
+        self.assertEqual(cache.estadisticas()["entradas"], 0)
+
+    def test_entrada_danada(self):
+        with open(self.cache._ruta("rota"), "wb") as archivo:
+            archivo.write(b"no es pickle")
+        self.assertEqual(self.cache.obtener("rota", "defecto"), "defecto")
+        self.assertFalse(self.cache.contiene("rota"))
+
+    def test_huella_archivo(self):
+        ruta = os.path.join(self.directorio.name, "datos.csv")
+        with open(ruta, "w") as archivo:
+            archivo.write("a\n1\n")
+        huella, contenido = huella_archivo(ruta), huella_archivo(ruta, contenido=True)
+        time.sleep(0.01)
+        with open(ruta, "w") as archivo:
+            archivo.write("a\n2\n")
+        self.assertNotEqual(huella_archivo(ruta), huella)
+        self.assertNotEqual(huella_archivo(ruta, contenido=True), contenido)
+
+
+class TestCacheFuentes(unittest.TestCase):
+
+    def setUp(self):
+        self.directorio = tempfile.TemporaryDirectory()
+        self.cache = CacheFuentes(AlmacenCache(os.path.join(self.directorio.name, "cache")))
+        self.ruta = os.path.join(self.directorio.name, "datos.csv")
+        self.escribir("a,b\n1,x\n2,y\n")
+        self.lecturas = 0
+
+    def tearDown(self):
+        self.directorio.cleanup()
+
+    def escribir(self, contenido):
+        with open(self.ruta, "w") as archivo:
+            archivo.write(contenido)
+
+    def cargar(self, opciones=("csv",)):
+        def leer():
+            self.lecturas += 1
+            return pd.read_csv(self.ruta)
+        return self.cache.cargar(self.ruta, opciones, leer)
+
+    def test_acierto_y_fallo(self):
+        df = self.cargar()
+        pd.testing.assert_frame_equal(self.cargar(), df)
+        self.assertEqual(self.lecturas, 1)
+        self.cargar(("csv", ["a"]))  # Otras opciones de lectura son otra entrada
+        self.assertEqual(self.lecturas, 2)
+        self.assertEqual((self.cache.aciertos, self.cache.fallos), (1, 2))
+
+    def test_acierto_sin_escribir_indice(self):
+        self.cargar()
+        with patch.object(self.cache.almacen, "guardar", wraps=self.cache.almacen.guardar) as guardar:
+            self.cargar()
+            guardar.assert_not_called() # El índice ya apunta a los mismos datos
+            os.utime(self.ruta, ns=(10 ** 9, 10 ** 9))
+            self.cargar()
+            guardar.assert_called_once() # Nueva fecha de modificación: nueva entrada del índice
+        self.assertEqual(self.lecturas, 1)
+
+    def test_archivo_tocado_sin_cambios(self):
+        self.cargar()
+        os.utime(self.ruta, ns=(10 ** 9, 10 ** 9))  # Cambia la fecha, pero no el contenido
+        self.cargar()
+        self.assertEqual(self.lecturas, 1)
+
+    def test_archivo_modificado(self):
+        self.cargar()
+        self.escribir("a,b\n1,x\n2,y\n3,z\n")
+        self.assertEqual(len(self.cargar()), 3)
+        self.assertEqual(self.lecturas, 2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,10 +1,14 @@
 import unittest
 from unittest.mock import patch, MagicMock
 import os
+import sqlite3
+import tempfile
 import pandas as pd
 from io import StringIO
 
-from data_loader import DataLoader  
+from cache_resultados import AlmacenCache, CacheFuentes
+from data_loader import DataLoader, optimizar_tipos
+from fuente_sqlite import cerrar_conexiones
 
 class TestDataLoader(unittest.TestCase):
 
@@ -12,6 +16,10 @@ class TestDataLoader(unittest.TestCase):
         """Crea un objeto DataLoader antes de cada prueba."""
         self.dataloader = DataLoader()
 
+    def tearDown(self):
+        """Cierra las conexiones SQLite reutilizadas entre pruebas."""
+        cerrar_conexiones()
+
     @patch('os.path.exists')
     @patch('pandas.read_csv')
     def test_cargar_csv_exito(self, mock_read_csv, mock_exists):
@@ -150,5 +158,176 @@ class TestDataLoader(unittest.TestCase):
         # Verificar que el dataset no se cargó
         self.assertIsNone(self.dataloader.dataset)
 
+    def test_cargar_csv_por_bloques(self):
+        """Prueba la carga en modo por bloques: solo el primer bloque queda en memoria."""
+        with tempfile.TemporaryDirectory() as directorio:
+            archivo = os.path.join(directorio, "datos.csv")
+            pd.DataFrame({'col1': range(10), 'col2': range(10, 20)}).to_csv(archivo, index=False)
+
+            self.dataloader.cargar_csv(archivo, tamano_bloque=4)
+
+            self.assertEqual(self.dataloader.dataset.shape, (4, 2))
+            bloques = list(self.dataloader.iterar_bloques())
+            self.assertEqual([len(b) for b in bloques], [4, 4, 2])
+            self.assertEqual(pd.concat(bloques)['col1'].tolist(), list(range(10)))
+
+    @patch('builtins.print')
+    def test_cargar_csv_por_bloques_optimizar_memoria(self, mock_print):
+        """Prueba que todos los bloques tienen los mismos tipos, los más anchos que necesitan sus valores."""
+        datos = pd.DataFrame({
+            'entero': [1, 2, 3, 4, 5, 6, 7, 8, 9, 10],
+            'grande': [1, 2, 3, 4, 5, 6, 7, 8, 100_000, 10],
+            'con_faltantes': [1, 2, 3, 4, 5, 6, None, 8, 9, 10],
+            'decimal': [0.5, 1.5, 2.5, 3.5, 4.5, 5.5, 6.5, 7.5, 8.5, 9.5],
+            'texto': ['a', 'b', 'a', 'a', 'b', 'c', 'a', 'b', 'a', 'a'],
+        })
+        with tempfile.TemporaryDirectory() as directorio:
+            archivo = os.path.join(directorio, "datos.csv")
+            datos.to_csv(archivo, index=False)
+            dataloader = DataLoader(optimizar_memoria=True)
+            dataloader.cargar_csv(archivo, tamano_bloque=4)
+            bloques = list(dataloader.iterar_bloques())
+
+            esperados = {'entero': 'int8', 'grande': 'int32', 'con_faltantes': 'float32', 'decimal': 'float32',
+                         'texto': 'category'}
+            self.assertEqual({col: str(tipo) for col, tipo in dataloader.dataset.dtypes.items()}, esperados)
+            for bloque in bloques:
+                self.assertEqual({col: str(tipo) for col, tipo in bloque.dtypes.items()}, esperados)
+            pd.testing.assert_frame_equal(pd.concat(bloques).astype({'texto': object}), datos, check_dtype=False)
+
+            # Una carga completa posterior desactiva el modo por bloques
+            dataloader.cargar_csv(archivo)
+            self.assertIsNone(dataloader.archivo_bloques)
+
+    def test_cargar_csv_solo_columnas_seleccionadas(self):
+        """Prueba que solo se leen las columnas indicadas y con los tipos pedidos."""
+        with tempfile.TemporaryDirectory() as directorio:
+            archivo = os.path.join(directorio, "datos.csv")
+            pd.DataFrame({'Name': ['a', 'b'], 'Sex': ['male', 'female'], 'Age': [22, 38]}).to_csv(archivo, index=False)
+
+            self.assertEqual(self.dataloader.obtener_columnas(archivo), ['Name', 'Sex', 'Age'])
+            self.dataloader.cargar_csv(archivo, columnas=['Sex', 'Age'], tipos={'Sex': 'category'})
+
+            self.assertEqual(list(self.dataloader.dataset.columns), ['Sex', 'Age'])
+            self.assertIsInstance(self.dataloader.dataset['Sex'].dtype, pd.CategoricalDtype)
+
+    @patch('os.path.exists', return_value=True)
+    @patch('pandas.read_excel')
+    def test_cargar_excel_columnas(self, mock_read_excel, mock_exists):
+        mock_read_excel.return_value = pd.DataFrame({'Sex': ['male']})
+        self.dataloader.cargar_excel("archivo.xlsx", columnas=['Sex'])
+        mock_read_excel.assert_called_once_with("archivo.xlsx", usecols=['Sex'], dtype=None)
+
+    def test_cargar_sqlite_solo_columnas_seleccionadas(self):
+        """Prueba que la consulta SQLite solo pide las columnas indicadas, con nombres citados."""
+        with tempfile.TemporaryDirectory() as directorio:
+            archivo = os.path.join(directorio, "datos.db")
+            conn = sqlite3.connect(archivo)
+            pd.DataFrame({'Name': ['a', 'b'], 'Sex': ['male', 'female'], 'Fare "x"': [7.25, 71.3]}).to_sql("mi tabla", conn, index=False)
+            conn.close()
+
+            self.assertEqual(self.dataloader.obtener_columnas(archivo, "mi tabla"), ['Name', 'Sex', 'Fare "x"'])
+            self.dataloader.cargar_sqlite(archivo, tabla="mi tabla", columnas=['Sex', 'Fare "x"'])
+
+            self.assertEqual(list(self.dataloader.dataset.columns), ['Sex', 'Fare "x"'])
+            self.assertEqual(self.dataloader.dataset.shape, (2, 2))
+
+    def test_optimizar_tipos(self):
+        """Prueba la reducción de tipos: enteros pequeños, float32 sin pérdida y categorías."""
+        df = pd.DataFrame({
+            'Survived': [0, 1, 1, 0] * 25,
+            'PassengerId': range(100),
+            'Fare': [7.25, 71.2833, 8.05, 53.1] * 25,
+            'Age': [22.0, 38.0, 26.5, None] * 25,
+            'Sex': ['male', 'female', 'female', 'male'] * 25,
+            'Name': [f"Pasajero {i}" for i in range(100)],
+        })
+        optimizado = optimizar_tipos(df)
+
+        self.assertEqual(optimizado['Survived'].dtype, 'int8')
+        self.assertEqual(optimizado['PassengerId'].dtype, 'int8')
+        self.assertEqual(optimizado['Fare'].dtype, 'float64')  # 71.2833 no es exacto en float32
+        self.assertEqual(optimizado['Age'].dtype, 'float32')
+        self.assertIsInstance(optimizado['Sex'].dtype, pd.CategoricalDtype)
+        self.assertEqual(optimizado['Name'].dtype, 'object')  # Todos los valores son distintos
+        pd.testing.assert_frame_equal(optimizado, df, check_dtype=False, check_categorical=False)
+        self.assertLess(optimizado.memory_usage(deep=True).sum(), df.memory_usage(deep=True).sum())
+
+    @patch('builtins.print')
+    @patch('os.path.exists', return_value=True)
+    @patch('pandas.read_csv')
+    def test_cargar_csv_optimizar_memoria(self, mock_read_csv, mock_exists, mock_print):
+        mock_read_csv.return_value = pd.DataFrame({'col1': [1, 2, 3], 'col2': ['a', 'a', 'b']})
+        dataloader = DataLoader(optimizar_memoria=True)
+        dataloader.cargar_csv("archivo.csv")
+
+        self.assertEqual(dataloader.dataset['col1'].dtype, 'int8')
+        self.assertTrue(any("Memoria del dataset" in str(call) for call in mock_print.call_args_list))
+
+    def test_cargar_sqlite_por_bloques_y_paralelo(self):
+        """Prueba la lectura SQLite por bloques, con filtro, y en paralelo por rangos de rowid."""
+        with tempfile.TemporaryDirectory() as directorio:
+            archivo = os.path.join(directorio, "datos.db")
+            conn = sqlite3.connect(archivo)
+            pd.DataFrame({'col1': range(10), 'col2': range(10, 20)}).to_sql("datos", conn, index=False)
+            conn.close()
+
+            self.dataloader.cargar_sqlite(archivo, tabla="datos", where="col1 >= ?", parametros=(2,), tamano_bloque=3)
+            self.assertEqual(self.dataloader.dataset['col1'].tolist(), [2, 3, 4])
+            self.assertEqual([len(b) for b in self.dataloader.iterar_bloques()], [3, 3, 2])
+
+            cargador = DataLoader()
+            cargador.cargar_sqlite(archivo, tabla="datos", hilos=4)
+            self.assertEqual(cargador.dataset['col1'].tolist(), list(range(10)))
+            cerrar_conexiones()
+
+    def test_cargar_parquet_columnas_filtros_y_bloques(self):
+        """Prueba la lectura Parquet con proyección de columnas, filtro de filas y por bloques."""
+        with tempfile.TemporaryDirectory() as directorio:
+            archivo = os.path.join(directorio, "datos.parquet")
+            pd.DataFrame({'col1': range(10), 'col2': range(10, 20), 'col3': list("abcdefghij")}).to_parquet(archivo, row_group_size=4)
+
+            self.assertEqual(self.dataloader.obtener_columnas(archivo), ['col1', 'col2', 'col3'])
+            self.dataloader.cargar_parquet(archivo, columnas=['col1', 'col3'], filtros=[('col1', '>=', 5)])
+            self.assertEqual(list(self.dataloader.dataset.columns), ['col1', 'col3'])
+            self.assertEqual(self.dataloader.dataset['col1'].tolist(), [5, 6, 7, 8, 9])
+
+            cargador = DataLoader()
+            cargador.cargar_parquet(archivo, columnas=['col1'], filtros=[('col1', '<', 7)], tamano_bloque=3)
+            self.assertEqual(cargador.dataset['col1'].tolist(), [0, 1, 2])
+            self.assertEqual(pd.concat(cargador.iterar_bloques())['col1'].tolist(), list(range(7)))
+
+    def test_cargar_feather(self):
+        """Prueba la lectura Feather proyectada en memoria con solo algunas columnas."""
+        with tempfile.TemporaryDirectory() as directorio:
+            archivo = os.path.join(directorio, "datos.feather")
+            df = pd.DataFrame({'col1': [1, 2, 3], 'col2': [1.5, None, 3.5], 'col3': ['a', 'b', 'c']})
+            df.to_feather(archivo)
+
+            self.assertEqual(self.dataloader.obtener_columnas(archivo), ['col1', 'col2', 'col3'])
+            self.dataloader.cargar_feather(archivo, columnas=['col2', 'col3'])
+            pd.testing.assert_frame_equal(self.dataloader.dataset, df[['col2', 'col3']])
+
+    @patch('builtins.print')
+    def test_cargar_parquet_no_existente(self, mock_print):
+        self.dataloader.cargar_parquet("no_existe.parquet")
+        self.assertIsNone(self.dataloader.dataset)
+        mock_print.assert_called_with("Archivo no encontrado.")
+
+    def test_cargar_csv_desde_cache(self):
+        """Prueba que la segunda carga de un CSV sin cambios no vuelve a analizar el archivo."""
+        with tempfile.TemporaryDirectory() as directorio:
+            archivo = os.path.join(directorio, "datos.csv")
+            pd.DataFrame({'col1': [1, 2, 3], 'col2': ['a', None, 'c']}).to_csv(archivo, index=False)
+            cache = CacheFuentes(AlmacenCache(os.path.join(directorio, "cache")))
+            DataLoader(cache=cache).cargar_csv(archivo)
+
+            cargador = DataLoader(cache=cache)
+            with patch('pandas.read_csv') as mock_read_csv:
+                cargador.cargar_csv(archivo)
+            mock_read_csv.assert_not_called()
+            pd.testing.assert_frame_equal(cargador.dataset, pd.read_csv(archivo))
+            self.assertEqual((cache.aciertos, cache.fallos), (1, 1))
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,146 @@
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+from estadisticas_bloques import calcular_correlaciones
+from ejecutor_pipeline import EjecutorPipeline
+from fuente_sqlite import cerrar_conexiones
+
+
+class TestEjecutorPipeline(unittest.TestCase):
+
+    def setUp(self):
+        self.directorio = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(0)
+        self.datos = pd.DataFrame({
+            'Survived': rng.integers(0, 2, 40),
+            'Pclass': rng.integers(1, 4, 40),
+            'Sex': rng.choice(['male', 'female'], 40),
+            'Age': np.where(rng.random(40) < 0.2, np.nan, rng.normal(30, 10, 40)),
+            'Fare': rng.exponential(30, 40),
+            'Name': [f"Pasajero {i}" for i in range(40)],
+        })
+        self.csv = os.path.join(self.directorio.name, "datos.csv")
+        self.datos.to_csv(self.csv, index=False)
+        self.especificacion = {
+            "origen": {"ruta": self.csv},
+            "features": ["Pclass", "Sex", "Age", "Fare"],
+            "target": "Survived",
+            "valores_faltantes": "media",
+            "datos_categoricos": "one_hot",
+            "normalizacion": "z_score",
+            "valores_atipicos": "recortar",
+            "exportar": {"ruta": os.path.join(self.directorio.name, "salida.csv")},
+        }
+
+    def tearDown(self):
+        cerrar_conexiones()
+        self.directorio.cleanup()
+
+    def test_ejecutar_desde_json(self):
+        ruta_json = os.path.join(self.directorio.name, "pipeline.json")
+        with open(ruta_json, "w", encoding="utf-8") as archivo:
+            json.dump(self.especificacion, archivo)
+
+        resultado = EjecutorPipeline.desde_json(ruta_json).ejecutar()
+
+        self.assertEqual(list(resultado["tiempos"]), ["carga", "seleccion", "valores_faltantes", "datos_categoricos",
+                                                      "normalizacion", "valores_atipicos", "exportacion"])
+        salida = pd.read_csv(resultado["salida"])
+        self.assertEqual(resultado["filas"], 40)
+        self.assertEqual(sorted(salida.columns), ['Age', 'Fare', 'Pclass', 'Sex_female', 'Sex_male', 'Survived'])
+        self.assertFalse(salida.isnull().any().any())
+
+    def test_mismo_resultado_por_bloques(self):
+        # Sin pasos que dependan de cuantiles, el resultado por bloques coincide con el de memoria
+        self.especificacion["valores_atipicos"] = None
+        completo = EjecutorPipeline(self.especificacion).ejecutar()
+        self.especificacion["origen"]["tamano_bloque"] = 7
+        por_bloques = EjecutorPipeline(self.especificacion).ejecutar(salida=os.path.join(self.directorio.name, "bloques.csv"))
+
+        self.assertIn("ajuste_bloques", por_bloques["tiempos"])
+        pd.testing.assert_frame_equal(pd.read_csv(por_bloques["salida"]), pd.read_csv(completo["salida"]))
+
+    def test_graficos_por_bloques(self):
+        self.especificacion["origen"]["tamano_bloque"] = 7
+        self.especificacion["graficos"] = {"directorio": os.path.join(self.directorio.name, "graficos"), "procesos": 1}
+        ejecutor = EjecutorPipeline(self.especificacion)
+
+        with patch("visualizador_datos.calcular_correlaciones", wraps=calcular_correlaciones) as calcular:
+            ejecutor.ejecutar()
+
+        # La correlación se calcula sobre los 40 registros del archivo, en bloques de 7
+        bloques = list(calcular.call_args.args[0]())
+        self.assertEqual([len(bloque) for bloque in bloques], [7, 7, 7, 7, 7, 5])
+
+    def test_exportar_parquet_por_bloques_con_tipos_optimizados(self):
+        # Un bloque posterior al de la muestra se sale del rango de int8 de los primeros valores
+        self.datos.loc[30, "Pclass"] = 1000
+        self.datos.to_csv(self.csv, index=False)
+        self.especificacion.update({"optimizar_tipos": True, "valores_atipicos": None, "normalizacion": None,
+                                    "exportar": {"ruta": os.path.join(self.directorio.name, "salida.parquet")}})
+        self.especificacion["origen"]["tamano_bloque"] = 3
+
+        resultado = EjecutorPipeline(self.especificacion).ejecutar()
+
+        salida = pd.read_parquet(resultado["salida"])
+        self.assertEqual(len(salida), 40)
+        self.assertEqual(salida["Pclass"].tolist(), self.datos["Pclass"].tolist())
+        self.assertEqual(str(salida["Pclass"].dtype), "int16")
+
+    def test_origen_sqlite_y_estrategia_con_argumentos(self):
+        db = os.path.join(self.directorio.name, "datos.db")
+        conn = sqlite3.connect(db)
+        self.datos.to_sql("pasajeros", conn, index=False)
+        conn.close()
+        self.especificacion["origen"] = {"ruta": db, "tabla": "pasajeros"}
+        self.especificacion["valores_faltantes"] = {"estrategia": "constante", "constante": -1}
+        del self.especificacion["exportar"]
+
+        ejecutor = EjecutorPipeline(self.especificacion)
+        resultado = ejecutor.ejecutar()
+
+        self.assertIsNone(resultado["salida"])
+        self.assertNotIn("Name", ejecutor.preprocesado.dataset_modificado.columns)  # Solo se cargan las columnas usadas
+        self.assertEqual(ejecutor.preprocesado.pasos[0]["parametros"]["constante"], -1)
+
+    def test_especificacion_no_valida(self):
+        with self.assertRaises(ValueError):
+            EjecutorPipeline({**self.especificacion, "normalizacion": "log"})
+        with self.assertRaises(ValueError):
+            EjecutorPipeline({**self.especificacion, "target": "Age"})
+
+    def test_origen_no_encontrado(self):
+        with self.assertRaisesRegex(RuntimeError, "no encontrado"):
+            EjecutorPipeline(self.especificacion).ejecutar(origen=os.path.join(self.directorio.name, "no_existe.csv"))
+
+    def test_graficos(self):
+        directorio = os.path.join(self.directorio.name, "graficos")
+        self.especificacion["graficos"] = {"directorio": directorio, "formato": "svg", "procesos": 1,
+                                           "max_puntos": 10, "modo_dispersion": "densidad"}
+
+        resultado = EjecutorPipeline(self.especificacion).ejecutar()
+
+        self.assertIn("graficos", resultado["tiempos"])
+        self.assertIn("heatmap_correlacion.svg", os.listdir(directorio))
+
+    def test_perfil(self):
+        ruta_perfil = os.path.join(self.directorio.name, "perfil.json")
+        self.especificacion["perfil"] = ruta_perfil
+
+        resultado = EjecutorPipeline(self.especificacion).ejecutar()
+
+        etapas = [total["etapa"] for total in resultado["perfil"]]
+        self.assertEqual(etapas[0], "DataLoader.cargar_csv")
+        self.assertEqual(etapas[-1], "ExportarDatos.aplicar_exportacion")
+        with open(ruta_perfil, encoding="utf-8") as archivo:
+            self.assertEqual(json.load(archivo)["resumen"], resultado["perfil"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,156 @@
+import unittest
+import numpy as np
+import pandas as pd
+
+from estadisticas_bloques import (EstadisticasNumericas, MatrizCorrelacion, MediasPorCategoria, MuestraReservorio,
+                                  SketchCuantiles, TablaFrecuencias, calcular_correlaciones, combinar_acumuladores)
+
+
+class TestEstadisticasNumericas(unittest.TestCase):
+
+    def test_media_y_varianza_por_bloques(self):
+        valores = np.random.default_rng(0).normal(10, 3, size=10_000)
+        valores[::97] = np.nan
+        estadisticas = EstadisticasNumericas()
+        for i in range(0, len(valores), 1_000):
+            estadisticas.actualizar(valores[i:i + 1_000])
+
+        serie = pd.Series(valores)
+        self.assertEqual(estadisticas.n, serie.count())
+        self.assertAlmostEqual(estadisticas.media, serie.mean(), places=10)
+        self.assertAlmostEqual(estadisticas.varianza(ddof=1), serie.var(), places=8)
+        self.assertEqual(estadisticas.minimo, serie.min())
+        self.assertEqual(estadisticas.maximo, serie.max())
+
+    def test_combinar(self):
+        a, b = EstadisticasNumericas(), EstadisticasNumericas()
+        a.actualizar([1, 2, 3])
+        b.actualizar([4, 5])
+        a.combinar(b)
+        self.assertEqual(a.n, 5)
+        self.assertAlmostEqual(a.media, 3)
+        self.assertAlmostEqual(a.varianza(), 2)
+
+
+class TestSketchCuantiles(unittest.TestCase):
+
+    def test_exacto_sin_compactar(self):
+        valores = pd.Series([7.25, 71.28, 7.92, 53.1, 8.05, np.nan, 1000])
+        sketch = SketchCuantiles()
+        sketch.actualizar(valores)
+        for q in (0.25, 0.5, 0.75):
+            self.assertAlmostEqual(sketch.cuantil(q), valores.quantile(q))
+
+    def test_error_de_rango_acotado(self):
+        valores = np.random.default_rng(1).exponential(size=200_000)
+        sketch = SketchCuantiles()
+        for i in range(0, len(valores), 25_000):
+            sketch.actualizar(valores[i:i + 25_000])
+        ordenados = np.sort(valores)
+        for q in (0.25, 0.5, 0.75):
+            rango = np.searchsorted(ordenados, sketch.cuantil(q)) / len(valores)
+            self.assertLess(abs(rango - q), 0.001)
+        # La memoria no crece con el número de valores
+        self.assertLess(sum(nivel.size for nivel in sketch.niveles), 20_000)
+
+    def test_combinar(self):
+        valores = np.random.default_rng(2).normal(size=50_000)
+        a, b = SketchCuantiles(), SketchCuantiles()
+        a.actualizar(valores[:20_000])
+        b.actualizar(valores[20_000:])
+        a.combinar(b)
+        self.assertEqual(a.n, 50_000)
+        self.assertAlmostEqual(a.cuantil(0.5), np.median(valores), delta=0.01)
+
+
+class TestTablaFrecuencias(unittest.TestCase):
+
+    def test_moda_y_categorias(self):
+        tablas = {}
+        for bloque in (pd.Series(['S', 'C', np.nan]), pd.Series(['Q', 'Q', 'S'])):
+            tabla = TablaFrecuencias()
+            tabla.actualizar(bloque)
+            tablas = combinar_acumuladores(tablas or None, {'Embarked': tabla})
+        self.assertEqual(tablas['Embarked'].categorias(), ['C', 'Q', 'S'])
+        self.assertEqual(tablas['Embarked'].moda(), 'Q') # Empate entre Q y S: el menor, como pandas
+        self.assertEqual(tablas['Embarked'].mas_frecuentes(2), ['Q', 'S'])
+        self.assertEqual(tablas['Embarked'].frecuencias(), {'S': 0.4, 'C': 0.2, 'Q': 0.4})
+
+
+class TestMediasPorCategoria(unittest.TestCase):
+
+    def test_medias_suavizadas_por_bloques(self):
+        a, b = MediasPorCategoria(), MediasPorCategoria()
+        a.actualizar(pd.Series(['male', 'female', np.nan]), pd.Series([0, 1, 1]))
+        b.actualizar(pd.Series(['male', 'male', 'female']), pd.Series([1, 0, 1]))
+        a.combinar(b)
+        self.assertAlmostEqual(a.media_global(), 0.6)
+        self.assertEqual(a.medias(), {'male': 1 / 3, 'female': 1.0})
+        # Con suavizado 2: (1 + 2 * 0.6) / (3 + 2) y (2 + 2 * 0.6) / (2 + 2)
+        medias = a.medias(suavizado=2)
+        self.assertAlmostEqual(medias['male'], 0.44)
+        self.assertAlmostEqual(medias['female'], 0.8)
+
+
+class TestMuestraReservorio(unittest.TestCase):
+
+    def test_muestra_por_bloques(self):
+        datos = pd.DataFrame({'x': np.arange(100_000), 'y': np.arange(100_000) % 2})
+        a, b = MuestraReservorio(1000, semilla=0), MuestraReservorio(1000, semilla=1)
+        for inicio in range(0, 60_000, 20_000):
+            a.actualizar(datos.iloc[inicio:inicio + 20_000])
+        b.actualizar(datos.iloc[60_000:])
+        a.combinar(b)
+        muestra = a.muestra()
+        self.assertEqual(a.n, 100_000)
+        self.assertEqual(len(muestra), 1000)
+        self.assertTrue(muestra.index.is_unique and muestra.index.is_monotonic_increasing)
+        # Las filas se conservan completas y la muestra es uniforme
+        pd.testing.assert_frame_equal(muestra, datos.loc[muestra.index])
+        self.assertAlmostEqual(muestra['x'].mean(), 50_000, delta=3000)
+        self.assertAlmostEqual((muestra['x'] >= 60_000).mean(), 0.4, delta=0.06)
+
+    def test_menos_filas_que_el_tamano(self):
+        muestra = MuestraReservorio(10)
+        muestra.actualizar(pd.Series([3, 1, 2]))
+        self.assertEqual(muestra.muestra().tolist(), [3, 1, 2])
+        self.assertIsNone(MuestraReservorio(10).muestra())
+
+
+class TestMatrizCorrelacion(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        x = rng.normal(size=(20_000, 4))
+        x[:, 1] += x[:, 0]
+        x[:, 2] = 1e6 + np.exp(x[:, 2]) # Media grande y distribución asimétrica
+        x[rng.random(x.shape) < 0.1] = np.nan
+        self.datos = pd.DataFrame(x, columns=['a', 'b', 'c', 'd'])
+        self.datos['constante'] = 1.0
+        self.bloques = lambda: (self.datos.iloc[i:i + 3000] for i in range(0, 20_000, 3000))
+
+    def test_pearson_por_bloques_y_combinada(self):
+        a, b = MatrizCorrelacion(self.datos.columns), MatrizCorrelacion(self.datos.columns)
+        for i, bloque in enumerate(self.bloques()):
+            (a if i % 2 else b).actualizar(bloque)
+        a.combinar(b)
+        pd.testing.assert_frame_equal(a.correlaciones(), self.datos.corr(), atol=1e-10)
+
+    def test_spearman(self):
+        columnas = ['a', 'b', 'c', 'd']
+        completos = self.datos[columnas].dropna()
+        # Sin valores faltantes y con el sketch exacto (n <= k) coincide con pandas
+        exacta = calcular_correlaciones(lambda: [completos.iloc[:2000]], columnas, 'spearman')
+        pd.testing.assert_frame_equal(exacta, completos.iloc[:2000].corr('spearman'), atol=1e-10)
+        # Por bloques, con los rangos estimados por el sketch
+        aproximada = calcular_correlaciones(lambda: (completos.iloc[i:i + 3000] for i in range(0, len(completos), 3000)),
+                                            columnas, 'spearman')
+        pd.testing.assert_frame_equal(aproximada, completos.corr('spearman'), atol=1e-3)
+
+    def test_metodo_no_valido(self):
+        with self.assertRaises(ValueError):
+            calcular_correlaciones(self.bloques, ['a'], 'kendall')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+import weakref
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+from estadisticas_descriptivas import CacheEstadisticas, describir_columnas
+
+
+class TestCacheEstadisticas(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.datos = pd.DataFrame({
+            "a": np.where(rng.random(1000) < 0.1, np.nan, rng.normal(30, 10, 1000)),
+            "b": rng.integers(0, 5, 1000),
+            "c": rng.exponential(3, 1000).astype("float32"),
+            "d": pd.array(np.where(rng.random(1000) < 0.5, None, rng.integers(0, 9, 1000)), dtype="Int64"),
+            "vacia": np.nan,
+            "texto": rng.choice(["x", "y", "z"], 1000),
+        })
+        self.numericas = ["a", "b", "c", "d", "vacia"]
+
+    def test_resumen_igual_a_describe(self):
+        cache = CacheEstadisticas()
+        pd.testing.assert_frame_equal(cache.resumen(self.datos, self.numericas), self.datos[self.numericas].describe(),
+                                      check_dtype=False)
+        pd.testing.assert_frame_equal(cache.resumen(self.datos.iloc[:1], ["a"]), self.datos.iloc[:1][["a"]].describe())
+
+    def test_moda_y_frecuencias(self):
+        cache = CacheEstadisticas()
+        for col in ("b", "d", "texto"):
+            self.assertEqual(cache.moda(self.datos, col), self.datos[col].mode()[0])
+            pd.testing.assert_series_equal(cache.frecuencias(self.datos, col), self.datos[col].value_counts())
+        empate = pd.DataFrame({"x": ["b", "a", "b", "a", np.nan]})
+        self.assertEqual(cache.moda(empate, "x"), "a")
+        self.assertIsNone(cache.moda(self.datos, "vacia"))
+
+    def test_calculo_unico_por_version(self):
+        cache = CacheEstadisticas()
+        with patch("estadisticas_descriptivas.describir_columnas", wraps=describir_columnas) as describir:
+            cache.describir(self.datos, ["a", "b"])
+            self.assertEqual(cache.media(self.datos, "a"), self.datos["a"].mean())
+            self.assertEqual(cache.mediana(self.datos, "b"), self.datos["b"].median())
+            self.assertEqual(describir.call_count, 1)
+
+            # Solo se calculan las columnas que faltan
+            cache.describir(self.datos, ["a", "c"])
+            self.assertEqual(describir.call_args.args[1], ["c"])
+
+            # Al invalidar, o con otros datos, se vuelve a calcular
+            version = cache.version
+            cache.invalidar()
+            cache.media(self.datos, "a")
+            cache.media(self.datos.copy(), "a")
+            self.assertEqual(describir.call_count, 4)
+            self.assertGreater(cache.version, version + 1)
+        self.assertEqual(cache.estadisticas()["aciertos"], 3)
+
+    def test_no_mantiene_los_datos(self):
+        cache = CacheEstadisticas()
+        datos = self.datos.copy()
+        referencia = weakref.ref(datos)
+        cache.media(datos, "a")
+        del datos
+        self.assertIsNone(referencia()) # La caché no impide liberar el dataset
+        cache.media(self.datos, "a")
+        cache.invalidar()
+        self.assertIsNone(cache._datos)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,10 +1,15 @@
+import bz2
+import gzip
+import importlib.util
 import unittest
 from unittest.mock import patch, MagicMock
 import pandas as pd
 from io import StringIO
 import builtins
+import os
+import tempfile
 
-from exportador_datos import ExportarDatos
+from exportador_datos import EXTENSIONES_COMPRESION, ExportarDatos
 
 
 class TestExportarDatos(unittest.TestCase):
@@ -14,11 +19,14 @@ class TestExportarDatos(unittest.TestCase):
         self.df = pd.DataFrame(data)
         self.exportador = ExportarDatos(self.df)
 
-    @patch("builtins.input", side_effect=["1", "archivo_csv"])
-    @patch("pandas.DataFrame.to_csv")
-    def test_exportar_csv(self, mock_to_csv, mock_input):
-        self.exportador.exportar()
-        mock_to_csv.assert_called_once_with("archivo_csv.csv", index=False)
+    def test_exportar_csv(self):
+        with tempfile.TemporaryDirectory() as directorio:
+            nombre = os.path.join(directorio, "archivo_csv")
+            with patch("builtins.input", side_effect=["1", nombre, ""]), patch("builtins.print"):
+                self.assertTrue(self.exportador.exportar())
+            with open(f"{nombre}.csv", encoding="utf-8") as archivo:
+                self.assertEqual(archivo.read(), self.df.to_csv(index=False))
+            self.assertEqual(os.listdir(directorio), ["archivo_csv.csv"]) # Sin archivos temporales
 
     @patch("builtins.input", side_effect=["2", "archivo_excel"])
     @patch("pandas.DataFrame.to_excel")
@@ -26,7 +34,7 @@ class TestExportarDatos(unittest.TestCase):
         self.exportador.exportar()
         mock_to_excel.assert_called_once_with("archivo_excel.xlsx", index=False)
 
-    @patch("builtins.input", side_effect=["3"])
+    @patch("builtins.input", side_effect=["5"])
     def test_volver_al_menu(self, mock_input):
         # No exporta, solo sale del menú
         with patch("pandas.DataFrame.to_csv") as mock_csv, patch("pandas.DataFrame.to_excel") as mock_excel:
@@ -34,12 +42,90 @@ class TestExportarDatos(unittest.TestCase):
             mock_csv.assert_not_called()
             mock_excel.assert_not_called()
 
-    @patch("builtins.input", side_effect=["9", "3"])  # opción inválida, luego salir
+    @patch("builtins.input", side_effect=["9", "5"])  # opción inválida, luego salir
     def test_opcion_invalida(self, mock_input):
         with patch("pandas.DataFrame.to_csv") as mock_csv, patch("pandas.DataFrame.to_excel") as mock_excel:
             self.exportador.exportar()
             mock_csv.assert_not_called()
             mock_excel.assert_not_called()
 
+    def test_exportar_csv_bloques(self):
+        bloques = [pd.DataFrame({'col1': [1, 2], 'col2': [3, 4]}), pd.DataFrame({'col1': [5], 'col2': [6]})]
+        with tempfile.TemporaryDirectory() as directorio:
+            ruta = os.path.join(directorio, "salida.csv")
+            filas = self.exportador.exportar_csv_bloques(ruta, iter(bloques))
+            self.assertEqual(filas, 3)
+            pd.testing.assert_frame_equal(pd.read_csv(ruta), pd.concat(bloques, ignore_index=True))
+
+    @patch("builtins.input", side_effect=["1", "archivo_csv", ""])
+    def test_exportar_csv_modo_bloques(self, mock_input):
+        exportador = ExportarDatos(self.df, bloques=iter([self.df]))
+        with patch.object(exportador, "exportar_csv_bloques", return_value=2) as mock_bloques, \
+             patch("pandas.DataFrame.to_csv") as mock_csv:
+            exportador.exportar()
+            mock_bloques.assert_called_once()
+            mock_csv.assert_not_called()
+
+    def test_exportar_csv_comprimido_por_bloques_en_paralelo(self):
+        df = pd.DataFrame({'col1': range(25), 'col2': [f"valor {i}" for i in range(25)], 'col3': [i / 7 for i in range(25)]})
+        with tempfile.TemporaryDirectory() as directorio:
+            for compresion in ("none", "gzip", "bz2"):
+                ruta = os.path.join(directorio, f"salida.csv{EXTENSIONES_COMPRESION.get(compresion, '')}")
+                progreso = MagicMock()
+                with patch("builtins.print"):
+                    # La compresión y el formato se deducen de la extensión
+                    filas = ExportarDatos(df).aplicar_exportacion(ruta, hilos=3, tamano_bloque=4, progreso=progreso)
+                self.assertEqual(filas, 25)
+                self.assertEqual(progreso.call_count, 7)
+                with open(ruta, "rb") as archivo:
+                    contenido = archivo.read()
+                descomprimido = {"none": bytes, "gzip": gzip.decompress, "bz2": bz2.decompress}[compresion](contenido)
+                self.assertEqual(descomprimido.decode("utf-8"), df.to_csv(index=False))
+                pd.testing.assert_frame_equal(pd.read_csv(ruta), df)
+
+    def test_exportar_csv_atomico(self):
+        def bloques():
+            yield self.df
+            raise RuntimeError("error al preprocesar")
+
+        with tempfile.TemporaryDirectory() as directorio:
+            ruta = os.path.join(directorio, "salida.csv")
+            with self.assertRaises(RuntimeError):
+                ExportarDatos(self.df, bloques=bloques()).aplicar_exportacion(ruta)
+            self.assertEqual(os.listdir(directorio), []) # Ni el archivo final ni el temporal
+
+    @unittest.skipIf(importlib.util.find_spec("zstandard") is None, "zstandard no está instalado")
+    def test_exportar_csv_zstd(self):
+        with tempfile.TemporaryDirectory() as directorio:
+            ruta = os.path.join(directorio, "salida.csv.zst")
+            with patch("builtins.print"):
+                ExportarDatos(self.df).aplicar_exportacion(ruta, tamano_bloque=1)
+            pd.testing.assert_frame_equal(pd.read_csv(ruta), self.df)
+
+    @unittest.skipIf(importlib.util.find_spec("zstandard") is not None, "zstandard está instalado")
+    def test_exportar_csv_zstd_sin_zstandard(self):
+        with tempfile.TemporaryDirectory() as directorio:
+            with self.assertRaises(ImportError):
+                ExportarDatos(self.df).aplicar_exportacion(os.path.join(directorio, "salida.csv"), compresion="zstd")
+            self.assertEqual(os.listdir(directorio), [])
+
+    def test_exportar_parquet_y_feather(self):
+        df = pd.DataFrame({'col1': [1.5, 2.5], 'col2': ['a', 'b']})
+        with tempfile.TemporaryDirectory() as directorio:
+            for opcion, extension, compresion in (("3", "parquet", "zstd"), ("4", "feather", "")):
+                nombre = os.path.join(directorio, "salida")
+                with patch("builtins.input", side_effect=[opcion, nombre, compresion]):
+                    self.assertTrue(ExportarDatos(df).exportar())
+                leido = pd.read_parquet(f"{nombre}.parquet") if extension == "parquet" else pd.read_feather(f"{nombre}.feather")
+                pd.testing.assert_frame_equal(leido, df)
+
+    def test_exportar_parquet_modo_bloques(self):
+        bloques = [pd.DataFrame({'col1': [1, 2], 'col2': [3.0, 4.0]}), pd.DataFrame({'col1': [5], 'col2': [6.0]})]
+        with tempfile.TemporaryDirectory() as directorio:
+            nombre = os.path.join(directorio, "salida")
+            with patch("builtins.input", side_effect=["3", nombre, "snappy"]):
+                ExportarDatos(self.df, bloques=iter(bloques)).exportar()
+            pd.testing.assert_frame_equal(pd.read_parquet(f"{nombre}.parquet"), pd.concat(bloques, ignore_index=True))
+
 if __name__ == "__main__":
     unittest.main()
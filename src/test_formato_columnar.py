@@ -0,0 +1,73 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import pandas as pd
+
+from formato_columnar import (escribir_bloques_columnar, escribir_feather, escribir_parquet, importar_pyarrow, leer_feather,
+                              leer_parquet)
+
+
+class TestFormatoColumnar(unittest.TestCase):
+
+    def test_escribir_bloques_parquet_y_feather(self):
+        # El segundo bloque tiene enteros donde el primero tenía decimales: se convierten a decimales
+        bloques = [pd.DataFrame({'a': [1.5, 2.5], 'b': ['x', 'y']}), pd.DataFrame({'a': [3], 'b': ['z']})]
+        esperado = pd.DataFrame({'a': [1.5, 2.5, 3.0], 'b': ['x', 'y', 'z']})
+        with tempfile.TemporaryDirectory() as directorio:
+            for formato, lector in (("parquet", leer_parquet), ("feather", leer_feather)):
+                ruta = os.path.join(directorio, f"salida.{formato}")
+                filas = escribir_bloques_columnar(ruta, iter(bloques), formato, "zstd")
+                self.assertEqual(filas, 3)
+                pd.testing.assert_frame_equal(lector(ruta), esperado)
+
+    def test_escribir_bloques_con_tipos_distintos(self):
+        bloques = [
+            pd.DataFrame({'a': pd.Series([1, 2], dtype='int8'), 'b': [1, 2], 'c': [None, None]}),
+            pd.DataFrame({'a': pd.Series([400], dtype='int16'), 'b': [1.5], 'c': ['x']}),
+            pd.DataFrame({'a': pd.Series([3], dtype='int8'), 'b': [4], 'c': [None]}),
+        ]
+        esperado = pd.DataFrame({'a': pd.Series([1, 2, 400, 3], dtype='int16'), 'b': [1.0, 2.0, 1.5, 4.0],
+                                 'c': [None, None, 'x', None]})
+        with tempfile.TemporaryDirectory() as directorio:
+            for formato, lector in (("parquet", leer_parquet), ("feather", leer_feather)):
+                ruta = os.path.join(directorio, f"salida.{formato}")
+                self.assertEqual(escribir_bloques_columnar(ruta, iter(bloques), formato), 4)
+                pd.testing.assert_frame_equal(lector(ruta), esperado)
+            self.assertEqual(sorted(os.listdir(directorio)), ["salida.feather", "salida.parquet"]) # Sin temporales
+
+    def test_escribir_bloques_error_sin_archivo_parcial(self):
+        def bloques():
+            yield pd.DataFrame({'a': [1, 2]})
+            yield pd.DataFrame({'a': [2.5]})
+            raise RuntimeError("error al preprocesar")
+
+        with tempfile.TemporaryDirectory() as directorio:
+            with self.assertRaises(RuntimeError):
+                escribir_bloques_columnar(os.path.join(directorio, "salida.parquet"), bloques())
+            self.assertEqual(os.listdir(directorio), [])
+
+    def test_feather_sin_compresion(self):
+        df = pd.DataFrame({'a': range(5), 'b': list("abcde")})
+        with tempfile.TemporaryDirectory() as directorio:
+            ruta = os.path.join(directorio, "salida.feather")
+            escribir_feather(df, ruta, "none")
+            pd.testing.assert_frame_equal(leer_feather(ruta, columnas=['b'], tipos={'b': 'category'}),
+                                          df[['b']].astype('category'))
+
+    def test_columnas_dispersas(self):
+        df = pd.DataFrame({'a': pd.arrays.SparseArray([0, 1, 0], dtype=pd.SparseDtype('uint8', 0)), 'b': [1.5, 2.5, 3.5]})
+        with tempfile.TemporaryDirectory() as directorio:
+            ruta = os.path.join(directorio, "salida.parquet")
+            escribir_parquet(df, ruta)
+            pd.testing.assert_frame_equal(leer_parquet(ruta), df.assign(a=df['a'].sparse.to_dense()))
+
+    def test_pyarrow_no_instalado(self):
+        with patch.dict('sys.modules', {'pyarrow': None}):
+            with self.assertRaises(ImportError) as contexto:
+                importar_pyarrow()
+        self.assertIn("pip install pyarrow", str(contexto.exception))
+
+if __name__ == "__main__":
+    unittest.main()
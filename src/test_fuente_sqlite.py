@@ -0,0 +1,61 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from fuente_sqlite import FuenteSQLite, cerrar_conexiones
+
+
+class TestFuenteSQLite(unittest.TestCase):
+
+    def setUp(self):
+        self.directorio = tempfile.TemporaryDirectory()
+        self.ruta = os.path.join(self.directorio.name, "titanic.db")
+        self.datos = pd.DataFrame({
+            'PassengerId': np.arange(1, 1001),
+            'Pclass': np.tile([1, 2, 3, 3], 250),
+            'Fare': np.linspace(5, 500, 1000),
+            'Name': [f"Pasajero {i}" for i in range(1000)],
+        })
+        conn = sqlite3.connect(self.ruta)
+        self.datos.to_sql("train", conn, index=False)
+        conn.close()
+        self.fuente = FuenteSQLite(self.ruta)
+
+    def tearDown(self):
+        cerrar_conexiones()
+        self.directorio.cleanup()
+
+    def test_conexion_reutilizada_y_solo_lectura(self):
+        conexion = self.fuente.conexion()
+        self.assertIs(FuenteSQLite(self.ruta).conexion(), conexion)
+        with self.assertRaises(sqlite3.OperationalError):
+            conexion.execute("DELETE FROM train")
+
+    def test_where_y_limite_en_la_consulta(self):
+        resultado = self.fuente.leer("train", columnas=['PassengerId', 'Fare'], where="Pclass = ?", parametros=(1,), limite=10)
+        self.assertEqual(list(resultado.columns), ['PassengerId', 'Fare'])
+        self.assertEqual(len(resultado), 10)
+        self.assertTrue((resultado['PassengerId'] % 4 == 1).all())
+
+    def test_leer_bloques(self):
+        bloques = list(self.fuente.leer_bloques("train", 300, columnas=['PassengerId']))
+        self.assertEqual([len(b) for b in bloques], [300, 300, 300, 100])
+        self.assertEqual(pd.concat(bloques)['PassengerId'].tolist(), list(range(1, 1001)))
+
+    def test_leer_paralelo_igual_que_secuencial(self):
+        secuencial = self.fuente.leer("train", where="Fare > ?", parametros=(100,))
+        paralelo = self.fuente.leer_paralelo("train", hilos=3, where="Fare > ?", parametros=(100,))
+        pd.testing.assert_frame_equal(paralelo, secuencial)
+
+    def test_inmutable(self):
+        fuente = FuenteSQLite(self.ruta, inmutable=True)
+        self.assertEqual(fuente.tablas(), ['train'])
+        self.assertEqual(len(fuente.leer("train")), 1000)
+
+
+if __name__ == '__main__':
+    unittest.main()
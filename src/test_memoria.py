@@ -0,0 +1,27 @@
+import unittest
+import numpy as np
+
+import memoria
+
+
+class TestMemoria(unittest.TestCase):
+
+    def test_medidas_positivas(self):
+        rss = memoria.rss_mb()
+        pico = memoria.pico_rss_mb()
+        if rss is None or pico is None:
+            self.skipTest("Medición de memoria no disponible en este sistema")
+        self.assertGreater(rss, 0)
+        self.assertGreaterEqual(pico, rss * 0.99)
+
+    def test_pico_registra_reserva_temporal(self):
+        if not memoria.reiniciar_pico_rss():
+            self.skipTest("El pico de memoria solo se puede reiniciar en Linux")
+        antes = memoria.pico_rss_mb()
+        temporal = np.ones(20_000_000)  # ~150 MB
+        del temporal
+        self.assertGreater(memoria.pico_rss_mb() - antes, 100)
+
+
+if __name__ == '__main__':
+    unittest.main()
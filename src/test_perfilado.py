@@ -0,0 +1,108 @@
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from data_loader import DataLoader
+from exportador_datos import ExportarDatos
+from perfilado import Perfilador, medir_etapa, perfilador_activo
+from preprocesado_datos import PreprocesadoDatos
+
+
+class Contador:
+    def __init__(self):
+        self.datos = pd.DataFrame({"a": range(5)})
+
+    @medir_etapa(entrada="datos", salida="datos")
+    def duplicar(self):
+        self.datos = pd.concat([self.datos, self.datos])
+
+    @medir_etapa(nombre="fallo")
+    def fallar(self):
+        raise ValueError("error de prueba")
+
+
+class TestPerfilador(unittest.TestCase):
+
+    def setUp(self):
+        self.directorio = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(0)
+        self.csv = os.path.join(self.directorio.name, "datos.csv")
+        pd.DataFrame({
+            "Survived": rng.integers(0, 2, 50),
+            "Sex": rng.choice(["male", "female"], 50),
+            "Age": np.where(rng.random(50) < 0.2, np.nan, rng.normal(30, 10, 50)),
+            "Fare": rng.exponential(30, 50),
+        }).to_csv(self.csv, index=False)
+
+    def tearDown(self):
+        self.directorio.cleanup()
+
+    def test_sin_perfilador_no_se_mide(self):
+        perfilador = Perfilador()
+        Contador().duplicar()
+        self.assertIsNone(perfilador_activo())
+        self.assertEqual(perfilador.etapas, [])
+
+    def test_etapas_del_pipeline(self):
+        salida = os.path.join(self.directorio.name, "salida.csv")
+        with Perfilador() as perfilador:
+            loader = DataLoader()
+            loader.cargar_csv(self.csv)
+            preprocesador = PreprocesadoDatos(loader)
+            preprocesador.aplicar_seleccion(["Sex", "Age", "Fare"], "Survived")
+            preprocesador.aplicar_valores_faltantes("media")
+            preprocesador.aplicar_datos_categoricos("one_hot")
+            ExportarDatos(preprocesador.dataset_modificado).aplicar_exportacion(salida)
+        self.assertIsNone(perfilador_activo())
+
+        resumen = {total["etapa"]: total for total in perfilador.resumen()}
+        self.assertEqual(list(resumen), ["DataLoader.cargar_csv", "PreprocesadoDatos.aplicar_seleccion",
+                                         "PreprocesadoDatos.aplicar_valores_faltantes",
+                                         "PreprocesadoDatos.aplicar_datos_categoricos",
+                                         "ExportarDatos.aplicar_exportacion"])
+        carga = resumen["DataLoader.cargar_csv"]
+        self.assertEqual(carga["filas_salida"], 50)
+        self.assertEqual(carga["bytes_leidos"], os.path.getsize(self.csv))
+        exportacion = resumen["ExportarDatos.aplicar_exportacion"]
+        self.assertEqual(exportacion["filas_entrada"], 50)
+        self.assertEqual(exportacion["filas_salida"], 50)
+        self.assertEqual(exportacion["bytes_escritos"], os.path.getsize(salida))
+        for total in resumen.values():
+            self.assertGreaterEqual(total["segundos"], 0)
+            self.assertGreaterEqual(total["segundos_cpu"], 0)
+
+    def test_ejecuciones_repetidas_y_errores(self):
+        contador = Contador()
+        with Perfilador() as perfilador:
+            contador.duplicar()
+            contador.duplicar()
+            with self.assertRaises(ValueError):
+                contador.fallar()
+
+        duplicar, fallo = perfilador.resumen()
+        self.assertEqual(duplicar["ejecuciones"], 2)
+        self.assertEqual((duplicar["filas_entrada"], duplicar["filas_salida"]), (10, 20))
+        self.assertEqual(perfilador.etapas[-1]["estado"], "error: ValueError")
+
+    def test_perfiles_detallados_y_json(self):
+        etapa = "Contador.duplicar"
+        with Perfilador(etapas_cprofile=[etapa], etapas_tracemalloc=[etapa]) as perfilador:
+            Contador().duplicar()
+        registro = perfilador.etapas[0]
+        self.assertIn("cumulative", registro["cprofile"])
+        self.assertGreater(registro["tracemalloc"]["pico_mb"], 0)
+
+        ruta = os.path.join(self.directorio.name, "perfil.json")
+        perfilador.exportar_json(ruta)
+        with open(ruta, encoding="utf-8") as archivo:
+            guardado = json.load(archivo)
+        self.assertEqual(guardado["resumen"], perfilador.resumen())
+        self.assertEqual(guardado["etapas"][0]["etapa"], etapa)
+
+
+if __name__ == "__main__":
+    unittest.main()
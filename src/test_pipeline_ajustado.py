@@ -0,0 +1,89 @@
+import os
+import pickle
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from data_loader import DataLoader
+from pipeline_ajustado import PipelineAjustado
+from preprocesado_datos import PreprocesadoDatos
+
+
+class TestPipelineAjustado(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.datos = pd.DataFrame({
+            'Survived': rng.integers(0, 2, 60),
+            'Sex': rng.choice(['male', 'female'], 60),
+            'Embarked': rng.choice(['S', 'C', 'Q', None], 60),
+            'Age': np.where(rng.random(60) < 0.2, np.nan, rng.normal(30, 10, 60)),
+            'Fare': rng.exponential(30, 60),
+        })
+        cargador = DataLoader()
+        cargador.dataset = self.datos
+        self.preprocesado = PreprocesadoDatos(cargador)
+        self.preprocesado.aplicar_seleccion(['Sex', 'Embarked', 'Age', 'Fare'], 'Survived')
+        self.preprocesado.aplicar_valores_faltantes("moda")
+        self.preprocesado.aplicar_datos_categoricos("one_hot")
+        self.preprocesado.aplicar_normalizacion("z_score")
+        self.preprocesado.aplicar_valores_atipicos("recortar")
+        self.pipeline = PipelineAjustado.desde_preprocesado(self.preprocesado)
+
+    def test_guardar_cargar_y_transformar(self):
+        with tempfile.TemporaryDirectory() as directorio:
+            ruta = os.path.join(directorio, "pipeline.pkl")
+            self.pipeline.guardar(ruta)
+            cargado = PipelineAjustado.cargar(ruta)
+
+        original = self.datos.copy()
+        pd.testing.assert_frame_equal(cargado.transformar(self.datos), self.preprocesado.dataset_modificado)
+        pd.testing.assert_frame_equal(self.datos, original)  # Los datos de entrada no se modifican
+
+    def test_transformar_datos_nuevos_sin_target(self):
+        nuevos = pd.DataFrame({
+            'Sex': ['female', 'male'],
+            'Embarked': ['S', 'X'],  # 'X' no se vio al ajustar; 'C' y 'Q' no aparecen
+            'Age': [None, 500.0],
+            'Fare': [10.0, 20.0],
+        })
+        resultado = self.pipeline.transformar(nuevos)
+
+        columnas_esperadas = [col for col in self.preprocesado.dataset_modificado.columns if col != 'Survived']
+        self.assertEqual(list(resultado.columns), columnas_esperadas)
+        self.assertEqual(resultado.loc[1, ['Embarked_C', 'Embarked_Q', 'Embarked_S']].tolist(), [0, 0, 0])
+        # La edad atípica se recorta al límite calculado en el ajuste, sin volver a calcularlo
+        limite = self.pipeline.pasos[-1]["parametros"]["limites"]["Age"][1]
+        self.assertAlmostEqual(resultado.loc[1, 'Age'], limite)
+
+    def test_transformar_bloques(self):
+        bloques = [self.datos.iloc[:25], self.datos.iloc[25:]]
+        resultado = pd.concat(self.pipeline.transformar_bloques(bloques))
+        pd.testing.assert_frame_equal(resultado, self.pipeline.transformar(self.datos))
+
+    def test_invertir_label(self):
+        preprocesado = PreprocesadoDatos.desde_seleccion(self.datos, self.preprocesado.seleccion)
+        preprocesado.aplicar_datos_categoricos("label")
+        pipeline = PipelineAjustado.desde_preprocesado(preprocesado)
+
+        nuevos = pd.DataFrame({'Sex': ['male', 'female'], 'Embarked': ['X', None], 'Age': [1.0, 2.0], 'Fare': [3.0, 4.0]})
+        codificados = pipeline.transformar(nuevos)
+        self.assertEqual(codificados['Embarked'].tolist(), [-1, -1])
+        invertidos = pipeline.invertir_label(codificados)
+        self.assertEqual(invertidos['Sex'].tolist(), ['male', 'female'])
+        self.assertTrue(invertidos['Embarked'].isna().all())  # Categoría desconocida y valor faltante
+        with self.assertRaises(ValueError):
+            self.pipeline.invertir_label(codificados)  # Pipeline con one-hot
+
+    def test_cargar_archivo_no_valido(self):
+        with tempfile.TemporaryDirectory() as directorio:
+            ruta = os.path.join(directorio, "otro.pkl")
+            with open(ruta, "wb") as archivo:
+                pickle.dump([1, 2, 3], archivo)
+            with self.assertRaises(ValueError):
+                PipelineAjustado.cargar(ruta)
+
+if __name__ == "__main__":
+    unittest.main()
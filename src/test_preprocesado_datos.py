@@ -2,8 +2,14 @@ import unittest
 from unittest.mock import patch
 import pandas as pd
 import numpy as np
+import os
+import tempfile
 
-from preprocesado_datos import PreprocesadoDatos  
+from cache_resultados import AlmacenCache
+from data_loader import DataLoader, optimizar_tipos
+from estadisticas_bloques import combinar_acumuladores
+from estadisticas_descriptivas import describir_columnas
+from preprocesado_datos import PreprocesadoDatos, codificar_one_hot, escanear_vocabulario
 
 class DummyDataLoader:
     def __init__(self, dataset):
@@ -168,7 +174,7 @@ class TestSeleccionarColumnas(unittest.TestCase):
             self.assertTrue(result)
             self.assertTrue(pd.api.types.is_integer_dtype(self.preprocesador.dataset_modificado['Sex']))
 
-    @patch('builtins.input', side_effect=["3"])  # Cancelar
+    @patch('builtins.input', side_effect=["10"])  # Cancelar
     def test_cancelar_transformacion(self, mock_input):
         self.seleccionar_columnas_manual(['Sex', 'Age'], 'Name')
         self.preprocesador.columnas_categoricas = ['Sex', 'Name']
@@ -184,6 +190,101 @@ class TestSeleccionarColumnas(unittest.TestCase):
         self.assertTrue(resultado)
         self.assertTrue(self.preprocesador.categoricos_transformados)
 
+    def test_label_encoding_valores_faltantes_e_inversa(self):
+        self.preprocesador.aplicar_seleccion(['Cabin', 'Embarked'], 'Survived')
+        self.preprocesador.aplicar_datos_categoricos("label")
+        df = self.preprocesador.dataset_modificado
+        self.assertEqual(df['Cabin'].tolist(), [-1, 1, -1, 0, -1, -1, 2])  # C123 < C85 < E46; NaN = -1
+        self.assertEqual(df['Embarked'].dtype, np.int64)
+        self.assertEqual(self.preprocesador.pasos[-1]["parametros"]["clases"]['Embarked'], ['C', 'Q', 'S'])
+
+        invertido = self.preprocesador.invertir_label()
+        pd.testing.assert_frame_equal(invertido[['Cabin', 'Embarked']], self.df[['Cabin', 'Embarked']])
+
+    def test_label_encoding_hilos_y_tipos_mezclados(self):
+        datos = pd.DataFrame({'a': ['x', 2, 'y', 2, None], 'b': pd.Categorical(['q', 'p', 'q', None, 'p']), 'y': range(5)})
+        resultados = []
+        for hilos in (1, 2):
+            preprocesador = PreprocesadoDatos(DummyDataLoader(datos), hilos=hilos)
+            preprocesador.aplicar_seleccion(['a', 'b'], 'y')
+            preprocesador.aplicar_datos_categoricos("label")
+            resultados.append(preprocesador.dataset_modificado)
+        pd.testing.assert_frame_equal(resultados[0], resultados[1])
+        self.assertEqual(resultados[0]['a'].tolist(), [1, 0, 2, 0, -1])  # Orden por texto: 2 < x < y
+        self.assertEqual(resultados[0]['b'].tolist(), [1, 0, 1, -1, 0])
+
+    def test_codificaciones_one_hot_compactas(self):
+        self.preprocesador.aplicar_seleccion(['Age', 'Sex', 'Embarked'], 'Survived')
+        referencia = PreprocesadoDatos(self.data_loader)
+        referencia.aplicar_seleccion(['Age', 'Sex', 'Embarked'], 'Survived')
+        referencia.aplicar_datos_categoricos("one_hot")
+        esperado = referencia.dataset_modificado[referencia.features]
+
+        self.preprocesador.aplicar_datos_categoricos("one_hot_disperso")
+        resultado = self.preprocesador.dataset_modificado
+        self.assertTrue(all(isinstance(resultado[col].dtype, pd.SparseDtype) for col in self.preprocesador.features if col != 'Age'))
+        matriz, columnas = self.preprocesador.matriz_dispersa()
+        self.assertEqual(set(columnas), set(esperado.columns))
+        np.testing.assert_array_equal(matriz.toarray(), esperado[columnas].to_numpy(dtype=float))
+
+        uint8 = PreprocesadoDatos(self.data_loader)
+        uint8.aplicar_seleccion(['Age', 'Sex', 'Embarked'], 'Survived')
+        uint8.aplicar_datos_categoricos("one_hot_uint8")
+        self.assertEqual(uint8.dataset_modificado['Sex_male'].dtype, np.uint8)
+        dummies = [col for col in esperado.columns if col != 'Age']
+        pd.testing.assert_frame_equal(uint8.dataset_modificado[dummies].astype(int), esperado[dummies])
+
+    def test_codificacion_top_k_y_hashing(self):
+        self.preprocesador.aplicar_seleccion(['Ticket', 'Embarked'], 'Survived')
+        self.preprocesador.aplicar_datos_categoricos("top_k", k=1)
+        df = self.preprocesador.dataset_modificado
+        self.assertEqual(self.preprocesador.features, ['Ticket_113803', 'Ticket_Otros', 'Embarked_S', 'Embarked_Otros'])
+        self.assertEqual(df['Embarked_Otros'].tolist(), [0, 1, 0, 0, 0, 1, 0])
+        # Un bloque sin ninguna categoría conservada tiene las mismas columnas
+        bloque = self.preprocesador.procesar_bloque(self.df.iloc[[1, 5]])
+        self.assertEqual(list(bloque.columns), list(df.columns))
+
+        hashing = PreprocesadoDatos(self.data_loader)
+        hashing.aplicar_seleccion(['Ticket', 'Cabin'], 'Survived')
+        hashing.aplicar_datos_categoricos("hashing", n_columnas=4)
+        df = hashing.dataset_modificado
+        self.assertEqual(len(hashing.features), 8)
+        self.assertTrue((df[[f"Ticket_hash{i}" for i in range(4)]].sum(axis=1) == 1).all())
+        self.assertEqual(df[[f"Cabin_hash{i}" for i in range(4)]].sum(axis=1).tolist(), [0, 1, 0, 1, 0, 0, 1])
+
+    def test_codificacion_frecuencia_y_target(self):
+        self.preprocesador.aplicar_seleccion(['Embarked'], 'Survived')
+        self.preprocesador.aplicar_datos_categoricos("frecuencia")
+        self.assertEqual(self.preprocesador.dataset_modificado['Embarked'].tolist(),
+                         [5 / 7, 1 / 7, 5 / 7, 5 / 7, 5 / 7, 1 / 7, 5 / 7])
+        # Las categorías nuevas valen 0
+        nuevo = self.df.iloc[:2].assign(Embarked=['X', 'S'])
+        self.assertEqual(self.preprocesador.procesar_bloque(nuevo)['Embarked'].tolist(), [0.0, 5 / 7])
+
+        target = PreprocesadoDatos(self.data_loader)
+        target.aplicar_seleccion(['Embarked'], 'Survived')
+        target.aplicar_datos_categoricos("target", suavizado=0)
+        self.assertEqual(target.dataset_modificado['Embarked'].tolist(), [0.4, 1.0, 0.4, 0.4, 0.4, 0.0, 0.4])
+        self.assertEqual(target.procesar_bloque(nuevo)['Embarked'].tolist(), [3 / 7, 0.4])
+
+        sin_target_numerico = PreprocesadoDatos(self.data_loader)
+        sin_target_numerico.aplicar_seleccion(['Embarked'], 'Name')
+        with self.assertRaises(ValueError):
+            sin_target_numerico.aplicar_datos_categoricos("target")
+
+    def test_comparar_codificaciones(self):
+        self.preprocesador.aplicar_seleccion(['Age', 'Ticket', 'Sex'], 'Survived')
+        original = self.preprocesador.dataset_modificado.copy()
+        resultados = {r["estrategia"]: r for r in self.preprocesador.comparar_codificaciones()}
+
+        self.assertEqual(resultados["one_hot"]["columnas"], 9)
+        self.assertEqual(resultados["label"]["columnas"], 2)
+        self.assertLess(resultados["one_hot_uint8"]["memoria_mb"], resultados["one_hot"]["memoria_mb"])
+        self.assertTrue(all(r["segundos"] >= 0 for r in resultados.values()))
+        # El preprocesador no se modifica
+        pd.testing.assert_frame_equal(self.preprocesador.dataset_modificado, original)
+        self.assertEqual(self.preprocesador.pasos, [])
+
     ########## Normalización y Escalado de Datos Numéricos ##########
 
     @patch('builtins.input', side_effect=["1"])  # Min-Max Scaling
@@ -274,7 +375,87 @@ class TestSeleccionarColumnas(unittest.TestCase):
         self.assertIn(1000, self.preprocesador.dataset_modificado['Fare'].values)
 
 
-    @patch('builtins.input', side_effect=["4"])  # Cancelar
+    @patch('builtins.input', side_effect=["4"])  # Recortar valores atípicos
+    def test_recortar_valores_atipicos(self, mock_input):
+        self.preprocesador.columnas_numericas = ['Fare']
+        self.seleccionar_columnas_manual(['Fare'], 'Target')
+        fare = self.df['Fare']
+        limite_superior = fare.quantile(0.75) + 1.5 * (fare.quantile(0.75) - fare.quantile(0.25))
+
+        result = self.preprocesador.valores_atipicos()
+        self.assertTrue(result)
+
+        fare_modificado = self.preprocesador.dataset_modificado['Fare']
+        self.assertAlmostEqual(fare_modificado.max(), limite_superior)
+        self.assertEqual(len(fare_modificado), len(fare))  # No se elimina ninguna fila
+
+    def test_reemplazar_mediana_vectorizado_equivale_a_apply(self):
+        self.seleccionar_columnas_manual(['Fare', 'Age'], 'Survived')
+        self.preprocesador.columnas_numericas = ['Fare', 'Age']
+        esperado = self.df.copy()
+        for col in ['Fare', 'Age']:
+            Q1, Q3 = esperado[col].quantile(0.25), esperado[col].quantile(0.75)
+            IQR = Q3 - Q1
+            mediana = esperado[col].median()
+            esperado[col] = esperado[col].apply(lambda x: mediana if x < Q1 - 1.5 * IQR or x > Q3 + 1.5 * IQR else x)
+
+        self.preprocesador.aplicar_valores_atipicos("mediana")
+
+        pd.testing.assert_frame_equal(self.preprocesador.dataset_modificado, esperado)
+
+    @patch('builtins.input', side_effect=["1"])  # Eliminar valores atípicos
+    def test_cuartiles_calculados_una_vez(self, mock_input):
+        self.seleccionar_columnas_manual(['Fare', 'Age'], 'Survived')
+        self.preprocesador.columnas_numericas = ['Fare', 'Age']
+
+        with patch('numpy.nanquantile', wraps=np.nanquantile) as mock_quantile:
+            result = self.preprocesador.valores_atipicos()
+
+        self.assertTrue(result)
+        mock_quantile.assert_called_once()  # Detección y manejo comparten los límites
+
+    def test_estadisticas_compartidas_entre_pasos(self):
+        self.seleccionar_columnas_manual(['Fare', 'Age'], 'Survived')
+        self.preprocesador.columnas_numericas = ['Fare', 'Age']
+
+        with patch('estadisticas_descriptivas.describir_columnas', wraps=describir_columnas) as describir:
+            self.preprocesador.detectar_valores_atipicos()
+            # Las medianas de relleno de las features son las que ya se calcularon para detectar los
+            # valores atípicos: solo se calcula la del target
+            self.preprocesador.aplicar_valores_faltantes("mediana")
+            self.assertEqual(describir.call_args.args[1], ['Survived'])
+            self.assertEqual(self.preprocesador.dataset_modificado['Age'][5], self.df['Age'].median())
+
+            # El paso ha modificado el dataset: los cuartiles se vuelven a calcular
+            self.preprocesador.detectar_valores_atipicos()
+            self.assertEqual(describir.call_count, 3)
+
+    def test_mediana_con_limites_sin_medianas(self):
+        self.seleccionar_columnas_manual(['Fare'], 'Survived')
+        self.preprocesador.columnas_numericas = ['Fare']
+        mediana = self.df['Fare'].median()
+
+        self.preprocesador.aplicar_valores_atipicos("mediana", limites={"Fare": (0.0, 10.0)})
+
+        fare = self.preprocesador.dataset_modificado['Fare']
+        self.assertEqual(fare.tolist(), [7.25, mediana, 7.925, mediana, 8.05, 8.4583, mediana])
+        self.assertEqual(self.preprocesador.pasos[-1]["parametros"]["medianas"], {"Fare": mediana})
+
+    def test_eliminar_atipicos_limites_sobre_datos_completos(self):
+        self.seleccionar_columnas_manual(['Fare', 'Age'], 'Survived')
+        self.preprocesador.columnas_numericas = ['Fare', 'Age']
+        df = self.df
+        fuera = pd.Series(False, index=df.index)
+        for col in ['Fare', 'Age']:
+            Q1, Q3 = df[col].quantile(0.25), df[col].quantile(0.75)
+            IQR = Q3 - Q1
+            fuera |= (df[col] < Q1 - 1.5 * IQR) | (df[col] > Q3 + 1.5 * IQR)
+
+        self.preprocesador.aplicar_valores_atipicos("eliminar")
+
+        pd.testing.assert_frame_equal(self.preprocesador.dataset_modificado, df[~fuera])
+
+    @patch('builtins.input', side_effect=["5"])  # Cancelar
     def test_cancelar_manejo_atipicos(self, mock_input):
         self.preprocesador.columnas_numericas = ['Fare']
         self.seleccionar_columnas_manual(['Fare'], 'Target')
@@ -291,5 +472,221 @@ class TestSeleccionarColumnas(unittest.TestCase):
         self.assertTrue(result)
 
 
+    ########## Procesado por Bloques #############
+
+    def test_procesar_bloques_reproduce_pasos(self):
+        self.preprocesador.aplicar_seleccion(['Age', 'Sex', 'Fare'], 'Survived')
+        self.preprocesador.aplicar_valores_faltantes("mediana")
+        self.preprocesador.aplicar_datos_categoricos("label")
+        self.preprocesador.aplicar_normalizacion("min_max")
+
+        bloques = [self.df.iloc[:4], self.df.iloc[4:]]
+        resultado = list(self.preprocesador.procesar_bloques(bloques))
+
+        self.assertEqual(sum(len(b) for b in resultado), len(self.df))
+        for bloque in resultado:
+            self.assertFalse(bloque['Age'].isnull().any())
+            self.assertTrue(pd.api.types.is_integer_dtype(bloque['Sex']))
+            self.assertLessEqual(bloque['Fare'].max(), 1)
+        # Los bloques originales no se modifican
+        self.assertTrue(self.df['Age'].isnull().any())
+
+    @patch('builtins.print')
+    @patch('builtins.input', side_effect=["3", "4"])  # Mediana para faltantes, recortar atípicos
+    def test_bloques_sin_faltantes_ni_atipicos_en_la_muestra(self, mock_input, mock_print):
+        with tempfile.TemporaryDirectory() as directorio:
+            ruta = os.path.join(directorio, "datos.csv")
+            self.df.to_csv(ruta, index=False)
+            cargador = DataLoader()
+            cargador.cargar_csv(ruta, tamano_bloque=4) # La muestra no tiene faltantes ni atípicos
+            preprocesador = PreprocesadoDatos(cargador)
+            preprocesador.aplicar_seleccion(['Age', 'Fare'], 'Survived')
+
+            # Aun así se pide la estrategia y se registra el paso
+            self.assertTrue(preprocesador.valores_faltantes())
+            self.assertTrue(preprocesador.valores_atipicos())
+            self.assertEqual([paso["paso"] for paso in preprocesador.pasos], ["valores_faltantes", "valores_atipicos"])
+
+            preprocesador.ajustar_bloques(cargador.iterar_bloques)
+            resultado = pd.concat(preprocesador.procesar_bloques(cargador.iterar_bloques()))
+        self.assertFalse(resultado['Age'].isnull().any())
+        self.assertLess(resultado['Fare'].max(), 1000)
+
+    def test_ajustar_bloques_coincide_con_memoria(self):
+        rng = np.random.default_rng(0)
+        n = 1_000
+        datos = pd.DataFrame({
+            'Age': rng.normal(30, 10, n),
+            'Fare': rng.exponential(30, n),
+            'Sex': rng.choice(['male', 'female'], n),
+            'Survived': rng.integers(0, 2, n),
+        })
+        datos.loc[rng.choice(n, 100, replace=False), 'Age'] = np.nan
+
+        def aplicar_pasos(preprocesador):
+            preprocesador.aplicar_seleccion(['Age', 'Fare', 'Sex'], 'Survived')
+            preprocesador.aplicar_valores_faltantes("media")
+            preprocesador.aplicar_datos_categoricos("label")
+            preprocesador.aplicar_normalizacion("z_score")
+            preprocesador.aplicar_valores_atipicos("mediana")
+
+        # Referencia: todo el dataset en memoria
+        en_memoria = PreprocesadoDatos(DummyDataLoader(datos))
+        aplicar_pasos(en_memoria)
+
+        # Por bloques: los pasos se eligen sobre una muestra y se ajustan con el archivo completo
+        por_bloques = PreprocesadoDatos(DummyDataLoader(datos.iloc[:100]))
+        aplicar_pasos(por_bloques)
+        obtener_bloques = lambda: (datos.iloc[i:i + 150] for i in range(0, n, 150))
+        por_bloques.ajustar_bloques(obtener_bloques)
+        resultado = pd.concat(por_bloques.procesar_bloques(obtener_bloques()))
+
+        pd.testing.assert_frame_equal(resultado, en_memoria.dataset_modificado, check_exact=False, rtol=1e-9)
+
+    def test_one_hot_vocabulario_fijo_por_bloques(self):
+        bloques = [self.df.iloc[:3], self.df.iloc[3:5], self.df.iloc[5:]]  # 'C' y 'Q' no están en todos
+        # Dos recorridos independientes (por ejemplo, dos archivos) se combinan en un único vocabulario
+        tablas = combinar_acumuladores(escanear_vocabulario(bloques[:1], ['Embarked', 'Sex']),
+                                       escanear_vocabulario(bloques[1:], ['Embarked', 'Sex']))
+        vocabulario = {col: tabla.categorias() for col, tabla in tablas.items()}
+        self.assertEqual(vocabulario, {'Embarked': ['C', 'Q', 'S'], 'Sex': ['female', 'male']})
+
+        codificados = [codificar_one_hot(bloque, vocabulario) for bloque in bloques]
+        for codificado in codificados:
+            self.assertEqual(list(codificado.columns), ['Embarked_C', 'Embarked_Q', 'Embarked_S', 'Sex_female', 'Sex_male'])
+        esperado = pd.get_dummies(self.df[['Embarked', 'Sex']]).astype(int)
+        pd.testing.assert_frame_equal(pd.concat(codificados), esperado)
+
+    def test_one_hot_ajustado_por_bloques(self):
+        por_bloques = PreprocesadoDatos(DummyDataLoader(self.df.iloc[:1]))  # La muestra solo tiene 'S'
+        por_bloques.aplicar_seleccion(['Embarked', 'Fare'], 'Survived')
+        por_bloques.aplicar_datos_categoricos("one_hot_uint8")
+        obtener_bloques = lambda: (self.df.iloc[i:i + 2] for i in range(0, len(self.df), 2))
+        por_bloques.ajustar_bloques(obtener_bloques)
+        resultado = list(por_bloques.procesar_bloques(obtener_bloques()))
+
+        self.assertTrue(all(list(bloque.columns) == list(resultado[0].columns) for bloque in resultado))
+        en_memoria = PreprocesadoDatos(self.data_loader)
+        en_memoria.aplicar_seleccion(['Embarked', 'Fare'], 'Survived')
+        en_memoria.aplicar_datos_categoricos("one_hot_uint8")
+        pd.testing.assert_frame_equal(pd.concat(resultado), en_memoria.dataset_modificado)
+
+    def test_ajustar_bloques_codificaciones(self):
+        rng = np.random.default_rng(1)
+        n = 1_000
+        datos = pd.DataFrame({
+            'Ticket': rng.choice([f"T{i}" for i in range(40)], n),
+            'Embarked': rng.choice(['S', 'C', 'Q', None], n),
+            'Survived': rng.integers(0, 2, n),
+        })
+        obtener_bloques = lambda: (datos.iloc[i:i + 150] for i in range(0, n, 150))
+        for estrategia, argumentos in (("top_k", {"k": 5}), ("frecuencia", {}), ("target", {"suavizado": 5})):
+            en_memoria = PreprocesadoDatos(DummyDataLoader(datos))
+            en_memoria.aplicar_seleccion(['Ticket', 'Embarked'], 'Survived')
+            en_memoria.aplicar_datos_categoricos(estrategia, **argumentos)
+
+            por_bloques = PreprocesadoDatos(DummyDataLoader(datos.iloc[:100]))
+            por_bloques.aplicar_seleccion(['Ticket', 'Embarked'], 'Survived')
+            por_bloques.aplicar_datos_categoricos(estrategia, **argumentos)
+            por_bloques.ajustar_bloques(obtener_bloques)
+            resultado = pd.concat(por_bloques.procesar_bloques(obtener_bloques()))
+
+            pd.testing.assert_frame_equal(resultado, en_memoria.dataset_modificado, check_exact=False, rtol=1e-9)
+
+    ########## Modo de Ahorro de Memoria #############
+
+    def test_ahorro_memoria_mismo_resultado(self):
+        def aplicar_pasos(preprocesador):
+            preprocesador.aplicar_seleccion(['Age', 'Sex', 'Fare'], 'Survived')
+            preprocesador.aplicar_valores_faltantes("mediana")
+            preprocesador.aplicar_datos_categoricos("one_hot")
+            preprocesador.aplicar_normalizacion("min_max")
+            preprocesador.aplicar_valores_atipicos("mediana")
+            return preprocesador.dataset_modificado
+
+        original = self.df.copy()
+        esperado = aplicar_pasos(PreprocesadoDatos(DummyDataLoader(self.df)))
+        with pd.option_context("mode.copy_on_write", False):
+            ahorro = PreprocesadoDatos(DummyDataLoader(self.df), ahorro_memoria=True)
+            resultado = aplicar_pasos(ahorro)
+            # El modo copy-on-write solo se activa durante cada paso, no para el resto del proceso
+            self.assertFalse(pd.get_option("mode.copy_on_write"))
+
+        # Solo se conservan las columnas seleccionadas, con los mismos valores
+        pd.testing.assert_frame_equal(resultado, esperado[resultado.columns])
+        self.assertEqual(set(resultado.columns), {'Age', 'Fare', 'Survived', 'Sex_female', 'Sex_male'})
+        # El dataset original no se modifica
+        pd.testing.assert_frame_equal(self.df, original)
+        self.assertEqual([m["paso"] for m in ahorro.memoria_pasos],
+                         ["seleccion", "valores_faltantes", "datos_categoricos", "normalizacion", "valores_atipicos"])
+
+    def test_pasos_con_tipos_optimizados(self):
+        datos = optimizar_tipos(self.df)
+        preprocesador = PreprocesadoDatos(DummyDataLoader(datos))
+        preprocesador.aplicar_seleccion(['Age', 'Sex', 'Embarked'], 'Cabin')
+        self.assertIn('Sex', preprocesador.columnas_categoricas)
+
+        preprocesador.aplicar_valores_faltantes("constante", constante="Desconocida")
+        self.assertEqual(preprocesador.dataset_modificado.loc[0, 'Cabin'], "Desconocida")
+        preprocesador.aplicar_datos_categoricos("one_hot")
+        self.assertIn('Sex_female', preprocesador.features)
+        self.assertIn('Embarked_Q', preprocesador.features)
+
+    def test_aplicar_estrategia_no_valida(self):
+        self.seleccionar_columnas_manual(['Age'], 'Name')
+        with self.assertRaises(ValueError):
+            self.preprocesador.aplicar_valores_faltantes("inventada")
+
+    def test_hilos_mismo_resultado(self):
+        rng = np.random.default_rng(1)
+        datos = pd.DataFrame(rng.normal(0, 1, size=(500, 12)), columns=[f"x{i}" for i in range(12)])
+        datos = datos.mask(rng.random(datos.shape) < 0.05)
+        datos.iloc[::50, ::3] *= 20
+        datos["x0"] = datos["x0"].astype("float32")
+        datos["y"] = rng.integers(0, 2, 500)
+        features = [f"x{i}" for i in range(12)]
+
+        for faltantes, normalizacion, atipicos in (("media", "z_score", "mediana"), ("mediana", "min_max", "recortar"),
+                                                   ("moda", "z_score", "eliminar")):
+            resultados = []
+            for hilos in (1, 4):
+                preprocesador = PreprocesadoDatos(DummyDataLoader(datos), hilos=hilos)
+                preprocesador.aplicar_seleccion(features, 'y')
+                preprocesador.aplicar_valores_faltantes(faltantes)
+                preprocesador.aplicar_normalizacion(normalizacion)
+                preprocesador.aplicar_valores_atipicos(atipicos)
+                resultados.append(preprocesador.dataset_modificado)
+            pd.testing.assert_frame_equal(resultados[0], resultados[1], check_exact=True)
+
+    def test_cache_de_pasos(self):
+        with tempfile.TemporaryDirectory() as directorio:
+            ruta = os.path.join(directorio, "datos.csv")
+            self.df.to_csv(ruta, index=False)
+            cache = AlmacenCache(os.path.join(directorio, "cache"))
+
+            def ejecutar(normalizacion="min_max"):
+                cargador = DataLoader()
+                cargador.cargar_csv(ruta)
+                preprocesador = PreprocesadoDatos(cargador, cache=cache)
+                preprocesador.aplicar_seleccion(['Age', 'Sex', 'Embarked'], 'Survived')
+                preprocesador.aplicar_valores_faltantes("moda")
+                preprocesador.aplicar_datos_categoricos("one_hot")
+                preprocesador.aplicar_normalizacion(normalizacion)
+                return preprocesador
+
+            primero = ejecutar()
+            self.assertEqual((cache.aciertos, cache.fallos), (0, 3))
+            with patch.object(PreprocesadoDatos, "_por_columnas", side_effect=AssertionError("no debe calcularse")):
+                segundo = ejecutar()
+            self.assertEqual((cache.aciertos, cache.fallos), (3, 3))
+            pd.testing.assert_frame_equal(segundo.dataset_modificado, primero.dataset_modificado)
+            self.assertEqual(segundo.features, primero.features)
+            self.assertEqual([p["paso"] for p in segundo.pasos], ["valores_faltantes", "datos_categoricos", "normalizacion"])
+
+            # Con otra estrategia, los pasos anteriores se leen de la caché y solo se calcula el último
+            ejecutar("z_score")
+            self.assertEqual((cache.aciertos, cache.fallos), (5, 4))
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,99 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import pandas as pd
+
+from procesamiento_lotes import buscar_archivos, especificacion_archivo, procesar_lotes, rutas_salida
+
+
+class TestProcesamientoLotes(unittest.TestCase):
+
+    def setUp(self):
+        self.directorio = tempfile.TemporaryDirectory()
+        self.entrada = os.path.join(self.directorio.name, "entrada")
+        os.makedirs(self.entrada)
+        for i in range(3):
+            pd.DataFrame({
+                'Survived': [0, 1, 1, 0],
+                'Sex': ['male', 'female', 'female', None],
+                'Age': [22.0 + i, None, 26.0, 35.0],
+            }).to_csv(os.path.join(self.entrada, f"dia{i}.csv"), index=False)
+        # Archivo sin las columnas del pipeline: debe fallar sin detener el lote
+        pd.DataFrame({'otra': [1, 2]}).to_csv(os.path.join(self.entrada, "roto.csv"), index=False)
+        with open(os.path.join(self.entrada, "notas.txt"), "w") as archivo:
+            archivo.write("no es un archivo de datos")
+        self.especificacion = {
+            "features": ["Sex", "Age"],
+            "target": "Survived",
+            "valores_faltantes": "moda",
+            "datos_categoricos": "label",
+            "normalizacion": "min_max",
+            "exportar": {"ruta": "salida.csv"},
+        }
+
+    def tearDown(self):
+        self.directorio.cleanup()
+
+    def test_buscar_archivos(self):
+        self.assertEqual([os.path.basename(r) for r in buscar_archivos(self.entrada)],
+                         ["dia0.csv", "dia1.csv", "dia2.csv", "roto.csv"])
+        self.assertEqual(len(buscar_archivos(os.path.join(self.entrada, "dia*.csv"))), 3)
+
+    def test_rutas_salida_sin_repetir(self):
+        rutas = rutas_salida(["a/datos.csv", "b/datos.csv"], "salida", ".parquet")
+        self.assertEqual(rutas, {"a/datos.csv": os.path.join("salida", "datos.parquet"),
+                                 "b/datos.csv": os.path.join("salida", "datos_2.parquet")})
+
+    @patch("builtins.print")
+    def test_procesar_lotes_con_un_archivo_defectuoso(self, mock_print):
+        salida = os.path.join(self.directorio.name, "salida")
+        resumen = procesar_lotes(self.entrada, self.especificacion, salida, trabajadores=2)
+
+        self.assertEqual(resumen["correctos"], 3)
+        self.assertEqual([os.path.basename(r["archivo"]) for r in resumen["fallidos"]], ["roto.csv"])
+        self.assertEqual(resumen["filas"], 12)
+        self.assertGreater(resumen["filas_por_segundo"], 0)
+        for i in range(3):
+            procesado = pd.read_csv(os.path.join(salida, f"dia{i}.csv"))
+            self.assertFalse(procesado.isnull().any().any())
+
+    @patch("builtins.print")
+    def test_procesar_lotes_salida_comprimida(self, mock_print):
+        self.especificacion["exportar"] = {"ruta": "salida.csv.gz"}
+        salida = os.path.join(self.directorio.name, "salida")
+        resumen = procesar_lotes(os.path.join(self.entrada, "dia*.csv"), self.especificacion, salida, trabajadores=1)
+
+        self.assertEqual(resumen["correctos"], 3)
+        for i in range(3):
+            ruta = os.path.join(salida, f"dia{i}.csv.gz")
+            with open(ruta, "rb") as archivo:
+                self.assertEqual(archivo.read(2), b"\x1f\x8b") # Cabecera de gzip
+            self.assertEqual(len(pd.read_csv(ruta)), 4)
+
+    def test_especificacion_archivo_con_rutas_propias(self):
+        especificacion = dict(self.especificacion, guardar_pipeline=os.path.join("modelos", "pipeline.pkl"),
+                              perfil={"ruta": "perfil.json", "cprofile": ["carga"]}, graficos="graficos")
+        propia = especificacion_archivo(especificacion, "dia1")
+
+        self.assertEqual(propia["guardar_pipeline"], os.path.join("modelos", "pipeline_dia1.pkl"))
+        self.assertEqual(propia["perfil"], {"ruta": "perfil_dia1.json", "cprofile": ["carga"]})
+        self.assertEqual(propia["graficos"], os.path.join("graficos", "dia1"))
+        self.assertEqual(especificacion["guardar_pipeline"], os.path.join("modelos", "pipeline.pkl")) # Sin modificar
+
+    @patch("builtins.print")
+    def test_procesar_lotes_guarda_pipeline_y_perfil_por_archivo(self, mock_print):
+        self.especificacion["guardar_pipeline"] = os.path.join(self.directorio.name, "pipeline.pkl")
+        self.especificacion["perfil"] = os.path.join(self.directorio.name, "perfil.json")
+        salida = os.path.join(self.directorio.name, "salida")
+        resumen = procesar_lotes(os.path.join(self.entrada, "dia*.csv"), self.especificacion, salida, trabajadores=2)
+
+        self.assertEqual(resumen["correctos"], 3)
+        for i in range(3):
+            self.assertTrue(os.path.isfile(os.path.join(self.directorio.name, f"pipeline_dia{i}.pkl")))
+            self.assertTrue(os.path.isfile(os.path.join(self.directorio.name, f"perfil_dia{i}.json")))
+        self.assertFalse(os.path.exists(self.especificacion["guardar_pipeline"]))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,14 @@
+import os
+import tempfile
 import unittest
 from unittest.mock import patch, MagicMock
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
-from visualizador_datos import VisualizadorDatos  
+from scipy.stats import gaussian_kde
+from estadisticas_bloques import calcular_correlaciones
+from estadisticas_descriptivas import CacheEstadisticas
+from visualizador_datos import VisualizadorDatos, agrupar_histograma
 
 class TestVisualizadorDatos(unittest.TestCase):
 
@@ -36,6 +42,19 @@ class TestVisualizadorDatos(unittest.TestCase):
         self.visualizador.visualizar_resumen_estadistico()
         self.assertTrue(mock_print.called)
 
+    @patch('builtins.print')
+    def test_resumen_estadistico_desde_cache(self, mock_print):
+        estadisticas = CacheEstadisticas()
+        estadisticas.describir(self.datos_preprocesados, self.columnas_numericas) # Calculadas al preprocesar
+        visualizador = VisualizadorDatos(self.datos_originales, self.datos_preprocesados, self.columnas_seleccionadas,
+                                         self.columnas_numericas, self.columnas_categoricas, estadisticas=estadisticas)
+        visualizador.visualizar_resumen_estadistico()
+        visualizador.visualizar_resumen_estadistico()
+
+        self.assertEqual(estadisticas.estadisticas()["fallos"], 3) # Las dos numéricas y la tabla de frecuencias
+        impreso = [str(llamada.args[0]) for llamada in mock_print.call_args_list]
+        self.assertIn(str(self.datos_preprocesados[self.columnas_numericas].describe()), impreso)
+
     @patch('matplotlib.pyplot.show')
     def test_visualizar_histogramas(self, mock_show):
         self.visualizador.visualizar_histogramas()
@@ -51,11 +70,127 @@ class TestVisualizadorDatos(unittest.TestCase):
         self.visualizador.visualizar_heatmap()
         mock_show.assert_called_once()
 
-    @patch('builtins.input', side_effect=['5'])
+    @patch('matplotlib.pyplot.show')
+    @patch('builtins.input', side_effect=['4', 'spearman', '6'])
+    @patch('builtins.print')
+    def test_menu_heatmap_spearman(self, mock_print, mock_input, mock_show):
+        self.visualizador.menu_visualizacion()
+        mock_show.assert_called_once()
+        self.assertIn(('spearman', ('num1', 'num2')), self.visualizador._correlaciones)
+
+    @patch('builtins.input', side_effect=['6'])
     @patch('builtins.print')
     def test_menu_visualizacion_exit(self, mock_print, mock_input):
         self.visualizador.menu_visualizacion()
         self.assertTrue(mock_input.called)
 
+    @patch('matplotlib.pyplot.show')
+    def test_figuras_cerradas(self, mock_show):
+        self.visualizador.visualizar_histogramas()
+        self.visualizador.visualizar_heatmap()
+        self.assertEqual(plt.get_fignums(), [])
+
+    def test_guardar_graficos(self):
+        with tempfile.TemporaryDirectory() as directorio:
+            rutas = self.visualizador.guardar_graficos(directorio, procesos=1)
+            self.assertEqual([os.path.basename(ruta) for ruta in rutas],
+                             ['histograma_num1.png', 'histograma_num2.png', 'dispersion_num1_num2.png',
+                              'heatmap_correlacion.png'])
+            for ruta in rutas:
+                with open(ruta, 'rb') as archivo:
+                    self.assertEqual(archivo.read(8), b'\x89PNG\r\n\x1a\n')
+        self.assertEqual(plt.get_fignums(), [])
+
+    def test_guardar_graficos_en_paralelo_svg(self):
+        with tempfile.TemporaryDirectory() as directorio:
+            rutas = self.visualizador.guardar_graficos(directorio, formato='svg', procesos=2)
+            self.assertEqual(sorted(os.listdir(directorio)), sorted(os.path.basename(ruta) for ruta in rutas))
+            self.assertEqual(len(rutas), 4)
+            with open(rutas[-1], encoding='utf-8') as archivo:
+                self.assertIn('<svg', archivo.read())
+
+    def test_guardar_graficos_formato_no_valido(self):
+        with self.assertRaises(ValueError):
+            self.visualizador.guardar_graficos(tempfile.gettempdir(), formato='gif')
+
+
+class TestVisualizadorDatosGrandes(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.originales = pd.DataFrame({'a': rng.normal(50, 10, 20_000), 'b': rng.exponential(5, 20_000)})
+        self.preprocesados = (self.originales - self.originales.mean()) / self.originales.std()
+        self.preprocesados = self.preprocesados.drop(index=range(0, 20_000, 10)) # Filas eliminadas
+
+    def visualizador(self, **opciones):
+        return VisualizadorDatos(self.originales, self.preprocesados, ['a', 'b'], ['a', 'b'], [],
+                                 max_puntos=1000, tamano_muestra=500, **opciones)
+
+    def test_agrupar_histograma(self):
+        valores = self.originales['a'].to_numpy()
+        resumen = agrupar_histograma(np.append(valores, np.nan))
+        self.assertEqual(resumen['conteos'].sum(), 20_000)
+        self.assertEqual(resumen['filas'], 20_000)
+        # La KDE a partir de los conteos coincide con la exacta (escalada a conteos por intervalo)
+        ancho = resumen['bordes'][1] - resumen['bordes'][0]
+        exacta = gaussian_kde(valores)(resumen['rejilla']) * 20_000 * ancho
+        np.testing.assert_allclose(resumen['densidad'], exacta, atol=exacta.max() * 1e-2)
+        self.assertIsNone(agrupar_histograma([1.0, 1.0])['densidad'])
+
+        # Con dos valores el núcleo es más largo que la rejilla
+        pocos = pd.Series([1.0, 2.0, np.nan])
+        resumen = agrupar_histograma(pocos)
+        self.assertEqual(len(resumen['rejilla']), len(resumen['densidad']))
+        ancho = resumen['bordes'][1] - resumen['bordes'][0]
+        exacta = gaussian_kde([1.0, 2.0])(resumen['rejilla']) * 2 * ancho
+        np.testing.assert_allclose(resumen['densidad'], exacta, atol=exacta.max() * 2e-2)
+
+    def test_tareas_con_muestra(self):
+        tareas = list(self.visualizador().tareas_graficos('graficos'))
+        self.assertEqual([tarea[0] for tarea in tareas], ['histograma_agrupado', 'histograma_agrupado', 'dispersion', 'heatmap'])
+        dispersion = tareas[2][2]
+        self.assertEqual(len(dispersion['x_preprocesado']), 500)
+        # Las mismas filas antes y después de normalizar
+        np.testing.assert_allclose((dispersion['x_original'] - self.originales['a'].mean()) / self.originales['a'].std(),
+                                   dispersion['x_preprocesado'])
+
+    def test_tareas_con_densidad(self):
+        tareas = list(self.visualizador(modo_dispersion='densidad').tareas_graficos('graficos'))
+        conteos = tareas[2][2]['preprocesado'][0]
+        self.assertEqual(tareas[2][0], 'densidad')
+        self.assertEqual(conteos.sum(), len(self.preprocesados))
+
+    def test_guardar_graficos_grandes(self):
+        for modo in ('muestra', 'densidad'):
+            with tempfile.TemporaryDirectory() as directorio:
+                rutas = self.visualizador(modo_dispersion=modo).guardar_graficos(directorio, procesos=1)
+                self.assertEqual(len(os.listdir(directorio)), len(rutas))
+
+    @patch('matplotlib.pyplot.show')
+    def test_visualizar_grandes(self, mock_show):
+        visualizador = self.visualizador()
+        visualizador.visualizar_histogramas()
+        visualizador.visualizar_dispersion()
+        self.assertEqual(mock_show.call_count, 3)
+        self.assertEqual(plt.get_fignums(), [])
+
+    def test_correlaciones_en_cache_y_por_bloques(self):
+        visualizador = self.visualizador()
+        with patch('visualizador_datos.calcular_correlaciones', wraps=calcular_correlaciones) as calcular:
+            pearson = visualizador.correlaciones()
+            self.assertIs(visualizador.correlaciones(), pearson)
+            self.assertEqual(calcular.call_count, 1)
+        pd.testing.assert_frame_equal(pearson, self.preprocesados.corr(), atol=1e-10)
+        pd.testing.assert_frame_equal(visualizador.correlaciones('spearman'), self.preprocesados.corr('spearman'), atol=1e-10)
+
+        bloques = lambda: (self.preprocesados.iloc[i:i + 5000] for i in range(0, len(self.preprocesados), 5000))
+        visualizador = self.visualizador(obtener_bloques=bloques)
+        visualizador.datos_preprocesados = self.preprocesados.iloc[:100] # Solo una muestra en memoria
+        pd.testing.assert_frame_equal(visualizador.correlaciones(), self.preprocesados.corr(), atol=1e-10)
+
+    def test_modo_no_valido(self):
+        with self.assertRaises(ValueError):
+            self.visualizador(modo_dispersion='hexagonos')
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,6 +1,212 @@
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
 import matplotlib.pyplot as plt
+import numpy as np
 import seaborn as sns
 import pandas as pd
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.colors import LogNorm
+from matplotlib.figure import Figure
+
+from estadisticas_bloques import METODOS_CORRELACION, MuestraReservorio, calcular_correlaciones
+from estadisticas_descriptivas import CacheEstadisticas
+from perfilado import medir_etapa
+
+# Tamaño (pulgadas) de cada tipo de gráfico
+TAMANOS = {
+    "histograma": (8, 4), "histograma_agrupado": (8, 4),
+    "dispersion": (12, 5), "densidad": (12, 5),
+    "heatmap": (10, 6),
+}
+
+FORMATOS_GRAFICOS = ("png", "svg")
+
+# Modo de los gráficos de dispersión con muchas filas: una muestra aleatoria o la densidad de puntos por celdas
+MODOS_DISPERSION = ("muestra", "densidad")
+
+# A partir de este número de filas, los gráficos se dibujan a partir de datos agrupados o de una muestra
+MAX_PUNTOS = 100_000
+TAMANO_MUESTRA = 10_000
+
+
+def agrupar_histograma(valores, bins=20, puntos=512):
+    """
+    Resume una columna numérica para dibujar su histograma con KDE sin pasar todos los valores
+    a matplotlib: los conteos de `bins` intervalos (`np.histogram`) y la KDE evaluada en una
+    rejilla de `puntos` puntos a partir de los conteos en intervalos finos, convolucionados con
+    un núcleo gaussiano. El coste del dibujo no depende del número de filas.
+
+    El ancho de banda es el de la regla de Scott (el que usa seaborn por defecto). Los conteos
+    finos se extienden tres anchos de banda a cada lado de los datos para que la convolución no
+    se deforme en los extremos, y la curva se recorta al rango de los datos.
+
+    Parámetros:
+        valores (array-like): Valores de la columna; los faltantes se ignoran.
+        bins (int): Número de intervalos del histograma.
+        puntos (int): Número de puntos de la rejilla de la KDE.
+
+    Retorna:
+        dict: "conteos" y "bordes" del histograma, "rejilla" y "densidad" de la KDE (escalada a
+            conteos por intervalo del histograma; None si hay menos de dos valores distintos) y "filas".
+    """
+    valores = np.asarray(valores, dtype=float)
+    valores = valores[np.isfinite(valores)]
+    conteos, bordes = np.histogram(valores, bins=bins)
+    resumen = {"conteos": conteos, "bordes": bordes, "rejilla": None, "densidad": None, "filas": valores.size}
+    if valores.size < 2 or valores.min() == valores.max():
+        return resumen
+
+    ancho = valores.std(ddof=1) * valores.size ** (-1 / 5)
+    finos, bordes_finos = np.histogram(valores, bins=puntos, range=(valores.min() - 3 * ancho, valores.max() + 3 * ancho))
+    paso = bordes_finos[1] - bordes_finos[0]
+    radio = min(int(np.ceil(4 * ancho / paso)), puntos - 1)
+    desplazamientos = np.arange(-radio, radio + 1) * paso
+    nucleo = np.exp(-0.5 * (desplazamientos / ancho) ** 2) / (ancho * np.sqrt(2 * np.pi))
+    # Densidad por valor multiplicada por el número de valores y el ancho de los intervalos del histograma.
+    # Con pocos valores el núcleo puede ser más largo que la rejilla: se toma la parte central de la
+    # convolución completa, que tiene siempre `puntos` valores (mode="same" devolvería más).
+    densidad = np.convolve(finos, nucleo, mode="full")[radio:radio + puntos] * (bordes[1] - bordes[0])
+    rejilla = (bordes_finos[:-1] + bordes_finos[1:]) / 2
+    dentro = (rejilla >= valores.min()) & (rejilla <= valores.max())
+    resumen["rejilla"], resumen["densidad"] = rejilla[dentro], densidad[dentro]
+    return resumen
+
+
+def agrupar_dispersion(x, y, bins=100):
+    """
+    Cuenta los puntos de dos columnas en una rejilla de `bins` x `bins` celdas (`np.histogram2d`),
+    ignorando las filas con algún valor faltante.
+
+    Retorna:
+        tuple: (conteos, bordes de x, bordes de y).
+    """
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    validos = np.isfinite(x) & np.isfinite(y)
+    return np.histogram2d(x[validos], y[validos], bins=bins)
+
+
+def dibujar_histograma(fig, valores, columna):
+    """
+    Dibuja en `fig` el histograma con KDE de una columna numérica preprocesada.
+    """
+    ax = fig.add_subplot()
+    sns.histplot(valores, bins=20, kde=True, ax=ax)
+    ax.set_title(f"Histograma de {columna} (Después del preprocesado)")
+    ax.set_xlabel(columna)
+    ax.set_ylabel("Frecuencia")
+    fig.tight_layout()
+
+
+def dibujar_histograma_agrupado(fig, conteos, bordes, rejilla, densidad, filas, columna):
+    """
+    Dibuja en `fig` un histograma con KDE ya calculados (ver `agrupar_histograma`).
+    """
+    ax = fig.add_subplot()
+    ax.stairs(conteos, bordes, fill=True, alpha=0.6)
+    if densidad is not None:
+        ax.plot(rejilla, densidad)
+    ax.set_title(f"Histograma de {columna} (Después del preprocesado, {filas} valores)")
+    ax.set_xlabel(columna)
+    ax.set_ylabel("Frecuencia")
+    fig.tight_layout()
+
+
+def dibujar_dispersion(fig, x_original, y_original, x_preprocesado, y_preprocesado, x, y, nota=None):
+    """
+    Dibuja en `fig` la dispersión de dos columnas antes y después de normalizar.
+    Si se indica, `nota` se muestra como título general (por ejemplo, el tamaño de la muestra).
+    """
+    axes = fig.subplots(1, 2)
+    # Dispersión antes del preprocesamiento
+    axes[0].scatter(x_original, y_original, alpha=0.5, color='orange')
+    axes[0].set_title(f"Antes de normalizar: {x} vs {y}")
+    # Dispersión después del preprocesamiento
+    axes[1].scatter(x_preprocesado, y_preprocesado, alpha=0.5, color='blue')
+    axes[1].set_title(f"Después de normalizar: {x} vs {y}")
+    for ax in axes:
+        ax.set_xlabel(x)
+        ax.set_ylabel(y)
+    if nota:
+        fig.suptitle(nota)
+    fig.tight_layout()
+
+
+def dibujar_densidad(fig, original, preprocesado, x, y):
+    """
+    Dibuja en `fig` la densidad de puntos de dos columnas antes y después de normalizar, a partir
+    de sus conteos por celdas (ver `agrupar_dispersion`), con escala de color logarítmica.
+    """
+    axes = fig.subplots(1, 2)
+    for ax, (conteos, bordes_x, bordes_y), titulo, mapa in (
+            (axes[0], original, "Antes de normalizar", "Oranges"),
+            (axes[1], preprocesado, "Después de normalizar", "Blues")):
+        if conteos.any():
+            malla = ax.pcolormesh(bordes_x, bordes_y, np.ma.masked_equal(conteos, 0).T, norm=LogNorm(), cmap=mapa)
+            fig.colorbar(malla, ax=ax, label="Puntos")
+        ax.set_title(f"{titulo}: {x} vs {y}")
+        ax.set_xlabel(x)
+        ax.set_ylabel(y)
+    fig.tight_layout()
+
+
+def dibujar_heatmap(fig, correlaciones, metodo="pearson"):
+    """
+    Dibuja en `fig` el mapa de calor de una matriz de correlación.
+    """
+    ax = fig.add_subplot()
+    sns.heatmap(correlaciones, annot=True, cmap="coolwarm", linewidths=0.5, ax=ax)
+    detalle = "" if metodo == "pearson" else f" ({metodo})"
+    ax.set_title(f"Heatmap de correlación entre variables numéricas{detalle}")
+    fig.tight_layout()
+
+
+DIBUJOS = {
+    "histograma": dibujar_histograma, "histograma_agrupado": dibujar_histograma_agrupado,
+    "dispersion": dibujar_dispersion, "densidad": dibujar_densidad,
+    "heatmap": dibujar_heatmap,
+}
+
+# Figuras del proceso, una por tamaño: se vacían y se reutilizan de un gráfico al siguiente
+_figuras = {}
+
+
+def renderizar_grafico(tarea, formato="png", dpi=100):
+    """
+    Dibuja un gráfico y lo guarda en un archivo, sin pantalla (backend Agg de matplotlib).
+
+    No usa `pyplot`: la figura no queda registrada en ningún sitio y se reutiliza, vacía, para
+    el siguiente gráfico del mismo tamaño, de modo que la memoria no crece con el número de gráficos.
+
+    Parámetros:
+        tarea (tuple): (tipo de gráfico, ruta del archivo, argumentos de su función en `DIBUJOS`).
+        formato (str): "png" o "svg".
+        dpi (int): Resolución de los PNG.
+
+    Retorna:
+        str: Ruta del archivo escrito.
+    """
+    tipo, ruta, argumentos = tarea
+    fig = _figuras.get(TAMANOS[tipo])
+    if fig is None:
+        fig = _figuras[TAMANOS[tipo]] = Figure(figsize=TAMANOS[tipo])
+        FigureCanvasAgg(fig)
+    try:
+        DIBUJOS[tipo](fig, **argumentos)
+        fig.savefig(ruta, format=formato, dpi=dpi)
+    finally:
+        fig.clear()
+    return ruta
+
+
+def _nombre_archivo(*partes):
+    """
+    Une las partes del nombre de un gráfico, sustituyendo los caracteres no válidos en un nombre de archivo.
+    """
+    return "_".join(re.sub(r"[^\w\-]+", "_", str(parte)) for parte in partes)
+
 
 class VisualizadorDatos:
     """
@@ -12,22 +218,57 @@ class VisualizadorDatos:
         - Gráficos de dispersión antes y después de la normalización
         - Mapa de calor de correlación
 
+    Los gráficos también se pueden guardar todos en archivos, sin pantalla (ver `guardar_graficos`).
+
+    Con más de `max_puntos` filas, los histogramas y la KDE se calculan con NumPy a partir de
+    conteos por intervalos, y la dispersión se dibuja con una muestra aleatoria de `tamano_muestra`
+    filas (las mismas antes y después de normalizar) o, en modo "densidad", con los conteos por
+    celdas. Así el tiempo de dibujo no crece con el número de filas.
+
+    La matriz de correlación del heatmap se calcula con `calcular_correlaciones`, por bloques si se
+    indica `obtener_bloques` (datos que no se cargan completos en memoria), y se guarda para no
+    recalcularla al volver a dibujarla. El resumen estadístico se lee de una caché de estadísticas
+    (`CacheEstadisticas`), normalmente la del preprocesador, que ya contiene las que han usado los pasos.
+
     Atributos:
         datos_originales (pd.DataFrame): Dataset antes del preprocesamiento.
         datos_preprocesados (pd.DataFrame): Dataset después del preprocesamiento.
         columnas_seleccionadas (list): Columnas seleccionadas como variables de entrada.
         columnas_numericas (list): Columnas numéricas identificadas.
         columnas_categoricas (list): Columnas categóricas identificadas.
+        max_puntos (int): Número de filas a partir del cual se dibuja con datos agrupados o muestreados.
+        tamano_muestra (int): Filas de la muestra de los gráficos de dispersión.
+        modo_dispersion (str): "muestra" o "densidad" (ver `MODOS_DISPERSION`).
+        metodo_correlacion (str): "pearson" o "spearman", para el heatmap que se guarda en archivo.
+        obtener_bloques (callable): Función sin argumentos que devuelve un iterador sobre los bloques
+            preprocesados del dataset completo, o None si los datos están en memoria.
+        estadisticas (CacheEstadisticas): Caché de estadísticas descriptivas de los datos preprocesados.
     """
-    def __init__(self, datos_originales, datos_preprocesados, columnas_seleccionadas, columnas_numericas, columnas_categoricas):
+    def __init__(self, datos_originales, datos_preprocesados, columnas_seleccionadas, columnas_numericas, columnas_categoricas,
+                 max_puntos=MAX_PUNTOS, tamano_muestra=TAMANO_MUESTRA, modo_dispersion="muestra",
+                 metodo_correlacion="pearson", obtener_bloques=None, estadisticas=None):
         """
         Inicializa el visualizador con los datasets y la información de las columnas.
+
+        Lanza:
+            ValueError: Si el modo de dispersión o el método de correlación no son válidos.
         """
+        if modo_dispersion not in MODOS_DISPERSION:
+            raise ValueError(f"Modo de dispersión no válido: {modo_dispersion}")
+        if metodo_correlacion not in METODOS_CORRELACION:
+            raise ValueError(f"Método de correlación no válido: {metodo_correlacion}")
         self.datos_originales = datos_originales
         self.datos_preprocesados = datos_preprocesados
         self.columnas_seleccionadas = columnas_seleccionadas
         self.columnas_numericas = columnas_numericas
         self.columnas_categoricas = columnas_categoricas
+        self.max_puntos = max_puntos
+        self.tamano_muestra = tamano_muestra
+        self.modo_dispersion = modo_dispersion
+        self.metodo_correlacion = metodo_correlacion
+        self.obtener_bloques = obtener_bloques
+        self._correlaciones = {} # Matrices ya calculadas, por método y columnas
+        self.estadisticas = estadisticas if estadisticas is not None else CacheEstadisticas()
 
     def menu_visualizacion(self):
         """
@@ -43,7 +284,8 @@ class VisualizadorDatos:
             print("  [2] Histogramas de variables numéricas")
             print("  [3] Gráficos de dispersión antes y después de la normalización")
             print("  [4] Heatmap de correlación de variables numéricas")
-            print("  [5] Volver al menú principal")
+            print("  [5] Guardar todos los gráficos en archivos (PNG o SVG, sin pantalla)")
+            print("  [6] Volver al menú principal")
             opcion = input("Seleccione una opción: ")
 
             if opcion == "1":
@@ -53,12 +295,19 @@ class VisualizadorDatos:
             elif opcion == "3":
                 self.visualizar_dispersion()
             elif opcion == "4":
-                self.visualizar_heatmap()
+                metodo = input("Método de correlación (pearson/spearman, Enter para pearson): ").strip().lower() or "pearson"
+                if metodo not in METODOS_CORRELACION:
+                    print("Método no válido. Se usará pearson.")
+                    metodo = "pearson"
+                self.visualizar_heatmap(metodo)
             elif opcion == "5":
+                self.guardar_graficos_interactivo()
+            elif opcion == "6":
                 break
             else:
                 print("Opción inválida. Intente nuevamente.")
 
+    @medir_etapa(entrada="datos_preprocesados")
     def visualizar_resumen_estadistico(self):
         """
         Muestra un resumen estadístico de las variables seleccionadas.
@@ -69,26 +318,22 @@ class VisualizadorDatos:
         # Muestra estadísticas de columnas numéricas
         if self.columnas_numericas:
             print("\nVariables numéricas:")
-            print(self.datos_preprocesados[self.columnas_numericas].describe(percentiles=[.25, .5, .75]))
+            print(self.estadisticas.resumen(self.datos_preprocesados, self.columnas_numericas))
         # Muestra conteo de categorías para cada columna categórica
         if self.columnas_categoricas:
             print("\nDistribución de variables categóricas:")
             for col in self.columnas_categoricas:
-                print(f"\n{col}:\n{self.datos_preprocesados[col].value_counts()}")
+                print(f"\n{col}:\n{self.estadisticas.frecuencias(self.datos_preprocesados, col)}")
 
+    @medir_etapa(entrada="datos_preprocesados")
     def visualizar_histogramas(self):
         """
         Genera histogramas con KDE (estimación de densidad) para las variables numéricas preprocesadas.
         """
         for columna in self.columnas_numericas:
-            plt.figure(figsize=(8, 4))
-            sns.histplot(self.datos_preprocesados[columna], bins=20, kde=True)
-            plt.title(f"Histograma de {columna} (Después del preprocesado)")
-            plt.xlabel(columna)
-            plt.ylabel("Frecuencia")
-            plt.tight_layout()
-            plt.show()
+            self._mostrar(*self._grafico_histograma(columna))
 
+    @medir_etapa(entrada="datos_preprocesados")
     def visualizar_dispersion(self):
         """
         Muestra gráficos de dispersión para pares de variables numéricas:
@@ -98,30 +343,174 @@ class VisualizadorDatos:
             print("Se necesitan al menos dos variables numéricas para generar gráficos de dispersión.")
             return
         # Crea gráficos para cada par consecutivo de columnas numéricas
-        for i in range(len(self.columnas_numericas)-1):
-            x = self.columnas_numericas[i]
-            y = self.columnas_numericas[i+1]
-
-            fig, axes = plt.subplots(1, 2, figsize=(12, 5))
-            # Dispersión antes del preprocesamiento
-            axes[0].scatter(self.datos_originales[x], self.datos_originales[y], alpha=0.5, color='orange')
-            axes[0].set_title(f"Antes de normalizar: {x} vs {y}")
-            # Dispersión después del preprocesamiento
-            axes[1].scatter(self.datos_preprocesados[x], self.datos_preprocesados[y], alpha=0.5, color='blue')
-            axes[1].set_title(f"Después de normalizar: {x} vs {y}")
-            for ax in axes:
-                ax.set_xlabel(x)
-                ax.set_ylabel(y)
-            plt.tight_layout()
-            plt.show()
-
-    def visualizar_heatmap(self):
+        for x, y in self._pares_dispersion():
+            self._mostrar(*self._grafico_dispersion(x, y))
+
+    def _pares_dispersion(self):
+        """
+        Devuelve los pares de columnas numéricas consecutivas de los gráficos de dispersión.
+        """
+        return list(zip(self.columnas_numericas[:-1], self.columnas_numericas[1:]))
+
+    def _mostrar(self, tipo, argumentos):
+        """
+        Dibuja un gráfico en una figura de pyplot, la muestra y la cierra.
+        """
+        fig = plt.figure(figsize=TAMANOS[tipo])
+        DIBUJOS[tipo](fig, **argumentos)
+        plt.show()
+        plt.close(fig)
+
+    def _grafico_histograma(self, columna):
+        """
+        Devuelve el tipo y los argumentos del histograma de una columna: con todos los valores o,
+        si hay más de `max_puntos`, agrupados (ver `agrupar_histograma`).
+        """
+        valores = self.datos_preprocesados[columna]
+        if len(valores) <= self.max_puntos:
+            return "histograma", {"valores": valores.to_numpy(), "columna": columna}
+        return "histograma_agrupado", dict(agrupar_histograma(valores), columna=columna)
+
+    def _grafico_dispersion(self, x, y):
+        """
+        Devuelve el tipo y los argumentos del gráfico de dispersión de dos columnas: con todos los
+        puntos o, si hay más de `max_puntos` filas, con una muestra o con la densidad por celdas.
+        """
+        originales = self.datos_originales[[x, y]]
+        preprocesados = self.datos_preprocesados[[x, y]]
+        if max(len(originales), len(preprocesados)) <= self.max_puntos:
+            nota = None
+        elif self.modo_dispersion == "densidad":
+            return "densidad", {"original": agrupar_dispersion(originales[x], originales[y]),
+                                "preprocesado": agrupar_dispersion(preprocesados[x], preprocesados[y]), "x": x, "y": y}
+        else:
+            reservorio = MuestraReservorio(self.tamano_muestra)
+            reservorio.actualizar(preprocesados)
+            preprocesados = reservorio.muestra()
+            if originales.index.is_unique:
+                originales = originales.reindex(preprocesados.index) # Las mismas filas antes y después
+            else:
+                reservorio = MuestraReservorio(self.tamano_muestra)
+                reservorio.actualizar(originales)
+                originales = reservorio.muestra()
+            nota = f"Muestra aleatoria de {len(preprocesados)} de {len(self.datos_preprocesados)} filas"
+        return "dispersion", {
+            "x_original": originales[x].to_numpy(), "y_original": originales[y].to_numpy(),
+            "x_preprocesado": preprocesados[x].to_numpy(), "y_preprocesado": preprocesados[y].to_numpy(),
+            "x": x, "y": y, "nota": nota,
+        }
+
+    @medir_etapa(entrada="datos_preprocesados")
+    def visualizar_heatmap(self, metodo=None):
         """
         Genera un mapa de calor (heatmap) con la matriz de correlación de las variables numéricas.
+
+        Parámetros:
+            metodo (str, opcional): "pearson" o "spearman"; por defecto, `metodo_correlacion`.
         """
-        correlaciones = self.datos_preprocesados[self.columnas_numericas].corr()
-        plt.figure(figsize=(10, 6))
-        sns.heatmap(correlaciones, annot=True, cmap="coolwarm", linewidths=0.5)
-        plt.title("Heatmap de correlación entre variables numéricas")
-        plt.tight_layout()
-        plt.show()
\ No newline at end of file
+        metodo = metodo or self.metodo_correlacion
+        self._mostrar("heatmap", {"correlaciones": self.correlaciones(metodo), "metodo": metodo})
+
+    def correlaciones(self, metodo="pearson"):
+        """
+        Devuelve la matriz de correlación de las variables numéricas, calculada la primera vez que
+        se pide con `calcular_correlaciones`: sobre todos los bloques si hay `obtener_bloques` y, si
+        no, sobre los datos en memoria (en ese caso, Spearman usa los rangos exactos).
+
+        Parámetros:
+            metodo (str): "pearson" o "spearman".
+
+        Retorna:
+            pd.DataFrame: Matriz de correlación.
+        """
+        clave = (metodo, tuple(self.columnas_numericas))
+        if clave not in self._correlaciones:
+            columnas = self.columnas_numericas
+            if self.obtener_bloques is not None:
+                correlaciones = calcular_correlaciones(self.obtener_bloques, columnas, metodo)
+            elif metodo == "spearman":
+                rangos = self.datos_preprocesados[columnas].rank()
+                correlaciones = calcular_correlaciones(lambda: [rangos], columnas)
+            else:
+                correlaciones = calcular_correlaciones(lambda: [self.datos_preprocesados], columnas, metodo)
+            self._correlaciones[clave] = correlaciones
+        return self._correlaciones[clave]
+
+    def tareas_graficos(self, directorio, formato="png"):
+        """
+        Genera, de una en una, las tareas de `renderizar_grafico` de todos los gráficos del dataset
+        (histogramas, dispersiones y heatmap). Cada tarea lleva solo las columnas que dibuja o, con
+        muchas filas, sus conteos agrupados o una muestra, que se calculan en este proceso.
+
+        Parámetros:
+            directorio (str): Directorio de los archivos.
+            formato (str): Extensión de los archivos.
+
+        Retorna:
+            generator: Tareas (tipo, ruta, argumentos).
+        """
+        ruta = lambda *partes: os.path.join(directorio, _nombre_archivo(*partes) + "." + formato)
+        for columna in self.columnas_numericas:
+            tipo, argumentos = self._grafico_histograma(columna)
+            yield tipo, ruta("histograma", columna), argumentos
+        for x, y in self._pares_dispersion():
+            tipo, argumentos = self._grafico_dispersion(x, y)
+            yield tipo, ruta("dispersion", x, y), argumentos
+        if self.columnas_numericas:
+            yield ("heatmap", ruta("heatmap", "correlacion"),
+                   {"correlaciones": self.correlaciones(self.metodo_correlacion), "metodo": self.metodo_correlacion})
+
+    @medir_etapa(entrada="datos_preprocesados")
+    def guardar_graficos(self, directorio, formato="png", procesos=None, dpi=100):
+        """
+        Guarda todos los gráficos del dataset en archivos sin abrir ninguna ventana, por lo que
+        funciona en servidores sin pantalla. Los gráficos se dibujan en paralelo en un grupo de
+        procesos; cada proceso reutiliza sus figuras (ver `renderizar_grafico`) y solo se preparan
+        unas pocas tareas por adelantado, así que la memoria no crece con el número de columnas.
+
+        Parámetros:
+            directorio (str): Directorio de salida (se crea si no existe).
+            formato (str): "png" o "svg".
+            procesos (int, opcional): Número de procesos; por defecto, uno por CPU. Con 1 se dibujan
+                en el proceso actual.
+            dpi (int): Resolución de los PNG.
+
+        Retorna:
+            list: Rutas de los archivos escritos, en orden.
+
+        Lanza:
+            ValueError: Si el formato no es válido.
+        """
+        if formato not in FORMATOS_GRAFICOS:
+            raise ValueError(f"Formato de gráfico no válido: {formato}")
+        os.makedirs(directorio, exist_ok=True)
+        procesos = procesos or os.cpu_count() or 1
+        tareas = self.tareas_graficos(directorio, formato)
+        if procesos == 1:
+            return [renderizar_grafico(tarea, formato, dpi) for tarea in tareas]
+
+        rutas, pendientes = [], []
+        with ProcessPoolExecutor(max_workers=procesos) as ejecutor:
+            for tarea in tareas:
+                pendientes.append(ejecutor.submit(renderizar_grafico, tarea, formato, dpi))
+                if len(pendientes) >= 2 * procesos: # Se espera a la más antigua antes de preparar otra
+                    rutas.append(pendientes.pop(0).result())
+            rutas.extend(futuro.result() for futuro in pendientes)
+        return rutas
+
+    def guardar_graficos_interactivo(self):
+        """
+        Pide el directorio y el formato y guarda todos los gráficos en archivos (ver `guardar_graficos`).
+        """
+        directorio = input("Directorio de salida (Enter para 'graficos'): ").strip() or "graficos"
+        formato = input("Formato (png/svg, Enter para png): ").strip().lower() or "png"
+        if formato not in FORMATOS_GRAFICOS:
+            print("Formato no válido. Se usará png.")
+            formato = "png"
+        inicio = time.perf_counter()
+        try:
+            rutas = self.guardar_graficos(directorio, formato)
+        except OSError as e:
+            print(f"Error al guardar los gráficos: {e}")
+            return
+        print(f"Se han guardado {len(rutas)} gráficos en '{directorio}' ({time.perf_counter() - inicio:.2f} s).")